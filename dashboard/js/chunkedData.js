@@ -0,0 +1,262 @@
+// Lazily loaded dashboard data written by tools/split_data.py.
+//
+// A chunked data file is a manifest with a `chunked` section
+//   { version, encoding, path, chunks, nodes }
+// in which collapsed containers are stubs: no children, a `chunk: { ref, nodes }`
+// reference and their rolled-up status. A chunk holds the children of one stub
+// (possibly with nested stubs) and the edges that touch them. The ChunkLoader
+// fetches a chunk when its container is expanded or zoomed into, creates the
+// children in the container and adds the edges once both ends exist. Chunks of
+// stubs near the viewport are prefetched after zooming and panning. Status updates
+// for nodes that are not created yet are queued and applied when their chunk is.
+
+import { createEdge } from "./edge.js";
+
+export const CHUNK_FORMAT_VERSION = 1;
+
+// Fraction of the viewport a collapsed stub has to cover before it is expanded
+const ZOOM_IN_COVERAGE = 0.25;
+// Margin around the viewport, as fraction of its size, in which chunks are prefetched
+const PREFETCH_MARGIN = 0.5;
+const VIEWPORT_CHECK_DELAY = 150;
+
+/** Directory of a data file URL, against which the chunk path is resolved */
+export function chunkBaseUrl(fileUrl) {
+  return fileUrl.slice(0, fileUrl.lastIndexOf('/') + 1);
+}
+
+async function readChunk(response) {
+  const bytes = new Uint8Array(await response.arrayBuffer());
+  // The server may already have removed the gzip layer (Content-Encoding), so look at the bytes
+  if (bytes[0] === 0x1f && bytes[1] === 0x8b) {
+    const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+    return JSON.parse(await new Response(stream).text());
+  }
+  return JSON.parse(new TextDecoder().decode(bytes));
+}
+
+const edgeKey = (edge) => JSON.stringify(edge);
+const endpointId = (end) => (end !== null && typeof end === 'object' ? end.id : end);
+
+export class ChunkLoader {
+  constructor(dashboard, chunked) {
+    this.dashboard = dashboard;
+    this.url = `${chunked.baseUrl ?? 'data/'}${chunked.path ?? 'chunks/'}`;
+    this.suffix = chunked.encoding === 'identity' ? '.json' : '.json.gz';
+    this.stubs = new Map();     // container id -> chunk ref, until the chunk is materialized
+    this.requests = new Map();  // chunk ref -> Promise of the chunk content
+    this.pendingEdges = new Map();
+    this.createdEdges = new Set();
+    this.loading = new Set();
+    this._viewportTimer = null;
+    // Status updates for nodes in chunks that are not loaded yet; the latest (seq) wins
+    this.queuedStatuses = new Map();  // node id -> { status, seq }
+    this.queuedDatasets = new Map();  // datasetId -> { status, seq }, also for chunks loaded later
+    this.queuedCollapsed = new Map(); // container id -> collapsed
+    this.queuedRolledUp = false;
+    this.queueSeq = 0;
+  }
+
+  /** Remember the stubs in node data (the manifest or a chunk) */
+  registerStubs(nodes) {
+    for (const node of nodes || []) {
+      if (node.chunk?.ref && !(node.children && node.children.length)) {
+        this.stubs.set(String(node.id), node.chunk.ref);
+      }
+      this.registerStubs(node.children);
+    }
+  }
+
+  get pending() {
+    return this.stubs.size;
+  }
+
+  /** Queue the status of a node that does not exist yet; false once every chunk is loaded */
+  queueStatus(nodeId, status, rolledUp = false) {
+    if (this.stubs.size === 0) return false;
+    this.queuedStatuses.set(String(nodeId), { status, seq: ++this.queueSeq });
+    this.queuedRolledUp ||= rolledUp;
+    return true;
+  }
+
+  /** Queue a dataset status for the nodes of that dataset in chunks that are not loaded yet */
+  queueDatasetStatus(datasetId, status, rolledUp = false) {
+    if (this.stubs.size === 0) return false;
+    this.queuedDatasets.set(String(datasetId), { status, seq: ++this.queueSeq });
+    this.queuedRolledUp ||= rolledUp;
+    return true;
+  }
+
+  /** Queue a (server rolled-up) collapse decision for a container that does not exist yet */
+  queueCollapsed(nodeId, collapsed) {
+    if (this.stubs.size === 0) return false;
+    this.queuedCollapsed.set(String(nodeId), collapsed);
+    return true;
+  }
+
+  /**
+   * Apply the queued updates of the nodes just created in a container as one status batch
+   * @returns {boolean} whether anything was applied (the batch refreshed the display)
+   */
+  applyQueuedStatuses(container) {
+    if (!this.queuedStatuses.size && !this.queuedDatasets.size && !this.queuedCollapsed.size) return false;
+    const batch = { nodes: {}, collapsed: {}, rolledUp: this.queuedRolledUp };
+    const visit = (node) => {
+      const id = String(node.id);
+      let latest = this.queuedStatuses.get(id);
+      const datasetId = node.data?.datasetId;
+      if (datasetId !== undefined && datasetId !== null) {
+        const queued = this.queuedDatasets.get(String(datasetId));
+        if (queued && (!latest || queued.seq > latest.seq)) latest = queued;
+      }
+      if (latest) batch.nodes[id] = latest.status;
+      this.queuedStatuses.delete(id);
+      if (this.queuedCollapsed.has(id)) {
+        batch.collapsed[id] = this.queuedCollapsed.get(id);
+        this.queuedCollapsed.delete(id);
+      }
+      (node.childNodes || []).forEach(visit);
+    };
+    (container.childNodes || []).forEach(visit);
+    if (this.stubs.size === 0) this.clearQueuedStatuses();
+    return this.dashboard.applyStatusBatch(batch) > 0;
+  }
+
+  clearQueuedStatuses() {
+    this.queuedStatuses.clear();
+    this.queuedDatasets.clear();
+    this.queuedCollapsed.clear();
+    this.queuedRolledUp = false;
+  }
+
+  fetchChunk(ref) {
+    if (!this.requests.has(ref)) {
+      const request = fetch(`${this.url}${ref}${this.suffix}`)
+        .then((response) => {
+          if (!response.ok) throw new Error(`HTTP ${response.status}`);
+          return readChunk(response);
+        })
+        .catch((error) => {
+          this.requests.delete(ref); // allow a retry on the next expand
+          throw error;
+        });
+      this.requests.set(ref, request);
+    }
+    return this.requests.get(ref);
+  }
+
+  prefetch(ref) {
+    this.fetchChunk(ref).catch(() => {});
+  }
+
+  /** Whether a node and all its ancestors are expanded, i.e. its children would be shown */
+  isOpen(node) {
+    for (let current = node; current; current = current.parentNode) {
+      if (current.collapsed) return false;
+    }
+    return true;
+  }
+
+  stubNodes() {
+    const nodes = [];
+    for (const id of this.stubs.keys()) {
+      const node = this.dashboard.nodeIndex?.get(id) ?? this.dashboard.main.root?.getNode(id);
+      if (node) nodes.push(node);
+    }
+    return nodes;
+  }
+
+  /** Load the chunks of stubs that are expanded and shown; called after display changes */
+  check() {
+    for (const node of this.stubNodes()) {
+      if (this.isOpen(node)) this.materialize(node);
+    }
+  }
+
+  async materialize(container) {
+    const id = String(container.id);
+    const ref = this.stubs.get(id);
+    if (!ref || this.loading.has(id)) return;
+    this.loading.add(id);
+    let chunk;
+    try {
+      chunk = await this.fetchChunk(ref);
+    } catch (error) {
+      console.error(`ChunkLoader: Failed to load chunk ${ref} of ${id}:`, error);
+      return;
+    } finally {
+      this.loading.delete(id);
+    }
+    if (!this.stubs.has(id) || !container.element) return; // materialized meanwhile, or data replaced
+
+    this.stubs.delete(id);
+    this.registerStubs(chunk.nodes);
+    for (const edge of chunk.edges || []) {
+      const key = edgeKey(edge);
+      if (!this.createdEdges.has(key)) this.pendingEdges.set(key, edge);
+    }
+
+    container.data.children = chunk.nodes;
+    container.initChildren();
+    if (container.collapsed) container.collapse();
+    else container.expand();
+    container.cascadeUpdate();
+    this.createEdges();
+    if (!this.applyQueuedStatuses(container)) this.dashboard.onMainDisplayChange();
+  }
+
+  /** Create the pending edges whose source and target both exist by now */
+  createEdges() {
+    const root = this.dashboard.main.root;
+    let created = 0;
+    for (const [key, edge] of this.pendingEdges) {
+      if (!root.getNode(endpointId(edge.source)) || !root.getNode(endpointId(edge.target))) continue;
+      this.pendingEdges.delete(key);
+      this.createdEdges.add(key);
+      createEdge(root, edge, this.dashboard.data.settings);
+      created++;
+    }
+    if (created > 0) root.initEdges(true);
+  }
+
+  /** Debounced viewport check; called on every zoom event */
+  scheduleViewportCheck() {
+    if (this.stubs.size === 0) return;
+    clearTimeout(this._viewportTimer);
+    this._viewportTimer = setTimeout(() => this.checkViewport(), VIEWPORT_CHECK_DELAY);
+  }
+
+  /** Expand stubs that fill a good part of the viewport, prefetch those near it */
+  checkViewport() {
+    const svg = this.dashboard.main?.svg?.node();
+    if (!svg) return;
+    const view = svg.getBoundingClientRect();
+    if (!view.width || !view.height) return;
+    const marginX = view.width * PREFETCH_MARGIN;
+    const marginY = view.height * PREFETCH_MARGIN;
+
+    for (const node of this.stubNodes()) {
+      if (!node.visible || !node.element || !this.isOpen(node.parentNode)) continue;
+      const box = node.element.node().getBoundingClientRect();
+      if (!box.width || !box.height) continue;
+      const near = box.right >= view.left - marginX && box.left <= view.right + marginX
+        && box.bottom >= view.top - marginY && box.top <= view.bottom + marginY;
+      if (!near) continue;
+
+      const overlapX = Math.max(0, Math.min(box.right, view.right) - Math.max(box.left, view.left));
+      const overlapY = Math.max(0, Math.min(box.bottom, view.bottom) - Math.max(box.top, view.top));
+      if (overlapX * overlapY >= ZOOM_IN_COVERAGE * view.width * view.height) {
+        node.collapsed = false; // display change -> check() materializes it
+      } else {
+        this.prefetch(this.stubs.get(String(node.id)));
+      }
+    }
+  }
+
+  dispose() {
+    clearTimeout(this._viewportTimer);
+    this.stubs.clear();
+    this.pendingEdges.clear();
+    this.clearQueuedStatuses();
+  }
+}
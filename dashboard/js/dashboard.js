@@ -2,13 +2,18 @@ import { createNode, createNodes } from "./node.js";
 import { getRegisteredNodeTypes } from "./nodeRegistry.js";
 import { getBoundingBoxRelativeToParent } from "./utils.js";
 import { createMarkers } from "./markers.js";
-import { createEdges } from "./edge.js";
+import { createEdge, createEdges } from "./edge.js";
 import { ConfigManager } from "./configManager.js";
 import { fetchDashboardFile } from "./data.js";
 import { LoadingOverlay, showLoading as showLoader, hideLoading as hideLoader, resolveLoadingContainer as resolveLoadingHost } from "./loadingOverlay.js";
 import { Minimap } from "./minimap.js";
 import ZoomManager from "./zoomManager.js";
 import { NodeStatus } from "./nodeBase.js";
+import { resetReadiness, markLayoutPending, markLayoutSettled, markZoomSettled, scheduleSettle } from "./readiness.js";
+import { structureHash, resolvePrecomputedLayout, withPrecomputedLayout } from "./precomputedLayout.js";
+import { NodeIndex, resolveDataIndex, withNodeIndex } from "./dataIndex.js";
+import { ChunkLoader, CHUNK_FORMAT_VERSION } from "./chunkedData.js";
+import { PATCH_VERSION, applyDataPatch, dataVersion, edgeEndpoints } from "./dataPatch.js";
 
 export class Dashboard {
   constructor(dashboardData) {
@@ -158,6 +163,7 @@ export class Dashboard {
 
   setData(newDashboardData) {
     this._initialLoading = true;
+    resetReadiness();
     try { this.showLoading(); } catch {}
 
     const userSettings = (newDashboardData && newDashboardData.settings) ? newDashboardData.settings : {};
@@ -179,7 +185,10 @@ export class Dashboard {
 
   this.main.root.onClick = (node) => this.selectNode(node);
   this.main.root.onDblClick = (node, event) => this.handleNodeDblClick(node, event);
-    this.main.root.onDisplayChange = () => { this.onMainDisplayChange(); };
+    this.main.root.onDisplayChange = () => {
+      if (this._suspendDisplayChange) return;
+      this.onMainDisplayChange();
+    };
 
     if (this.main.zoom) {
       this.main.svg.call(this.main.zoom);
@@ -214,6 +223,7 @@ export class Dashboard {
 
    initialize(mainDivSelector, minimapDivSelector = null) {
     this.mainDivSelector = mainDivSelector;
+    resetReadiness();
     
     try { 
       if (typeof window !== 'undefined' && window.showFlowDashLoading) {
@@ -266,6 +276,7 @@ export class Dashboard {
       window.addEventListener('resize', this._onWindowResize);
     }
     this._isInitialized = true;
+    scheduleSettle(this, () => this.onLayoutSettled());
   }
 
 
@@ -642,13 +653,15 @@ export class Dashboard {
       } catch (e) {
         console.warn('updateNodeStatus: Failed to update status for node:', nodeId, e);
       }
-    } else {
+    } else if (!this.chunkLoader?.queueStatus(nodeId, status)) {
       console.error("updateNodeStatus: Node not found:", nodeId);
     }
   }
 
   updateDatasetStatus(datasetId, status) {
     let stateUpdated = false;
+    // Nodes of the dataset in chunks that are not loaded yet get it when they are created
+    this.chunkLoader?.queueDatasetStatus(datasetId, status);
     const nodes = this.main.root.getNodesByDatasetId(datasetId);
     if (nodes && nodes.length > 0) {
       for (const node of nodes) {
@@ -663,6 +676,210 @@ export class Dashboard {
     return stateUpdated; 
   }
 
+  /**
+   * Apply many status changes as one update: display-change reactions are
+   * suspended while statuses are set and the layout/zoom refresh runs once.
+   * When container statuses and collapse decisions were rolled up on the server
+   * (tools/status_rollup.py), node statuses are set without cascading to their
+   * ancestors or auto collapsing, and the server's container statuses and
+   * collapse flags are applied as the final values.
+   * @param {{nodes?: Object<string,string>, datasets?: Object<string,string>,
+   *   containers?: Object<string,string>, collapsed?: Object<string,boolean>, rolledUp?: boolean}} batch
+   *   maps of nodeId -> status, datasetId -> status, containerId -> status and containerId -> collapsed;
+   *   rolledUp defaults to whether the batch carries container statuses or collapse flags
+   * @returns {number} number of nodes whose status or collapse state actually changed
+   */
+  applyStatusBatch({ nodes = {}, datasets = {}, containers = {}, collapsed = {},
+    rolledUp = Object.keys(containers).length > 0 || Object.keys(collapsed).length > 0 } = {}) {
+    if (!this.main.root) return 0;
+    let applied = 0;
+    const apply = (node, status) => {
+      if (!node || node.status === status) return;
+      try {
+        if (rolledUp) node.setStatusWithoutCascade(status);
+        else node.status = status;
+        applied++;
+      } catch (e) {
+        console.warn('applyStatusBatch: Failed to update status for node:', node.id, e);
+      }
+    };
+
+    const wasSuspended = this._suspendDisplayChange;
+    this._suspendDisplayChange = true;
+    try {
+      // Updates for nodes in chunks that are not loaded yet are queued in the chunk loader
+      for (const [datasetId, status] of Object.entries(datasets)) {
+        for (const node of this.main.root.getNodesByDatasetId(datasetId) || []) apply(node, status);
+        this.chunkLoader?.queueDatasetStatus(datasetId, status, rolledUp);
+      }
+      for (const [nodeId, status] of [...Object.entries(nodes), ...Object.entries(containers)]) {
+        const node = this.main.root.getNode(nodeId);
+        if (node) apply(node, status);
+        else this.chunkLoader?.queueStatus(nodeId, status, rolledUp);
+      }
+      for (const [nodeId, value] of Object.entries(collapsed)) {
+        const node = this.main.root.getNode(nodeId);
+        if (!node) this.chunkLoader?.queueCollapsed(nodeId, value);
+        if (!node || !node.isContainer || node.collapsed === value) continue;
+        try {
+          node.collapsed = value;
+          applied++;
+        } catch (e) {
+          console.warn('applyStatusBatch: Failed to update collapsed state for node:', node.id, e);
+        }
+      }
+    } finally {
+      this._suspendDisplayChange = wasSuspended;
+    }
+
+    if (applied > 0) this.onMainDisplayChange();
+    return applied;
+  }
+
+  /**
+   * Apply a structural patch from tools/data_patch.py (see dataPatch.js) to the shown
+   * data. Only containers whose children changed are reconciled: removed, moved and
+   * re-rendered nodes are discarded, new ones are created in place, and the edges of
+   * discarded nodes are created again. Zoom and minimap follow the normal display change.
+   * @returns {boolean} false when the patch does not fit; reload the full data then
+   */
+  applyPatch(patch) {
+    const root = this.main.root;
+    if (!root || !patch || patch.version !== PATCH_VERSION || patch.from !== this.dataVersion) return false;
+    // Settings changes and chunked data need a full reload
+    if (patch.settings !== undefined || this.chunkLoader) return false;
+    // A single top-level node is the root itself and cannot be reconciled in a parent
+    const autoRoot = root.data.children === this.data.nodes;
+    const rootId = String(root.id);
+    if (!autoRoot && ([...patch.added, ...patch.moved].some((op) => op.parent === null || op.parent === undefined)
+      || patch.removed.some((id) => String(id) === rootId)
+      || patch.updated.some((update) => String(update.id) === rootId
+        && [...Object.keys(update.set || {}), ...(update.unset || [])].some((field) => field !== 'state' && field !== 'children')))) {
+      return false;
+    }
+
+    let changes;
+    try {
+      changes = applyDataPatch(this.data, patch);
+    } catch (e) {
+      console.warn('applyPatch: Patch does not fit the data:', e);
+      return false;
+    }
+    this.nodeIndex.dropCompiled();
+    this.usesCompiledIndex = false;
+
+    const discarded = new Set();
+    const orphanEdges = new Set();
+    const wasSuspended = this._suspendDisplayChange;
+    this._suspendDisplayChange = true;
+    try {
+      for (const [source, target] of patch.edges.removed) {
+        const node = root.getNode(source);
+        for (const edge of [...(node?.edges.outgoing || [])]) {
+          const [edgeSource, edgeTarget] = edgeEndpoints(edge.data);
+          if (edgeSource === String(source) && edgeTarget === String(target)) this.discardEdge(edge);
+        }
+      }
+
+      const depth = (node) => (node === root ? 0 : node.getParents().length);
+      const containers = [...new Set([...changes.parents]
+        .map((id) => (id === null ? root : this.nodeIndex.get(id)))
+        .filter((node) => node?.isContainer))]
+        .sort((a, b) => depth(a) - depth(b));
+      const created = [];
+      for (const container of containers) {
+        if (discarded.has(container)) continue; // re-rendered with its parent
+        created.push(...this.reconcileChildren(container, changes.recreated, discarded, orphanEdges));
+      }
+      for (const node of created) {
+        if (node.isContainer && node.element) this.initializeChildrenStatusses(node);
+      }
+      for (const [nodeData, state] of changes.statuses) {
+        const node = this.nodeIndex.get(nodeData.id);
+        if (node && node.data === nodeData) node.status = state;
+      }
+      for (const container of containers) {
+        if (!discarded.has(container)) container.determineStatusBasedOnChildren();
+      }
+
+      const edges = new Set(this.data.edges);
+      for (const edgeData of [...orphanEdges, ...changes.edges]) {
+        if (edges.delete(edgeData)) createEdge(root, edgeData, this.data.settings);
+      }
+      root.initEdges(true);
+    } finally {
+      this._suspendDisplayChange = wasSuspended;
+    }
+
+    this.dataVersion = patch.to;
+    this.onMainDisplayChange();
+    return true;
+  }
+
+  /** Bring the child nodes of a container in line with its (patched) data; returns the created nodes */
+  reconcileChildren(container, recreated, discarded, orphanEdges) {
+    const wanted = container.data.children || [];
+    const keep = new Set(wanted.filter((data) => !recreated.has(data)));
+    for (const child of container.childNodes) {
+      if (!keep.has(child.data)) this.discardNode(child, discarded, orphanEdges);
+    }
+    const existing = new Map(container.childNodes.filter((child) => !discarded.has(child)).map((child) => [child.data, child]));
+
+    // Without an element the container is inside a collapsed parent; its children are initialized on expand
+    const rendered = !!container.element;
+    const innerZone = rendered
+      ? (container.zoneManager?.innerContainerZone || container.zoneManager?.ensureInnerContainerZone?.())
+      : null;
+    const childContainer = innerZone?.getChildContainer() || container.element;
+    const created = [];
+    container.childNodes = wanted.map((data) => {
+      if (existing.has(data)) return existing.get(data);
+      const node = container.createNode(data, childContainer, container.settings, container);
+      if (rendered) node.init(childContainer);
+      created.push(node);
+      return node;
+    });
+    if (innerZone) innerZone.childNodes = [...container.childNodes];
+
+    if (rendered) {
+      if (container.collapsed) container.collapse();
+      else container.expand();
+      container.cascadeUpdate();
+    }
+    return created;
+  }
+
+  discardNode(node, discarded, orphanEdges) {
+    for (const current of node.getAllNodes()) {
+      discarded.add(current);
+      for (const edge of [...current.edges.incoming, ...current.edges.outgoing]) {
+        this.discardEdge(edge);
+        orphanEdges.add(edge.data);
+      }
+      this.nodeIndex.unregister(current);
+      current.selected = false;
+    }
+    if (node.element) {
+      node.element.remove();
+      node.element = null;
+    }
+  }
+
+  discardEdge(edge) {
+    const container = edge.parents.container;
+    const source = edge.parents.source[0] || container;
+    const target = edge.parents.target[0] || container;
+    const remove = (list) => {
+      const index = list ? list.indexOf(edge) : -1;
+      if (index >= 0) list.splice(index, 1);
+    };
+    remove(source?.edges.outgoing);
+    remove(target?.edges.incoming);
+    remove(container?.childEdges);
+    edge.element?.remove();
+    edge.ghostElement?.remove();
+  }
+
   createContainer(parentContainer, className) {
     parentContainer.svg.selectAll("*").remove();
 
@@ -685,6 +902,29 @@ export class Dashboard {
   }
 
   createDashboard(dashboard, container, displayChangeCallback = null) {
+    // Hash before node constructors fill in defaults on the data
+    this.layoutHash = structureHash(dashboard);
+    this.dataVersion = dataVersion(dashboard);
+    const precomputed = resolvePrecomputedLayout(dashboard, this.layoutHash);
+    this.usesPrecomputedLayout = !!precomputed;
+    const compiledIndex = resolveDataIndex(dashboard);
+    this.usesCompiledIndex = !!compiledIndex;
+    this.nodeIndex = new NodeIndex(compiledIndex);
+    this.chunkLoader?.dispose();
+    this.chunkLoader = null;
+    if (dashboard.chunked) {
+      if (dashboard.chunked.version === CHUNK_FORMAT_VERSION) {
+        this.chunkLoader = new ChunkLoader(this, dashboard.chunked);
+        this.chunkLoader.registerStubs(dashboard.nodes);
+      } else {
+        console.warn('createDashboard: Unsupported chunked data version', dashboard.chunked.version);
+      }
+    }
+    return withNodeIndex(this.nodeIndex, () => withPrecomputedLayout(precomputed,
+      () => this.createDashboardNodes(dashboard, container, displayChangeCallback)));
+  }
+
+  createDashboardNodes(dashboard, container, displayChangeCallback = null) {
     
     createMarkers(container);
 
@@ -843,6 +1083,7 @@ export class Dashboard {
   }
 
   onMainDisplayChange() {
+    markLayoutPending();
     if (this._displayChangeScheduled) return;
     this._displayChangeScheduled = true;
 
@@ -851,6 +1092,8 @@ export class Dashboard {
       try { this.zoomManager.handleLayoutChange(); } catch {}
       // Ensure DOM hierarchy is consistent with logical parent/child relationships
       try { this.enforceDomHierarchy(); } catch {}
+      // Load the chunks of stubs that were just expanded (chunked data)
+      try { this.chunkLoader?.check(); } catch {}
       if (this.minimap.svg) {
         try {
           this.minimap.update();
@@ -902,9 +1145,19 @@ export class Dashboard {
       }
 
       this._displayChangeScheduled = false;
+      scheduleSettle(this, () => this.onLayoutSettled());
     });
   }
 
+  // Called once display changes have been quiet for a moment. The initial
+  // fit is applied synchronously by ZoomManager.handleLayoutChange, so the
+  // zoom-to-root is complete as soon as the layout has settled.
+  onLayoutSettled() {
+    markLayoutSettled();
+    this.hasPerformedInitialZoomToRoot = true;
+    markZoomSettled();
+  }
+
   enforceDomHierarchy() {
     try {
       if (!this.main?.root) return;
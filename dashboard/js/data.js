@@ -1,5 +1,11 @@
+import { chunkBaseUrl } from "./chunkedData.js";
 
 export  function fetchDashboardFile(selectedFile) {
-    const graphData =  d3.json(`data/${selectedFile}`);
+    const url = `data/${selectedFile}`;
+    const graphData =  d3.json(url).then(data => {
+        // Chunked data (tools/split_data.py): chunks are resolved next to the manifest
+        if (data?.chunked) data.chunked.baseUrl = chunkBaseUrl(url);
+        return data;
+    });
     return graphData;
 }
\ No newline at end of file
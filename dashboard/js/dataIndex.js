@@ -0,0 +1,118 @@
+// Lookup index for dashboard nodes, seeded by the `index` section that
+// tools/compile_data.py writes into dashboard data files.
+//
+// The compiled section holds datasetId -> node ids. It is only trusted when its
+// version and the fingerprint of the node tree match the data. Every node created
+// for the dashboard registers itself in the NodeIndex, so getNode and
+// getNodesByDatasetId no longer walk the tree; without a (valid) compiled section
+// the dataset lookup is built from the registered nodes instead.
+
+export const INDEX_VERSION = 2;
+
+// Index of the dashboard currently being created (see withNodeIndex)
+let activeIndex = null;
+
+/**
+ * FNV-1a hash of the node tree: per node (depth-first) its depth, id, datasetId and
+ * number of children. Mirrored by data_fingerprint() in tools/compile_data.py.
+ * Must be called before nodes are created, because containers add role children to the data.
+ */
+export function dataFingerprint(nodes) {
+  let hash = 0x811c9dc5;
+  const visit = (list, depth) => {
+    for (const node of list || []) {
+      const line = `${depth}\t${node.id}\t${node.datasetId ?? ''}\t${(node.children || []).length}\n`;
+      for (let i = 0; i < line.length; i++) {
+        hash = Math.imul(hash ^ line.charCodeAt(i), 0x01000193) >>> 0;
+      }
+      visit(node.children, depth + 1);
+    }
+  };
+  visit(nodes, 0);
+  return hash.toString(16).padStart(8, '0');
+}
+
+/** The compiled index section of the data, or null when missing or stale */
+export function resolveDataIndex(dashboardData) {
+  const index = dashboardData?.index;
+  if (!index || index.version !== INDEX_VERSION) return null;
+  if (index.fingerprint !== dataFingerprint(dashboardData.nodes)) return null;
+  return index;
+}
+
+/** Run fn (node creation) with the given index receiving the created nodes */
+export function withNodeIndex(index, fn) {
+  const previous = activeIndex;
+  activeIndex = index;
+  try {
+    return fn();
+  } finally {
+    activeIndex = previous;
+  }
+}
+
+/** Index of the dashboard being created, for nodes without a parent */
+export function currentNodeIndex() {
+  return activeIndex;
+}
+
+const has = (object, key) => !!object && Object.prototype.hasOwnProperty.call(object, key);
+
+export class NodeIndex {
+  constructor(compiled = null) {
+    this.compiled = compiled;
+    // Ids of the nodes the compiled dataset lookup covers
+    this.compiledIds = new Set(Object.values(compiled?.datasets || {}).flat().map(String));
+    this.nodes = new Map();
+    // datasetId -> nodes not covered by the compiled section (all nodes without one)
+    this.datasets = new Map();
+  }
+
+  register(node) {
+    const key = String(node.id);
+    if (this.nodes.has(key)) return; // first wins, like the depth-first tree walk
+    this.nodes.set(key, node);
+    if (this.compiledIds.has(key)) return;
+    const datasetId = node.data?.datasetId;
+    if (datasetId === undefined || datasetId === null) return;
+    const datasetKey = String(datasetId);
+    if (!this.datasets.has(datasetKey)) this.datasets.set(datasetKey, []);
+    this.datasets.get(datasetKey).push(node);
+  }
+
+  unregister(node) {
+    const key = String(node.id);
+    if (this.nodes.get(key) === node) this.nodes.delete(key);
+    const datasetId = node.data?.datasetId;
+    if (datasetId === undefined || datasetId === null) return;
+    const datasetKey = String(datasetId);
+    const nodes = (this.datasets.get(datasetKey) || []).filter((other) => other !== node);
+    if (nodes.length > 0) this.datasets.set(datasetKey, nodes);
+    else this.datasets.delete(datasetKey);
+  }
+
+  /** Stop trusting the compiled section (the data was patched); look-ups use the registered nodes */
+  dropCompiled() {
+    if (!this.compiled) return;
+    const nodes = [...this.nodes.values()];
+    this.compiled = null;
+    this.compiledIds.clear();
+    this.nodes.clear();
+    this.datasets.clear();
+    nodes.forEach((node) => this.register(node));
+  }
+
+  get(nodeId) {
+    return this.nodes.get(String(nodeId)) || null;
+  }
+
+  getByDatasetId(datasetId) {
+    const key = String(datasetId);
+    const nodes = [];
+    for (const id of (has(this.compiled?.datasets, key) ? this.compiled.datasets[key] : [])) {
+      const node = this.nodes.get(String(id));
+      if (node) nodes.push(node);
+    }
+    return nodes.concat(this.datasets.get(key) || []);
+  }
+}
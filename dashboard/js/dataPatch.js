@@ -0,0 +1,166 @@
+// Structural patches between versions of dashboard data, computed by tools/data_patch.py.
+//
+// A patch is keyed by node id:
+//   { version, from, to, removed: [id], added: [{ parent, index, node }],
+//     moved: [{ id, parent, index }], updated: [{ id, set, unset }],
+//     edges: { removed: [[source, target]], added: [edge] }, settings? }
+// `from` and `to` are data versions (dataVersion below). applyDataPatch applies a
+// patch to the data tree and reports what changed, so Dashboard.applyPatch only
+// re-renders the affected containers and edges. connectDataSync polls the patch
+// service (data_patch.py serve) and falls back to a full reload when a patch does
+// not fit.
+
+import { canonical, hash53 } from "./precomputedLayout.js";
+import { fetchDashboardFile } from "./data.js";
+
+export const PATCH_VERSION = 1;
+
+/**
+ * Version of the nodes and edges of dashboard data; mirrors data_version() in
+ * tools/data_patch.py. Patches do not keep the order of edges, so the sorted edge
+ * hashes are hashed. Must be called before nodes are created, because node
+ * constructors fill in defaults on the data.
+ */
+export function dataVersion(dashboardData) {
+  const edges = (dashboardData?.edges || []).map((edge) => hash53(canonical(edge))).sort();
+  return hash53(canonical([dashboardData?.nodes || [], edges]));
+}
+
+const endpointId = (end) => String(end !== null && typeof end === 'object' ? end.id : end);
+
+/** Source and target id of edge data, as used to key edges in patches */
+export function edgeEndpoints(edgeData) {
+  return [endpointId(edgeData.source), endpointId(edgeData.target)];
+}
+
+function indexDataTree(nodes) {
+  const entries = new Map();
+  const visit = (list, parent) => {
+    for (const node of list || []) {
+      const key = String(node.id);
+      if (!entries.has(key)) entries.set(key, { node, parent });
+      visit(node.children, key);
+    }
+  };
+  visit(nodes, null);
+  return entries;
+}
+
+/**
+ * Apply a patch to dashboard data in place.
+ * @returns {{parents: Set<string|null>, recreated: Set<object>, statuses: Array<[object, string]>, edges: object[]}}
+ *   ids of the containers whose children changed (null for the top level), the node data
+ *   that has to be rendered again, status-only updates and the added edge data
+ * @throws when the patch refers to nodes the data does not have; the data is not modified then
+ */
+export function applyDataPatch(dashboardData, patch) {
+  const entries = indexDataTree(dashboardData.nodes);
+  const entry = (id) => {
+    const found = entries.get(String(id));
+    if (!found) throw new Error(`Unknown node ${id}`);
+    return found;
+  };
+  patch.removed.forEach(entry);
+  patch.updated.forEach((update) => entry(update.id));
+  for (const op of [...patch.moved, ...patch.added]) {
+    if (op.parent !== null && op.parent !== undefined) entry(op.parent);
+  }
+  patch.moved.forEach((move) => entry(move.id));
+
+  const changes = { parents: new Set(), recreated: new Set(), statuses: [], edges: structuredClone(patch.edges.added) };
+  const siblings = (parent) => {
+    if (parent === null || parent === undefined) return dashboardData.nodes;
+    const node = entry(parent).node;
+    node.children ??= [];
+    return node.children;
+  };
+  const detach = (id) => {
+    const { node, parent } = entry(id);
+    const list = siblings(parent);
+    list.splice(list.indexOf(node), 1);
+    changes.parents.add(parent);
+    return node;
+  };
+
+  patch.removed.forEach(detach);
+  const inserts = patch.moved.map((move) => [move.index, move.parent, detach(move.id)]);
+  for (const add of patch.added) inserts.push([add.index, add.parent, structuredClone(add.node)]);
+
+  for (const update of patch.updated) {
+    const { node, parent } = entry(update.id);
+    const set = update.set || {};
+    for (const field of update.unset || []) delete node[field];
+    for (const [field, value] of Object.entries(set)) {
+      if (field === 'children' && node.children?.length) continue; // only ever sets an empty list
+      node[field] = structuredClone(value);
+    }
+    const fields = [...Object.keys(set), ...(update.unset || [])].filter((field) => field !== 'children');
+    if (fields.length === 1 && fields[0] === 'state') {
+      changes.statuses.push([node, set.state]);
+    } else if (fields.length > 0) {
+      changes.recreated.add(node);
+      changes.parents.add(parent);
+    }
+  }
+
+  // Ascending final positions: every insert lands between siblings that are already in place
+  inserts.sort((a, b) => a[0] - b[0]);
+  for (const [index, parent, node] of inserts) {
+    siblings(parent).splice(index, 0, node);
+    changes.parents.add(parent === undefined ? null : String(parent));
+  }
+
+  const removedEdges = new Set(patch.edges.removed.map(([source, target]) => `${source}\u0000${target}`));
+  dashboardData.edges = (dashboardData.edges || [])
+    .filter((edge) => !removedEdges.has(edgeEndpoints(edge).join('\u0000')));
+  dashboardData.edges.push(...changes.edges);
+  return changes;
+}
+
+/**
+ * Keep a dashboard in sync with a data file through the patch service
+ * (tools/data_patch.py serve). Every interval the patch from the shown version to the
+ * current one is requested and applied; when the service no longer knows the shown
+ * version or the patch does not fit, the full file is loaded with setData instead.
+ */
+export function connectDataSync(dashboard, file, url = 'http://localhost:8011', { intervalMs = 60000, onPatch, onReload, onError } = {}) {
+  let timer = null;
+  let closed = false;
+
+  const reload = async () => {
+    const data = await fetchDashboardFile(file);
+    dashboard.setData(data);
+    if (onReload) onReload(data);
+  };
+
+  const sync = async () => {
+    clearTimeout(timer);
+    try {
+      const query = `file=${encodeURIComponent(file)}&from=${encodeURIComponent(dashboard.dataVersion ?? '')}`;
+      const response = await fetch(`${url}/patch?${query}`, { cache: 'no-store' });
+      if (response.status === 409) {
+        await reload();
+      } else if (!response.ok) {
+        throw new Error(`HTTP ${response.status}`);
+      } else {
+        const { patch } = await response.json();
+        if (patch && !dashboard.applyPatch(patch)) await reload();
+        else if (patch && onPatch) onPatch(patch);
+      }
+    } catch (e) {
+      if (onError) onError(e);
+      else console.warn('connectDataSync: Sync failed', e);
+    } finally {
+      if (!closed) timer = setTimeout(sync, intervalMs);
+    }
+  };
+
+  timer = setTimeout(sync, intervalMs);
+  return {
+    sync,
+    close() {
+      closed = true;
+      clearTimeout(timer);
+    },
+  };
+}
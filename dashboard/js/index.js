@@ -1,6 +1,11 @@
 // Public API aggregator for flowdash
 import * as dashboard from './dashboard.js';
 import * as data from './data.js';
+import * as statusStream from './statusStream.js';
+import * as precomputedLayout from './precomputedLayout.js';
+import * as dataIndex from './dataIndex.js';
+import * as chunkedData from './chunkedData.js';
+import * as dataPatch from './dataPatch.js';
 import { showLoading } from './loadingOverlay.js';
 
 // Provide a function to show loading when dashboard starts loading
@@ -13,11 +18,21 @@ if (typeof window !== 'undefined') {
 const api = {
   ...dashboard,
   ...data,
+  ...statusStream,
+  ...precomputedLayout,
+  ...dataIndex,
+  ...chunkedData,
+  ...dataPatch,
 };
 
 // Named re-exports for tree-shaking/named imports
 export * from './dashboard.js';
 export * from './data.js';
+export * from './statusStream.js';
+export * from './precomputedLayout.js';
+export * from './dataIndex.js';
+export * from './chunkedData.js';
+export * from './dataPatch.js';
 
 // Attach to global for non-module usage
 if (typeof window !== 'undefined') {
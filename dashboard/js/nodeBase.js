@@ -3,6 +3,8 @@ import { EventManager } from "./eventManager.js";
 import { StatusManager } from "./statusManager.js";
 import { ConfigManager } from "./configManager.js";
 import { ZoneManager } from "./zones/index.js";
+import { lookupPrecomputed } from "./precomputedLayout.js";
+import { currentNodeIndex } from "./dataIndex.js";
 
 export const NodeStatus = Object.freeze({
   UNDETERMINED: 'Undetermined',
@@ -38,6 +40,10 @@ export default class BaseNode {
 
     this.id = nodeData.id;
 
+    // Register for constant-time lookups (see dataIndex.js)
+    this.nodeIndex = parentNode ? parentNode.nodeIndex : currentNodeIndex();
+    this.nodeIndex?.register(this);
+
     this.edges = {
       incoming: [],
       outgoing: [],
@@ -49,9 +55,12 @@ export default class BaseNode {
     this.zoneManager = null;
     this._updatingCollapseState = false;
 
+    // Baked geometry from a precomputed layout (see precomputedLayout.js), if any
+    this.precomputed = lookupPrecomputed(nodeData);
+
     // Set default values for x, y, width, and height
-    this.x ??= 0;
-    this.y ??= 0;
+    this.x ??= this.precomputed?.x ?? 0;
+    this.y ??= this.precomputed?.y ?? 0;
     this.data.width ??= 60;
     this.data.height ??= 60;
   }
@@ -101,6 +110,9 @@ export default class BaseNode {
       this.element.attr("status", value);
     }
 
+    // Rolled-up statuses (setStatusWithoutCascade) leave ancestors and collapse state alone
+    if (this._statusOnly) return;
+
     // Auto collapse/expand based on status when enabled, avoiding re-entrancy
     // Only containers should auto-toggle collapsed state
     if (this.isContainer && this.settings.toggleCollapseOnStatusChange && !this._updatingCollapseState) {
@@ -152,6 +164,20 @@ export default class BaseNode {
     }
   }
 
+  /**
+   * Set the status without auto collapse/expand and without the cascade to ancestors,
+   * for statuses whose container rollup and collapse decisions are applied separately
+   * (Dashboard.applyStatusBatch with server rollups). Subclass status styling still runs.
+   */
+  setStatusWithoutCascade(value) {
+    this._statusOnly = true;
+    try {
+      this.status = value;
+    } finally {
+      this._statusOnly = false;
+    }
+  }
+
   get selected() {
     return this._selected;
   }
@@ -411,10 +411,25 @@ export default class BaseContainerNode extends BaseNode {
     this.suspenseDisplayChange = false;
   }
 
+  /** Whether node is this container or one of its descendants */
+  containsNode(node) {
+    for (let current = node; current; current = current.parentNode) {
+      if (current === this) return true;
+    }
+    return false;
+  }
+
   getNode(nodeId) {
     if (this.id == nodeId) {
       return this;
     }
+    if (this.nodeIndex) {
+      // Every node of the dashboard is registered on creation
+      const indexed = this.nodeIndex.get(nodeId);
+      if (!indexed) return null;
+      if (this.containsNode(indexed)) return indexed;
+      // Registered elsewhere in the tree: a duplicate id may still live in this subtree
+    }
     for (const childNode of this.childNodes) {
       const foundNode = childNode.getNode(nodeId);
       if (foundNode) {
@@ -425,6 +440,9 @@ export default class BaseContainerNode extends BaseNode {
   }
 
   getNodesByDatasetId(datasetId) {
+    if (this.nodeIndex) {
+      return this.nodeIndex.getByDatasetId(datasetId).filter((node) => this.containsNode(node));
+    }
     var nodes = [];
     if (this.data.datasetId == datasetId) {
       nodes.push(this);
@@ -618,7 +636,8 @@ export default class BaseContainerNode extends BaseNode {
     this.element.attr("transform", `translate(${this.x}, ${this.y})`);
 
     // Post-initialization: defer one re-measure to stabilize header width after fonts/styles
-    if (!this._didPostInitMeasure) {
+    // (not needed when the header width comes from a precomputed layout)
+    if (!this._didPostInitMeasure && !Number.isFinite(this.precomputed?.headerWidth)) {
       this._didPostInitMeasure = true;
       setTimeout(() => {
         try {
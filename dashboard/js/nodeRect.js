@@ -1,5 +1,6 @@
 import BaseNode from "./nodeBase.js";
 import { getTextWidth } from "./utils.js";
+import { lookupPrecomputed } from "./precomputedLayout.js";
 
 export default class RectangularNode extends BaseNode {
   constructor(nodeData, parentElement, settings, parentNode = null) {
@@ -7,8 +8,12 @@ export default class RectangularNode extends BaseNode {
     
     // Check layout mode
     const layoutMode = nodeData.layout?.layoutMode || 'default';
+    const baked = lookupPrecomputed(nodeData);
     
-    if (layoutMode === 'auto-size') {
+    if (Number.isFinite(baked?.width)) {
+      // Precomputed layout: width was already measured offline
+      nodeData.width = baked.width;
+    } else if (layoutMode === 'auto-size') {
       // For auto-size, calculate width based on text
       const textWidth = getTextWidth(nodeData.label);
       nodeData.width = Math.max(textWidth + 20, 60); // Minimum width of 60
@@ -127,6 +132,15 @@ export default class RectangularNode extends BaseNode {
       return;
     }
     
+    // Precomputed layout: reuse the label as displayed when it was baked at this width
+    const baked = this.precomputed;
+    if (baked && typeof baked.labelText === 'string' && baked.width === this.data.width) {
+      this.label.text(baked.labelText);
+      if (baked.labelText === text) this.removeTooltip();
+      else this.addTooltip(text);
+      return;
+    }
+
     // Check if text needs truncation
     const textWidth = getTextWidth(text);
     if (textWidth <= maxWidth) {
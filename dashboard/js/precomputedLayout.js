@@ -0,0 +1,147 @@
+// Precomputed layouts baked into dashboard data files by tools/precompute_layout.py.
+//
+// A data file may carry a `precomputedLayout` section:
+//   { version, structureHash, generatedAt, themes: { <theme>: { nodes: { <id>: {...} } } } }
+// with per node the settled x/y/width/height and the text measurements (header
+// width and text height for containers, displayed label for rectangular nodes).
+// It is only trusted when the version and the structure hash of the data match and
+// the current theme has been baked; nodes then reuse the baked geometry instead of
+// measuring text in the DOM. Anything else falls back to the normal layout.
+
+export const LAYOUT_VERSION = 1;
+
+// Settings that change node geometry; part of the structure hash
+const GEOMETRY_SETTINGS = [
+  'containerMargin', 'fontFamily', 'fontSize', 'headerText',
+  'headerTextMaxWidth', 'headerTextMinWidth', 'headerTextMode', 'nodeSpacing',
+];
+
+// Layout of the dashboard currently being created (see withPrecomputedLayout)
+let activeNodes = null;
+
+export function canonical(value) {
+  if (value === null || value === undefined) return 'null';
+  if (Array.isArray(value)) return `[${value.map(canonical).join(',')}]`;
+  if (typeof value === 'object') {
+    return `{${Object.keys(value).sort()
+      .filter((key) => value[key] !== undefined)
+      .map((key) => `${JSON.stringify(key)}:${canonical(value[key])}`)
+      .join(',')}}`;
+  }
+  if (typeof value === 'string') return JSON.stringify(value);
+  return String(value);
+}
+
+// 53-bit string hash (cyrb53); collisions only matter as far as detecting stale layouts
+// and data versions (dataPatch.js)
+export function hash53(text, seed = 0) {
+  let h1 = 0xdeadbeef ^ seed;
+  let h2 = 0x41c6ce57 ^ seed;
+  for (let i = 0; i < text.length; i++) {
+    const ch = text.charCodeAt(i);
+    h1 = Math.imul(h1 ^ ch, 2654435761);
+    h2 = Math.imul(h2 ^ ch, 1597334677);
+  }
+  h1 = Math.imul(h1 ^ (h1 >>> 16), 2246822507);
+  h1 ^= Math.imul(h2 ^ (h2 >>> 13), 3266489909);
+  h2 = Math.imul(h2 ^ (h2 >>> 16), 2246822507);
+  h2 ^= Math.imul(h1 ^ (h1 >>> 13), 3266489909);
+  return (4294967296 * (2097151 & h2) + (h1 >>> 0)).toString(16).padStart(14, '0');
+}
+
+/**
+ * Hash of everything that determines the layout: the node tree (ids, types, labels,
+ * layout options, explicit sizes, child order) and the geometry settings.
+ * Statuses and edges are not part of it. Must be called before nodes are created,
+ * because node constructors fill in defaults on the data.
+ */
+export function structureHash(dashboardData) {
+  const settings = dashboardData?.settings || {};
+  const lines = [`v${LAYOUT_VERSION}`, canonical(GEOMETRY_SETTINGS.map((key) => settings[key]))];
+  const visit = (nodes, depth) => {
+    for (const node of nodes || []) {
+      lines.push(`${depth}\t${canonical([
+        node.id, String(node.type ?? '').toLowerCase(), node.label ?? null, node.layout ?? null,
+        node.collapsed ?? false, node.width ?? null, node.height ?? null, (node.children || []).length,
+      ])}`);
+      visit(node.children, depth + 1);
+    }
+  };
+  visit(dashboardData?.nodes, 0);
+  return hash53(lines.join('\n'));
+}
+
+function currentTheme() {
+  try {
+    return (typeof window !== 'undefined' && window.flowdashTheme?.get?.()) || 'default';
+  } catch {
+    return 'default';
+  }
+}
+
+/**
+ * Baked node geometry for the data and current theme, or null when the data has no
+ * precomputed layout or it no longer matches.
+ */
+export function resolvePrecomputedLayout(dashboardData, hash = structureHash(dashboardData)) {
+  const layout = dashboardData?.precomputedLayout;
+  if (!layout || layout.version !== LAYOUT_VERSION || layout.structureHash !== hash) return null;
+  return layout.themes?.[currentTheme()]?.nodes || null;
+}
+
+/** Run fn (node creation and init) with the given baked geometry available to nodes */
+export function withPrecomputedLayout(nodes, fn) {
+  const previous = activeNodes;
+  activeNodes = nodes;
+  try {
+    return fn();
+  } finally {
+    activeNodes = previous;
+  }
+}
+
+/** Baked geometry for a node's data while its dashboard is being created, or null */
+export function lookupPrecomputed(nodeData) {
+  if (!activeNodes || !nodeData || nodeData.id === undefined) return null;
+  return Object.prototype.hasOwnProperty.call(activeNodes, nodeData.id) ? activeNodes[nodeData.id] : null;
+}
+
+const round = (value) => Math.round(value * 100) / 100;
+
+/**
+ * Collect the settled geometry of a rendered dashboard in the precomputedLayout format.
+ * Text measurements are only recorded for rendered (not hidden) nodes, because hidden
+ * SVG text cannot be measured.
+ */
+export function extractLayout(dashboard) {
+  const root = dashboard?.main?.root;
+  if (!root) return null;
+  const nodes = {};
+  const visit = (node) => {
+    if (!node || Object.prototype.hasOwnProperty.call(nodes, node.id)) return; // first wins, like getNode
+    const entry = {
+      x: round(node.x || 0),
+      y: round(node.y || 0),
+      width: round(node.data.width || 0),
+      height: round(node.data.height || 0),
+    };
+    const header = node.zoneManager?.headerZone;
+    const headerText = header?.textElement?.node?.();
+    if (headerText && headerText.getComputedTextLength() > 0) {
+      entry.headerWidth = header.recalculateMinWidth();
+      entry.headerTextHeight = round(header.calculateTextHeight());
+    }
+    if (!node.isContainer && node.label && typeof node.label.text === 'function') {
+      entry.labelText = node.label.text();
+    }
+    nodes[node.id] = entry;
+    (node.childNodes || []).forEach(visit);
+  };
+  visit(root);
+  return {
+    version: LAYOUT_VERSION,
+    structureHash: dashboard.layoutHash ?? null,
+    theme: currentTheme(),
+    nodes,
+  };
+}
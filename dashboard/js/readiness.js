@@ -0,0 +1,68 @@
+// Render readiness signal for automation (theme capture scripts, tests)
+// Publishes window.flowdashReadiness so external drivers can wait for a settled
+// render instead of sleeping for a fixed amount of time.
+
+const SETTLE_MS = 250;
+
+function getState() {
+  if (typeof window === 'undefined') return null;
+  if (!window.flowdashReadiness) {
+    window.flowdashReadiness = {
+      generation: 0,
+      layout: false,
+      zoom: false,
+      // True when layout and zoom are settled and, if given, the theme CSS is applied
+      isReady(theme = null) {
+        if (!this.layout || !this.zoom) return false;
+        if (!theme) return true;
+        const themeApi = window.flowdashTheme;
+        return !!(themeApi && typeof themeApi.isReady === 'function' && themeApi.isReady(theme));
+      }
+    };
+  }
+  return window.flowdashReadiness;
+}
+
+function dispatch(name, detail) {
+  try { window.dispatchEvent(new CustomEvent(name, { detail })); } catch {}
+}
+
+// Called when a (re)render starts; clears the ready flags
+export function resetReadiness() {
+  const state = getState();
+  if (!state) return;
+  state.generation += 1;
+  state.layout = false;
+  state.zoom = false;
+}
+
+// Called on every display change; readiness is withheld until it settles again
+export function markLayoutPending() {
+  const state = getState();
+  if (state) state.layout = false;
+}
+
+export function markLayoutSettled() {
+  const state = getState();
+  if (!state || state.layout) return;
+  state.layout = true;
+  dispatch('flowdash:layoutsettled', { generation: state.generation });
+}
+
+export function markZoomSettled() {
+  const state = getState();
+  if (!state || state.zoom) return;
+  state.zoom = true;
+  dispatch('flowdash:zoomsettled', { generation: state.generation });
+  if (state.layout) dispatch('flowdash:ready', { generation: state.generation });
+}
+
+// Debounced settle detection: the layout counts as settled once no display
+// change has been reported for SETTLE_MS.
+export function scheduleSettle(owner, onSettled) {
+  if (owner._settleTimer) clearTimeout(owner._settleTimer);
+  owner._settleTimer = setTimeout(() => {
+    owner._settleTimer = null;
+    onSettled();
+  }, SETTLE_MS);
+}
@@ -0,0 +1,64 @@
+// Live status updates pushed by tools/status_push.py over Server-Sent Events.
+// Batches arriving between two animation frames are merged (last status wins)
+// and applied with a single Dashboard.applyStatusBatch call per frame.
+// When the server rolls up container statuses (--rollup), the container statuses
+// and collapse decisions it sends are applied as well, and node statuses no longer
+// cascade in the browser. Such a server includes them in the snapshot it sends first.
+
+export function connectStatusStream(dashboard, url = 'http://localhost:8010/events', { onBatch, onError } = {}) {
+  if (typeof EventSource === 'undefined') {
+    console.warn('connectStatusStream: EventSource is not available in this environment');
+    return { close() {} };
+  }
+
+  const source = new EventSource(url);
+  let pendingNodes = {};
+  let pendingDatasets = {};
+  let pendingContainers = {};
+  let pendingCollapsed = {};
+  let frame = null;
+  let lastSeq = 0;
+  let rolledUp = false;
+
+  const flush = () => {
+    frame = null;
+    const batch = { nodes: pendingNodes, datasets: pendingDatasets, containers: pendingContainers, collapsed: pendingCollapsed, rolledUp };
+    pendingNodes = {};
+    pendingDatasets = {};
+    pendingContainers = {};
+    pendingCollapsed = {};
+    const applied = dashboard.applyStatusBatch(batch);
+    if (onBatch) onBatch({ ...batch, applied, seq: lastSeq });
+  };
+
+  source.addEventListener('status', (event) => {
+    let batch;
+    try {
+      batch = JSON.parse(event.data);
+    } catch (e) {
+      console.warn('connectStatusStream: Ignoring malformed batch', e);
+      return;
+    }
+    Object.assign(pendingNodes, batch.n);
+    Object.assign(pendingDatasets, batch.d);
+    Object.assign(pendingContainers, batch.c);
+    Object.assign(pendingCollapsed, batch.x);
+    if (batch.c || batch.x) rolledUp = true;
+    lastSeq = batch.seq ?? lastSeq;
+    if (frame === null) frame = requestAnimationFrame(flush);
+  });
+
+  source.onerror = (event) => {
+    // EventSource reconnects on its own; the server resends the full state on connect
+    if (onError) onError(event);
+  };
+
+  return {
+    source,
+    close() {
+      source.close();
+      if (frame !== null) cancelAnimationFrame(frame);
+      frame = null;
+    },
+  };
+}
@@ -55,6 +55,25 @@
   }
 
   let currentTheme = null;
+  let readyTheme = null;
+  function markThemeReady(themeName){
+    if(currentTheme !== themeName) return;
+    readyTheme = themeName;
+    try{ window.dispatchEvent(new CustomEvent('flowdash:themeready', { detail: { theme: themeName } })); }catch{}
+  }
+  // Resolve readiness once the theme stylesheet is loaded and a frame has been styled with it
+  function watchThemeLoad(themeName){
+    readyTheme = null;
+    const done = ()=> requestAnimationFrame(()=> markThemeReady(themeName));
+    const link = document.head.querySelector(`link[data-flowdash-theme="${themeName}"]`);
+    if(!link){ done(); return; }
+    let loaded = false;
+    try{ loaded = !!(link.sheet && link.sheet.cssRules); }catch{ loaded = !!link.sheet; }
+    if(loaded){ done(); return; }
+    link.addEventListener('load', done, { once:true });
+    link.addEventListener('error', done, { once:true });
+  }
+
   function setTheme(themeName, { persist = true, broadcast = true } = {}){
     if(!KNOWN_THEMES.includes(themeName)) return;
     const links = document.head.querySelectorAll('link[data-flowdash-theme]');
@@ -62,6 +81,7 @@
     document.documentElement.setAttribute('data-theme', themeName);
     if(persist){ try{ localStorage.setItem(STORAGE_KEY, themeName); }catch{} }
     currentTheme = themeName;
+    watchThemeLoad(themeName);
     if(broadcast){
       try{ window.dispatchEvent(new CustomEvent('flowdash:themechange', { detail: { theme: themeName } })); }catch{}
     }
@@ -118,6 +138,7 @@
     list: listThemes,
     get: ()=> currentTheme,
     set: (t)=> setTheme(t),
+    isReady: (t)=> readyTheme !== null && readyTheme === currentTheme && (!t || t === readyTheme),
     toggle: toggleTheme,
     onChange: (cb)=> window.addEventListener('flowdash:themechange', (e)=> cb(e.detail.theme))
   };
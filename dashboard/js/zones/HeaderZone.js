@@ -228,6 +228,14 @@ export class HeaderZone extends BaseZone {
       return this._cachedMinWidth.value;
     }
 
+    // First measurement of a node with a precomputed layout: use the baked width
+    const bakedWidth = this.node?.precomputed?.headerWidth;
+    if (!this._usedBakedWidth && Number.isFinite(bakedWidth)) {
+      this._usedBakedWidth = true;
+      this._cachedMinWidth = { key: cacheKey, value: bakedWidth, timestamp: Date.now() };
+      return bakedWidth;
+    }
+
     // Calculate text width more efficiently
     let textWidth = 0;
     try {
@@ -416,6 +424,9 @@ export class HeaderZone extends BaseZone {
     
     const text = this.node.data.label || this.node.data.name || '';
     if (!text) return this.minHeight;
+
+    const bakedHeight = this.node.precomputed?.headerTextHeight;
+    if (Number.isFinite(bakedHeight)) return bakedHeight;
     
     try {
       // Try to create temporary element to measure text height
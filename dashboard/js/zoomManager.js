@@ -98,6 +98,7 @@ export class ZoomManager {
     if (this.dashboard.minimap?.active) {
       this.dashboard.minimap.scheduleUpdate(event.transform);
     }
+    this.dashboard.chunkLoader?.scheduleViewportCheck();
     this._syncing = false;
   }
 
@@ -112,6 +113,7 @@ export class ZoomManager {
     if (this.dashboard.minimap?.active) {
       this.dashboard.minimap.scheduleUpdate(event.transform);
     }
+    this.dashboard.chunkLoader?.scheduleViewportCheck();
     this._syncing = false;
   }
 
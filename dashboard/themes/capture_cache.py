@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Incremental capture cache for FlowDash theme previews
+
+Hashes everything a theme preview depends on (theme stylesheet, shared CSS, the
+dashboard JavaScript or bundle, the data file and the viewport) and keeps the
+hashes in a manifest next to the previews. Only themes whose hash changed, or
+whose preview is missing, need a browser.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import sys
+
+THEMES_DIR = os.path.dirname(os.path.abspath(__file__))
+DASHBOARD_DIR = os.path.dirname(THEMES_DIR)
+
+# write_atomic is shared with the data tools
+sys.path.append(os.path.join(DASHBOARD_DIR, "tools"))
+from dashboard_data import write_atomic  # noqa: E402
+
+MANIFEST_NAME = ".capture-manifest.json"
+MANIFEST_VERSION = 1
+
+
+def page_from_url(dashboard_url):
+    """Name of the dashboard page a capture URL points at, e.g. flowdash-js.html"""
+    return dashboard_url.split("?", 1)[0].rstrip("/").rsplit("/", 1)[-1]
+
+
+class CaptureCache:
+    def __init__(self, page="flowdash-js.html", data_file="theme_1.json", viewport=None,
+                 dashboard_dir=DASHBOARD_DIR, themes_dir=THEMES_DIR):
+        self.page = page
+        self.data_file = data_file
+        self.viewport = viewport or {"width": 1200, "height": 800}
+        self.dashboard_dir = dashboard_dir
+        self.themes_dir = themes_dir
+        self.manifest_path = os.path.join(themes_dir, MANIFEST_NAME)
+        self.manifest = self.load_manifest()
+        self._file_digests = {}
+
+    def load_manifest(self):
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("version") == MANIFEST_VERSION:
+                return manifest
+        except (OSError, ValueError):
+            pass
+        return {"version": MANIFEST_VERSION, "themes": {}}
+
+    def save_manifest(self):
+        data = json.dumps(self.manifest, indent=2, sort_keys=True) + "\n"
+        write_atomic(self.manifest_path, data.encode("utf-8"))
+
+    def file_digest(self, path):
+        digest = self._file_digests.get(path)
+        if digest is None:
+            h = hashlib.sha256()
+            try:
+                with open(path, "rb") as f:
+                    for chunk in iter(lambda: f.read(1 << 16), b""):
+                        h.update(chunk)
+            except OSError:
+                h.update(b"<missing>")
+            digest = self._file_digests[path] = h.hexdigest()
+        return digest
+
+    def shared_inputs(self):
+        """Inputs every theme preview depends on"""
+        d = self.dashboard_dir
+        paths = [
+            os.path.join(d, self.page),
+            os.path.join(d, "flowdash.css"),
+            os.path.join(d, "flowdash-demo.css"),
+            os.path.join(self.themes_dir, "themes.css"),
+            os.path.join(d, "js", "themeManager.js"),
+            os.path.join(d, "data", self.data_file),
+        ]
+        if "bundle" in self.page:
+            paths.append(os.path.join(d, "dist", "flowdash.min.js"))
+        else:
+            paths.extend(sorted(glob.glob(os.path.join(d, "js", "**", "*.js"), recursive=True)))
+        return paths
+
+    def theme_inputs(self, theme):
+        return [os.path.join(self.themes_dir, theme, "flowdash.css")] + self.shared_inputs()
+
+    def theme_hash(self, theme):
+        h = hashlib.sha256()
+        h.update(json.dumps({"viewport": self.viewport, "page": self.page, "data": self.data_file},
+                            sort_keys=True).encode("utf-8"))
+        for path in self.theme_inputs(theme):
+            rel = os.path.relpath(path, self.dashboard_dir).replace(os.sep, "/")
+            h.update(rel.encode("utf-8"))
+            h.update(self.file_digest(path).encode("ascii"))
+        return h.hexdigest()
+
+    def output_path(self, theme):
+        return os.path.join(self.themes_dir, theme, f"{theme}-preview.png")
+
+    def stale_themes(self, themes):
+        """Themes whose inputs changed since the last recorded capture, or whose preview is missing"""
+        stale = []
+        for theme in themes:
+            entry = self.manifest["themes"].get(theme)
+            if (entry is None or entry.get("hash") != self.theme_hash(theme)
+                    or not os.path.exists(self.output_path(theme))):
+                stale.append(theme)
+        return stale
+
+    def record(self, themes):
+        """Record the current input hashes for successfully captured themes"""
+        for theme in themes:
+            self.manifest["themes"][theme] = {
+                "hash": self.theme_hash(theme),
+                "output": os.path.relpath(self.output_path(theme), self.themes_dir).replace(os.sep, "/"),
+                "preview": self.file_digest_fresh(self.output_path(theme)),
+            }
+        self.save_manifest()
+
+    def file_digest_fresh(self, path):
+        self._file_digests.pop(path, None)
+        return self.file_digest(path)
@@ -0,0 +1,552 @@
+#!/usr/bin/env python3
+"""
+Warm capture service for FlowDash theme previews
+
+A one-shot capture pays for a browser cold start and a full dashboard load on every
+run. This service keeps a pool of warm pages with the dashboard already loaded and
+captures theme previews on request: switch the theme (after re-fetching the stylesheets,
+so edited CSS shows up), wait for the readiness signal, screenshot the demo container.
+The browser backend is pluggable: Playwright or Selenium, and only the selected one is
+imported.
+
+``capture_themes.py`` (Selenium) and ``capture_themes_playwright.py`` are one-shot
+clients: ``capture_once`` starts a service, captures the themes and closes it again.
+
+Requests are JSON lines over a local TCP socket (one JSON response line each):
+    {"cmd": "capture", "themes": ["dark"], "data_file": "theme_1.json", "output_dir": "..."}
+    {"cmd": "status"} | {"cmd": "reload"} | {"cmd": "stop"}
+The ``capture``/``status``/``reload``/``stop`` commands below send them for you.
+
+Usage:
+    python capture_service.py serve [--backend playwright|selenium] [--pages 2] [--port 8012]
+    python capture_service.py capture dark retro [--data-file theme_2.json] [--output-dir .regression]
+    python capture_service.py reload        # after changing dashboard JavaScript or data
+    python capture_service.py status
+    python capture_service.py stop
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import socket
+import sys
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from capture_cache import THEMES_DIR, write_atomic
+from render_readiness import TRANSFORM_SETTLED_SCRIPT, wait_until_ready, wait_until_ready_sync
+
+THEMES = ("light", "dark", "brutalism", "cyberpunk", "flat", "glassmorphism", "neumorphism", "retro")
+DEFAULT_URL = "http://localhost:8000/dashboard/flowdash-js.html"
+DEFAULT_PORT = 8012
+DEFAULT_VIEWPORT = {"width": 1200, "height": 800}
+DEMO_SELECTOR = ".demo-container"
+MAX_REQUEST_BYTES = 64 * 1024
+
+# In-page steps shared by the capture scripts and the service; all are function expressions
+
+APPLY_THEME_SCRIPT = """
+(theme) => {
+    if (window.flowdashTheme && typeof window.flowdashTheme.set === 'function') {
+        window.flowdashTheme.set(theme);
+        return 'theme-manager';
+    }
+    // Fallback: enable the theme stylesheet by hand
+    document.head.querySelectorAll('link[data-flowdash-theme]').forEach(link => {
+        link.disabled = link.getAttribute('data-flowdash-theme') !== theme;
+    });
+    document.documentElement.setAttribute('data-theme', theme);
+    return 'manual-css';
+}
+"""
+
+# Keep the theme selector UI out of captures
+HIDE_THEME_UI_SCRIPT = """
+() => {
+    const themeUI = document.querySelector('[data-flowdash-theme-ui="root"]');
+    if (themeUI) themeUI.style.display = 'none';
+}
+"""
+
+# One click on the zoom-out control, for a slightly smaller view than zoom-to-root
+ZOOM_OUT_SCRIPT = """
+() => {
+    const zoomOutBtn = document.getElementById('zoom-out');
+    if (zoomOutBtn) zoomOutBtn.click();
+    return !!zoomOutBtn;
+}
+"""
+
+DEMO_RECT_SCRIPT = """
+(selector) => {
+    const el = document.querySelector(selector);
+    if (!el) return null;
+    const r = el.getBoundingClientRect();
+    return { x: r.left + window.scrollX, y: r.top + window.scrollY, width: r.width, height: r.height };
+}
+"""
+
+# Re-fetch every stylesheet with a cache-busting query. Enabled sheets are swapped once the
+# new copy has loaded; disabled (theme) sheets load when enabled, which the theme manager waits for.
+REFRESH_STYLESHEETS_SCRIPT = """
+async () => {
+    const stamp = String(Date.now());
+    const links = [...document.querySelectorAll('link[rel="stylesheet"]')];
+    await Promise.all(links.map((link) => new Promise((resolve) => {
+        const url = new URL(link.getAttribute('href'), document.baseURI);
+        url.searchParams.set('v', stamp);
+        const fresh = link.cloneNode();
+        fresh.href = url.href;
+        if (link.disabled) {
+            link.replaceWith(fresh);
+            fresh.disabled = true;
+            return resolve();
+        }
+        const done = () => { link.remove(); resolve(); };
+        fresh.addEventListener('load', done, { once: true });
+        fresh.addEventListener('error', done, { once: true });
+        link.after(fresh);
+    })));
+    return links.length;
+}
+"""
+
+
+def page_url(dashboard_url, data_file, theme=None):
+    """Dashboard URL with the data file (and optionally the theme) preselected via query parameters"""
+    parts = urlsplit(dashboard_url)
+    query = dict(parse_qsl(parts.query))
+    query["file"] = data_file
+    if theme:
+        query["theme"] = theme
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def preview_path(output_dir, theme):
+    return os.path.join(output_dir, theme, f"{theme}-preview.png")
+
+
+def clip_from_rect(rect):
+    if not rect or not rect.get("width") or not rect.get("height"):
+        return None
+    return {"x": max(0, rect["x"]), "y": max(0, rect["y"]), "width": rect["width"], "height": rect["height"]}
+
+
+class PlaywrightBackend:
+    """Headless browsers (Chromium by default), one browser context per warm page
+
+    With several browsers the pages are spread round-robin over the ones that launched.
+    """
+
+    name = "playwright"
+
+    def __init__(self, browsers=("chromium",)):
+        self.browser_names = tuple(browsers) or ("chromium",)
+        self.playwright = None
+        self.browsers = []
+        self.pages = []
+
+    async def start(self, count, viewport):
+        from playwright.async_api import async_playwright
+
+        self.playwright = await async_playwright().start()
+        for name in self.browser_names:
+            try:
+                self.browsers.append(await getattr(self.playwright, name).launch(headless=True))
+            except Exception as e:
+                print(f"❌ Failed to launch {name}: {e}")
+        if not self.browsers:
+            raise RuntimeError(f"no browser launched ({', '.join(self.browser_names)})")
+        for slot in range(count):
+            context = await self.browsers[slot % len(self.browsers)].new_context(viewport=dict(viewport))
+            self.pages.append(await context.new_page())
+
+    async def goto(self, slot, url):
+        await self.pages[slot].goto(url)
+
+    async def evaluate(self, slot, script, arg=None):
+        return await self.pages[slot].evaluate(script, arg)
+
+    async def wait_ready(self, slot, theme, timeout):
+        return await wait_until_ready(self.pages[slot], theme, timeout)
+
+    async def set_viewport(self, slot, size):
+        await self.pages[slot].set_viewport_size(dict(size))
+
+    async def screenshot(self, slot, clip=None):
+        return await self.pages[slot].screenshot(clip=clip) if clip else await self.pages[slot].screenshot()
+
+    async def close(self):
+        for browser in self.browsers:
+            await browser.close()
+        if self.playwright is not None:
+            await self.playwright.stop()
+
+
+class SeleniumBackend:
+    """One headless Chrome WebDriver per warm page; blocking calls run in worker threads"""
+
+    name = "selenium"
+
+    def __init__(self):
+        self.drivers = []
+
+    async def start(self, count, viewport):
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+
+        def launch():
+            options = Options()
+            for argument in ("--headless=new", "--no-sandbox", "--disable-dev-shm-usage", "--disable-gpu",
+                             f"--window-size={viewport['width']},{viewport['height']}"):
+                options.add_argument(argument)
+            driver = webdriver.Chrome(options=options)
+            self._emulate(driver, viewport)
+            return driver
+
+        self.drivers = list(await asyncio.gather(*(asyncio.to_thread(launch) for _ in range(count))))
+
+    @staticmethod
+    def _emulate(driver, size):
+        # Exact viewport, independent of the window decorations
+        driver.execute_cdp_cmd("Emulation.setDeviceMetricsOverride",
+                               {"width": size["width"], "height": size["height"], "deviceScaleFactor": 1,
+                                "mobile": False})
+
+    async def goto(self, slot, url):
+        await asyncio.to_thread(self.drivers[slot].get, url)
+
+    async def evaluate(self, slot, script, arg=None):
+        # WebDriver awaits a returned promise, so async scripts work as with Playwright
+        return await asyncio.to_thread(self.drivers[slot].execute_script, f"return ({script})(arguments[0]);", arg)
+
+    async def wait_ready(self, slot, theme, timeout):
+        return await asyncio.to_thread(wait_until_ready_sync, self.drivers[slot], theme, timeout)
+
+    async def set_viewport(self, slot, size):
+        await asyncio.to_thread(self._emulate, self.drivers[slot], size)
+
+    async def screenshot(self, slot, clip=None):
+        params = {"format": "png"}
+        if clip:
+            params["clip"] = dict(clip, scale=1)
+        result = await asyncio.to_thread(self.drivers[slot].execute_cdp_cmd, "Page.captureScreenshot", params)
+        return base64.b64decode(result["data"])
+
+    async def close(self):
+        await asyncio.gather(*(asyncio.to_thread(driver.quit) for driver in self.drivers))
+
+
+BACKENDS = {"playwright": PlaywrightBackend, "selenium": SeleniumBackend}
+
+
+class WarmPage:
+    def __init__(self, slot, viewport):
+        self.slot = slot
+        self.viewport = dict(viewport)
+        self.data_file = None
+        self.stale = True
+        self.loads = 0
+        self.captures = 0
+
+
+class CaptureService:
+    def __init__(self, backend="playwright", dashboard_url=DEFAULT_URL, pages=2, data_file="theme_1.json",
+                 output_dir=THEMES_DIR, viewport=None, timeout=30000, refresh_css=True, backend_options=None):
+        if backend not in BACKENDS:
+            raise ValueError(f"unknown backend {backend!r} (one of {', '.join(BACKENDS)})")
+        self.backend = BACKENDS[backend](**(backend_options or {}))
+        self.dashboard_url = dashboard_url
+        self.data_file = data_file
+        self.output_dir = output_dir
+        self.viewport = dict(viewport or DEFAULT_VIEWPORT)
+        self.timeout = timeout
+        self.refresh_css = refresh_css
+        self.pages = [WarmPage(slot, self.viewport) for slot in range(max(1, pages))]
+        self.idle = list(self.pages)
+        self.available = asyncio.Condition()
+        self.stats = {"captures": 0, "failures": 0, "loads": 0, "capture_ms": 0.0}
+
+    async def start(self):
+        started = time.perf_counter()
+        await self.backend.start(len(self.pages), self.viewport)
+        await asyncio.gather(*(self.load(page, self.data_file) for page in self.pages))
+        return (time.perf_counter() - started) * 1000
+
+    async def load(self, page, data_file, theme=None):
+        """(Re)load the dashboard in a warm page and prepare the capture view"""
+        page.stale = True
+        if page.viewport != self.viewport:
+            await self.backend.set_viewport(page.slot, self.viewport)
+            page.viewport = dict(self.viewport)
+        await self.backend.goto(page.slot, page_url(self.dashboard_url, data_file, theme))
+        if not await self.backend.wait_ready(page.slot, theme, self.timeout):
+            raise RuntimeError(f"dashboard did not become ready with {data_file}")
+        await self.backend.evaluate(page.slot, HIDE_THEME_UI_SCRIPT)
+        if await self.backend.evaluate(page.slot, ZOOM_OUT_SCRIPT):
+            await self.backend.evaluate(page.slot, TRANSFORM_SETTLED_SCRIPT)
+        # Grow the viewport once when the demo container does not fit, like capture_page does
+        clip = clip_from_rect(await self.backend.evaluate(page.slot, DEMO_RECT_SCRIPT, DEMO_SELECTOR))
+        if clip:
+            size = {"width": max(page.viewport["width"], int(clip["x"] + clip["width"])),
+                    "height": max(page.viewport["height"], int(clip["y"] + clip["height"]))}
+            if size != page.viewport:
+                await self.backend.set_viewport(page.slot, size)
+                await self.backend.evaluate(page.slot, "() => window.scrollTo(0, 0)")
+                await self.backend.evaluate(page.slot, TRANSFORM_SETTLED_SCRIPT)
+                page.viewport = size
+        page.data_file = data_file
+        page.stale = False
+        page.loads += 1
+        self.stats["loads"] += 1
+
+    async def acquire(self, data_file):
+        """An idle warm page, preferably one that already shows data_file"""
+        async with self.available:
+            await self.available.wait_for(lambda: self.idle)
+            page = next((p for p in self.idle if p.data_file == data_file and not p.stale), self.idle[0])
+            self.idle.remove(page)
+            return page
+
+    async def release(self, page):
+        async with self.available:
+            self.idle.append(page)
+            self.available.notify()
+
+    async def capture(self, theme, data_file=None, output_dir=None):
+        """Capture one theme preview; returns a result dict (ok, theme, path or error, ms)"""
+        if theme not in THEMES:
+            return {"ok": False, "theme": theme, "error": f"unknown theme (one of {', '.join(THEMES)})"}
+        data_file = data_file or self.data_file
+        started = time.perf_counter()
+        page = await self.acquire(data_file)
+        try:
+            warm = not page.stale and page.data_file == data_file
+            if not warm:
+                await self.load(page, data_file, theme)
+            if self.refresh_css:
+                await self.backend.evaluate(page.slot, REFRESH_STYLESHEETS_SCRIPT)
+            await self.backend.evaluate(page.slot, APPLY_THEME_SCRIPT, theme)
+            if not await self.backend.wait_ready(page.slot, theme, self.timeout):
+                raise RuntimeError(f"theme {theme} did not become ready")
+            clip = clip_from_rect(await self.backend.evaluate(page.slot, DEMO_RECT_SCRIPT, DEMO_SELECTOR))
+            path = preview_path(output_dir or self.output_dir, theme)
+            write_atomic(path, await self.backend.screenshot(page.slot, clip))
+        except Exception as e:
+            page.stale = True  # reload before the next capture on this page
+            self.stats["failures"] += 1
+            return {"ok": False, "theme": theme, "error": str(e).splitlines()[0] if str(e) else repr(e)}
+        finally:
+            await self.release(page)
+        elapsed = (time.perf_counter() - started) * 1000
+        page.captures += 1
+        self.stats["captures"] += 1
+        self.stats["capture_ms"] += elapsed
+        return {"ok": True, "theme": theme, "path": path, "ms": round(elapsed, 1), "warm": warm}
+
+    async def capture_many(self, themes, data_file=None, output_dir=None):
+        return list(await asyncio.gather(*(self.capture(theme, data_file, output_dir) for theme in themes)))
+
+    async def reload(self):
+        """Reload every warm page, e.g. after the dashboard JavaScript or the data changed"""
+        for page in self.pages:
+            page.stale = True
+        pages = [await self.acquire(None) for _ in self.pages]
+        try:
+            await asyncio.gather(*(self.load(page, page.data_file or self.data_file) for page in pages))
+        finally:
+            for page in pages:
+                await self.release(page)
+
+    def status(self):
+        captures = self.stats["captures"]
+        return {
+            "backend": self.backend.name,
+            "url": self.dashboard_url,
+            "pages": [{"slot": p.slot, "data_file": p.data_file, "stale": p.stale, "loads": p.loads,
+                       "captures": p.captures, "viewport": p.viewport} for p in self.pages],
+            "idle": len(self.idle),
+            **self.stats,
+            "capture_ms": round(self.stats["capture_ms"], 1),
+            "mean_capture_ms": round(self.stats["capture_ms"] / captures, 1) if captures else None,
+        }
+
+    async def close(self):
+        await self.backend.close()
+
+
+async def capture_once(backend, themes, pages=1, on_capture=None, **options):
+    """Start a service, capture the themes and close it again; returns the results in theme order
+
+    options are CaptureService arguments. The pages are fresh, so stylesheets are not
+    re-fetched. on_capture(result) is called as soon as each theme is captured.
+    """
+    service = CaptureService(backend, pages=max(1, min(pages, len(themes))), refresh_css=False, **options)
+
+    async def capture(theme):
+        result = await service.capture(theme)
+        if on_capture is not None:
+            on_capture(result)
+        return result
+
+    try:
+        await service.start()
+        return list(await asyncio.gather(*(capture(theme) for theme in themes)))
+    finally:
+        await service.close()
+
+
+class CaptureServer:
+    """JSON lines over a local socket; one response line per request line"""
+
+    def __init__(self, service):
+        self.service = service
+        self.stopped = asyncio.Event()
+
+    async def handle(self, reader, writer):
+        try:
+            while not self.stopped.is_set():
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    await self.respond(writer, {"ok": False, "error": "request too large"})
+                    break
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("expected a JSON object")
+                    response = await self.dispatch(request)
+                except ValueError as e:
+                    response = {"ok": False, "error": f"bad request: {e}"}
+                except Exception as e:
+                    response = {"ok": False, "error": str(e) or repr(e)}
+                await self.respond(writer, response)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, writer, payload):
+        writer.write((json.dumps(payload) + "\n").encode("utf-8"))
+        await writer.drain()
+
+    async def dispatch(self, request):
+        command = request.get("cmd")
+        if command == "capture":
+            themes = request.get("themes") or ([request["theme"]] if request.get("theme") else list(THEMES))
+            results = await self.service.capture_many(themes, request.get("data_file"), request.get("output_dir"))
+            for r in results:
+                print(f"📸 {r['theme']}: {r['ms']} ms" if r["ok"] else f"❌ {r['theme']}: {r['error']}")
+            return {"ok": all(r["ok"] for r in results), "results": results}
+        if command == "status":
+            return {"ok": True, "status": self.service.status()}
+        if command == "reload":
+            started = time.perf_counter()
+            await self.service.reload()
+            return {"ok": True, "ms": round((time.perf_counter() - started) * 1000, 1)}
+        if command == "stop":
+            self.stopped.set()
+            return {"ok": True}
+        raise ValueError(f"unknown command {command!r}")
+
+
+async def serve(args):
+    service = CaptureService(args.backend, args.url, args.pages, args.data_file, args.output_dir,
+                             timeout=args.timeout, refresh_css=not args.no_refresh_css)
+    print(f"🔥 Warming {args.pages} {args.backend} pages with {args.url} ({args.data_file})...")
+    try:
+        warmup_ms = await service.start()
+        server = CaptureServer(service)
+        srv = await asyncio.start_server(server.handle, "127.0.0.1", args.port, limit=MAX_REQUEST_BYTES)
+        print(f"📡 Capture service ready in {warmup_ms / 1000:.1f}s on 127.0.0.1:{args.port}")
+        async with srv:
+            await server.stopped.wait()
+        print("⏹️  Capture service stopped")
+    finally:
+        await service.close()
+
+
+def send_request(port, payload, timeout=300):
+    """Send one request to a running service and return its response"""
+    with socket.create_connection(("127.0.0.1", port), timeout=timeout) as sock:
+        sock.sendall((json.dumps(payload) + "\n").encode("utf-8"))
+        buffer = b""
+        while not buffer.endswith(b"\n"):
+            chunk = sock.recv(65536)
+            if not chunk:
+                raise ConnectionError("connection closed before a response")
+            buffer += chunk
+    return json.loads(buffer)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm browser-pool capture service for FlowDash theme previews")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_cmd = commands.add_parser("serve", help="start the service and keep warm pages")
+    serve_cmd.add_argument("--backend", choices=sorted(BACKENDS), default="playwright",
+                           help="browser automation backend (default: playwright)")
+    serve_cmd.add_argument("--pages", type=int, default=2, help="warm pages kept loaded (default: 2)")
+    serve_cmd.add_argument("--url", default=DEFAULT_URL, help="dashboard page")
+    serve_cmd.add_argument("--data-file", default="theme_1.json", help="data file loaded at start (default: theme_1.json)")
+    serve_cmd.add_argument("--output-dir", default=THEMES_DIR, help="default output directory (default: dashboard/themes)")
+    serve_cmd.add_argument("--timeout", type=int, default=30000, help="readiness timeout in ms (default: 30000)")
+    serve_cmd.add_argument("--no-refresh-css", action="store_true",
+                           help="do not re-fetch stylesheets before each capture")
+    capture_cmd = commands.add_parser("capture", help="capture theme previews with the running service")
+    capture_cmd.add_argument("themes", nargs="*", help=f"themes to capture (default: all of {', '.join(THEMES)})")
+    capture_cmd.add_argument("--data-file", help="data file to capture (default: the service's)")
+    capture_cmd.add_argument("--output-dir", help="output directory (default: the service's)")
+    for name, text in (("status", "show the warm pages and timings"), ("reload", "reload all warm pages"),
+                       ("stop", "stop the service")):
+        commands.add_parser(name, help=text)
+    for command in commands.choices.values():
+        command.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"service port (default: {DEFAULT_PORT})")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        try:
+            asyncio.run(serve(args))
+        except KeyboardInterrupt:
+            print("\n⏹️  Capture service stopped")
+        return 0
+
+    payload = {"cmd": args.command}
+    if args.command == "capture":
+        unknown = [t for t in args.themes if t not in THEMES]
+        if unknown:
+            parser.error(f"unknown themes: {', '.join(unknown)} (one of {', '.join(THEMES)})")
+        payload.update(themes=args.themes or list(THEMES), data_file=args.data_file,
+                       output_dir=os.path.abspath(args.output_dir) if args.output_dir else None)
+    started = time.perf_counter()
+    try:
+        response = send_request(args.port, payload)
+    except OSError as e:
+        print(f"❌ No capture service on port {args.port} ({e}); start one with: python capture_service.py serve")
+        return 1
+    elapsed = (time.perf_counter() - started) * 1000
+
+    if args.command == "capture":
+        for r in response.get("results", []):
+            if r["ok"]:
+                print(f"✅ {r['theme']}: {r['path']} ({r['ms']} ms{'' if r['warm'] else ', page reloaded'})")
+            else:
+                print(f"❌ {r['theme']}: {r['error']}")
+        print(f"\n🎉 {sum(r['ok'] for r in response.get('results', []))}/{len(payload['themes'])} "
+              f"themes captured in {elapsed:.0f} ms")
+    elif args.command == "status" and response.get("ok"):
+        print(json.dumps(response["status"], indent=2))
+    elif response.get("ok"):
+        print(f"✅ {args.command}" + (f" ({response['ms']} ms)" if "ms" in response else ""))
+    if not response.get("ok"):
+        if "error" in response:
+            print(f"❌ {response['error']}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,217 +3,133 @@
 Theme Screenshot Capture Script for FlowDash using Playwright
 
 This script captures screenshots of the FlowDash dashboard with different themes applied.
-It uses Playwright to automate the process and save preview images for each theme.
+It is a one-shot client of the capture service (``capture_service.py``) with the
+Playwright backend: the service loads the dashboard, applies each theme and saves the
+preview images. Keep ``capture_service.py serve`` running instead for repeated captures.
 """
 
+import argparse
 import asyncio
 import os
-from playwright.async_api import async_playwright
+import sys
+from capture_cache import THEMES_DIR, CaptureCache, page_from_url
+from capture_service import DEFAULT_URL, DEFAULT_VIEWPORT, THEMES, capture_once, page_url
 
 class ThemeScreenshotCapture:
-    def __init__(self, dashboard_url="http://localhost:8000/dashboard/flowdash-js.html"):
+    def __init__(self, dashboard_url=DEFAULT_URL):
         self.dashboard_url = dashboard_url
-        self.themes = [
-            "light", "dark", "brutalism", "cyberpunk", 
-            "flat", "glassmorphism", "neumorphism", "retro"
-        ]
-        self.output_dir = "."  # Current directory since we're running from themes folder
-    
-    async def capture_theme_screenshots(self):
-        """Capture screenshots for all themes using Playwright"""
-        async with async_playwright() as p:
-            # Launch browser
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
-            
-            # Set viewport size
-            await page.set_viewport_size({"width": 1200, "height": 800})
-            
-            print("🚀 Starting theme screenshot capture...")
-            print(f"🌐 Navigating to: {self.dashboard_url}")
-            
-            # Navigate to dashboard
-            await page.goto(self.dashboard_url)
-            
-            # Wait for dashboard to load
-            try:
-                await page.wait_for_selector("#graph", timeout=30000)
-                await page.wait_for_timeout(3000)  # Additional wait for content to render
-                print("✅ Dashboard loaded successfully")
-            except Exception as e:
-                print(f"❌ Dashboard failed to load: {e}")
-                await browser.close()
-                return False
-            
-            # Capture screenshots for each theme
-            successful_captures = 0
-            for theme in self.themes:
-                print(f"\n📸 Capturing {theme} theme...")
-                
-                try:
-                    # Apply theme using the theme manager
-                    await self.apply_theme(page, theme)
-                    
-                    # Wait for theme to apply and CSS to load
-                    await page.wait_for_timeout(3000)
-                    
-                    # Capture screenshot of just the dashboard area
-                    screenshot_path = os.path.join(self.output_dir, theme, f"{theme}-preview.png")
-                    
-                    # Try to capture just the graph container area with margin
-                    try:
-                        # Wait for the demo container to be visible
-                        await page.wait_for_selector(".demo-container", timeout=5000)
-                        
-                        # Hide the theme selector UI to keep it out of captures
-                        await page.evaluate("""
-                            const themeUI = document.querySelector('[data-flowdash-theme-ui="root"]');
-                            if (themeUI) themeUI.style.display = 'none';
-                        """)
-                        
-                        # Zoom out by 1 click to get a slightly smaller view
-                        await page.evaluate("""
-                            // Try to zoom out using the dashboard's zoom controls
-                            const zoomOutBtn = document.getElementById('zoom-out');
-                            if (zoomOutBtn) {
-                                // Click zoom out once
-                                zoomOutBtn.click();
-                            }
-                        """)
-                        
-                        # Wait for zoom to settle and content to reposition
-                        await page.wait_for_timeout(2000)
-                        
-                        # Compute bounding rect from demo container after zoom
-                        demo_rect = await page.evaluate("""
-                            (selector) => {
-                                const el = document.querySelector(selector);
-                                if (!el) return null;
-                                const r = el.getBoundingClientRect();
-                                return { x: r.left + window.scrollX, y: r.top + window.scrollY, width: r.width, height: r.height };
-                            }
-                        """, ".demo-container")
-                        if demo_rect and demo_rect.get('width') and demo_rect.get('height'):
-                            # No margins – capture the demo-container exactly
-                            clip_x = max(0, demo_rect['x'])
-                            clip_y = max(0, demo_rect['y'])
-                            clip_width = demo_rect['width']
-                            clip_height = demo_rect['height']
+        self.themes = list(THEMES)
+        self.output_dir = THEMES_DIR
+        self.viewport = dict(DEFAULT_VIEWPORT)
+        self.data_file = "theme_1.json"
+        self.captured = []  # themes captured successfully in the last run
+        self.pipeline = None  # image_pipeline.PreviewPipeline that derives thumbnails while capturing
 
-                            # Ensure viewport is large enough
-                            required_height = int(clip_y + clip_height)
-                            required_width = int(clip_x + clip_width)
-                            current_viewport = { 'width': 1200, 'height': 800 }
-                            new_viewport = {
-                                'width': max(current_viewport['width'], required_width),
-                                'height': max(current_viewport['height'], required_height)
-                            }
-                            await page.set_viewport_size(new_viewport)
-                            await page.evaluate("window.scrollTo(0, 0)")
+    async def capture_theme_screenshots(self, workers=1, browsers=("chromium",)):
+        """Capture all themes in ``workers`` pages, each in its own browser context.
 
-                            clip_area = {
-                                'x': clip_x,
-                                'y': clip_y,
-                                'width': clip_width,
-                                'height': clip_height
-                            }
-                            await page.screenshot(path=screenshot_path, clip=clip_area)
-                            print(f"✅ Screenshot saved (demo-container, no margins): {screenshot_path}")
-                        else:
-                            # Fallback to full page screenshot
-                            await page.screenshot(path=screenshot_path, full_page=False)
-                            print(f"✅ Screenshot saved (full page): {screenshot_path}")
-                    except Exception as e:
-                        print(f"   Warning: Could not capture graph container, using full page: {e}")
-                        await page.screenshot(path=screenshot_path, full_page=False)
-                        print(f"✅ Screenshot saved (fallback): {screenshot_path}")
-                    
-                    successful_captures += 1
-                    
-                except Exception as e:
-                    print(f"❌ Failed to capture {theme}: {e}")
-            
-            await browser.close()
-            
-            print(f"\n🎉 Capture complete! {successful_captures}/{len(self.themes)} themes captured successfully")
-            return successful_captures == len(self.themes)
-    
-    async def apply_theme(self, page, theme_name):
-        """Apply a specific theme to the dashboard using the theme manager"""
+        Pages are spread round-robin over ``browsers``. Each theme reports its own
+        result, so a failing theme never blocks the others.
+        """
+        print(f"🚀 Starting theme screenshot capture ({workers} pages, {', '.join(browsers)})...")
+        print(f"🌐 Navigating to: {self.dashboard_url}")
         try:
-            # Use the theme manager's setTheme function
-            theme_script = f"""
-            let result = 'none';
-            
-            // Check if the theme manager is available through window.flowdashTheme
-            if (window.flowdashTheme && typeof window.flowdashTheme.set === 'function') {{
-                window.flowdashTheme.set('{theme_name}');
-                result = 'theme-manager';
-            }}
-            // Fallback: Manually enable/disable CSS links
-            else {{
-                const links = document.head.querySelectorAll('link[data-flowdash-theme]');
-                links.forEach(link => {{
-                    const themeName = link.getAttribute('data-flowdash-theme');
-                    link.disabled = themeName !== '{theme_name}';
-                }});
-                document.documentElement.setAttribute('data-theme', '{theme_name}');
-                result = 'manual-css';
-            }}
-            
-            result;
-            """
-            
-            result = await page.evaluate(theme_script)
-            print(f"   Applied theme using method: {result}")
-            
-            # Additional wait to ensure CSS is loaded
-            if result == 'theme-manager':
-                # Wait for theme change event
-                try:
-                    await page.wait_for_function(
-                        'document.documentElement.getAttribute("data-theme") === "' + theme_name + '"',
-                        timeout=5000
-                    )
-                    print(f"   Theme change confirmed: {theme_name}")
-                except:
-                    print(f"   Warning: Theme change confirmation timeout")
-            
+            results = await capture_once("playwright", self.themes, pages=workers, on_capture=self.on_capture,
+                                         dashboard_url=self.dashboard_url, data_file=self.data_file,
+                                         output_dir=self.output_dir, viewport=self.viewport,
+                                         backend_options={"browsers": tuple(browsers)})
         except Exception as e:
-            print(f"   Warning: Theme application method failed: {e}")
+            print(f"❌ Dashboard failed to load: {e}")
+            return False
+
+        successful_captures = sum(r["ok"] for r in results)
+        print(f"\n🎉 Capture complete! {successful_captures}/{len(self.themes)} themes captured successfully")
+        return successful_captures == len(self.themes)
+
+    def on_capture(self, result):
+        """Report a capture as soon as it is written and hand it to the image pipeline"""
+        if not result["ok"]:
+            print(f"❌ {result['theme']}: {result['error']}")
+            return
+        print(f"✅ {result['theme']}: {result['path']} ({result['ms']} ms)")
+        self.captured.append(result["theme"])
+        if self.pipeline is not None:
+            self.pipeline.submit(result["theme"], result["path"])
+
+    def page_url(self, theme_name=None):
+        """Dashboard URL with the data file (and optionally the theme) preselected via query parameters"""
+        return page_url(self.dashboard_url, self.data_file, theme_name)
+
+    def verify_captures(self, baseline_dir=THEMES_DIR, heatmap_dir=None):
+        """Compare this run's captures in output_dir against the baseline previews"""
+        import visual_regression
+
+        rel_paths = [f"{theme}/{theme}-preview.png" for theme in self.themes]
+        results = visual_regression.verify_captures(self.output_dir, baseline_dir, rel_paths, heatmap_dir)
+        return visual_regression.report(results)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Capture FlowDash theme previews with Playwright")
+    parser.add_argument("--concurrent", action="store_true",
+                        help="capture themes in parallel browser contexts instead of one page")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="maximum number of concurrent browser contexts (default: 4)")
+    parser.add_argument("--browsers", default="chromium",
+                        help="comma separated browsers to shard themes across, e.g. chromium,webkit")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--incremental", action="store_true",
+                      help="only capture themes whose inputs changed since the last run")
+    mode.add_argument("--verify", action="store_true",
+                      help="capture into --capture-dir and compare against the committed previews")
+    parser.add_argument("--capture-dir", default=os.path.join(THEMES_DIR, ".regression"),
+                        help="output directory for --verify captures (default: .regression)")
+    parser.add_argument("--derive", action="store_true",
+                        help="encode thumbnails, compressed previews and a contact sheet while capturing")
+    return parser.parse_args()
 
 async def main():
     """Main function to run the theme capture process"""
+    args = parse_args()
     print("🎨 FlowDash Theme Screenshot Capture Tool (Playwright)")
     print("=" * 55)
-    
-    # Check if output directories exist
-    base_dir = "."  # Current directory since we're running from themes folder
-    if not os.path.exists(base_dir):
-        print(f"❌ Base directory not found: {base_dir}")
-        return
-    
-    # Create theme directories if they don't exist
-    themes = ["light", "dark", "brutalism", "cyberpunk", "flat", "glassmorphism", "neumorphism", "retro"]
-    for theme in themes:
-        theme_dir = os.path.join(base_dir, theme)
-        if not os.path.exists(theme_dir):
-            os.makedirs(theme_dir)
-            print(f"📁 Created directory: {theme_dir}")
-    
+
     # Initialize and run capture
     capturer = ThemeScreenshotCapture()
-    
+    if args.verify:
+        capturer.output_dir = args.capture_dir
+    if args.derive:
+        from image_pipeline import PreviewPipeline
+        capturer.pipeline = PreviewPipeline(capturer.output_dir)
+    cache = None
+    if args.incremental:
+        cache = CaptureCache(page=page_from_url(capturer.dashboard_url), data_file=capturer.data_file,
+                             viewport=capturer.viewport)
+        capturer.themes = cache.stale_themes(capturer.themes)
+        if not capturer.themes:
+            print("✨ All theme previews are up to date, nothing to capture")
+            return 0
+        print(f"🔁 Themes with changed inputs: {', '.join(capturer.themes)}")
+
     try:
-        success = await capturer.capture_theme_screenshots()
+        browsers = tuple(b.strip() for b in args.browsers.split(",") if b.strip())
+        success = await capturer.capture_theme_screenshots(args.workers if args.concurrent else 1, browsers)
+        if cache is not None and capturer.captured:
+            cache.record(capturer.captured)
+        if capturer.pipeline is not None and not capturer.pipeline.report(capturer.pipeline.finish()):
+            success = False
         if success:
             print("\n🎊 All theme screenshots captured successfully!")
         else:
             print("\n⚠️  Some themes failed to capture. Check the output above for details.")
+        if args.verify and not capturer.verify_captures(THEMES_DIR, os.path.join(args.capture_dir, "heatmaps")):
+            return 1
+        return 0 if success else 1
     except KeyboardInterrupt:
         print("\n⏹️  Capture interrupted by user")
+        return 1
     except Exception as e:
         print(f"\n💥 Unexpected error: {e}")
+        return 1
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Post-capture image pipeline for FlowDash theme previews
+
+The ``<theme>/<theme>-preview.png`` captures are full resolution and barely compressed,
+while most clients only show thumbnails. For every capture this pipeline writes into
+``<theme>/derived/``:
+
+- an optimized lossless PNG and a lossy WebP of the full capture
+- thumbnails at several widths (``THUMBNAIL_WIDTHS``), each as PNG and WebP
+
+plus one contact sheet with all themes (``contact-sheet.png``/``.webp``) and
+``previews-manifest.json`` with the dimensions, sizes and SHA-256 hashes of every file.
+
+Encoding runs in a process pool. The capture scripts submit each capture as soon as it
+is written (``--derive`` in ``capture_themes_playwright.py`` and ``capture_themes.py``),
+so encoding overlaps with the remaining browser captures. Captures whose hash matches the manifest and
+whose outputs still exist are not encoded again.
+
+Usage:
+    python image_pipeline.py [--capture-dir .] [--widths 160 320 640] [--workers 4]
+    python capture_themes_playwright.py --concurrent --derive
+    python capture_themes.py --derive
+"""
+
+import argparse
+import datetime
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageDraw
+
+from capture_cache import THEMES_DIR, write_atomic
+from capture_service import THEMES
+
+MANIFEST_NAME = "previews-manifest.json"
+MANIFEST_VERSION = 1
+DERIVED_DIR = "derived"
+THUMBNAIL_WIDTHS = (160, 320, 640)
+# Pillow save options per output format
+ENCODINGS = {
+    "png": {"optimize": True},
+    "webp": {"quality": 80, "method": 6},
+}
+CONTACT_SHEET_NAME = "contact-sheet"
+CONTACT_SHEET_CELL_WIDTH = 320
+CONTACT_SHEET_COLUMNS = 4
+CONTACT_SHEET_LABEL_HEIGHT = 24
+CONTACT_SHEET_PADDING = 12
+
+
+def sha256_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def encode(image, fmt):
+    buffer = io.BytesIO()
+    if fmt == "webp" or image.mode not in ("RGB", "RGBA", "P", "L"):
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+    image.save(buffer, format=fmt.upper(), **ENCODINGS[fmt])
+    return buffer.getvalue()
+
+
+def write_output(image, path, fmt, root):
+    """Encode and write one output; returns its manifest entry"""
+    data = encode(image, fmt)
+    write_atomic(path, data)
+    return {"path": os.path.relpath(path, root).replace(os.sep, "/"), "format": fmt,
+            "width": image.width, "height": image.height, "bytes": len(data), "sha256": sha256_bytes(data)}
+
+
+def resize_to_width(image, width):
+    if image.width <= width:
+        return image.copy()
+    height = max(1, round(image.height * width / image.width))
+    return image.resize((width, height), Image.LANCZOS)
+
+
+def derive_capture(theme, source, root, widths=THUMBNAIL_WIDTHS):
+    """Process pool job: all encodings and thumbnails of one capture; returns its manifest entry"""
+    started = time.perf_counter()
+    with open(source, "rb") as f:
+        data = f.read()
+    with Image.open(io.BytesIO(data)) as image:
+        image.load()
+        entry = {
+            "theme": theme,
+            "source": {"path": os.path.relpath(source, root).replace(os.sep, "/"), "width": image.width,
+                       "height": image.height, "bytes": len(data), "sha256": sha256_bytes(data)},
+            "outputs": [],
+        }
+        out_dir = os.path.join(os.path.dirname(source), DERIVED_DIR)
+        base = os.path.splitext(os.path.basename(source))[0]
+        for fmt in ENCODINGS:
+            entry["outputs"].append(write_output(image, os.path.join(out_dir, f"{base}.{fmt}"), fmt, root))
+        for width in sorted(set(widths)):
+            thumbnail = resize_to_width(image, width)
+            for fmt in ENCODINGS:
+                entry["outputs"].append(write_output(thumbnail, os.path.join(out_dir, f"{base}-{width}.{fmt}"),
+                                                     fmt, root))
+    entry["ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return entry
+
+
+def build_contact_sheet(sources, root, cell_width=CONTACT_SHEET_CELL_WIDTH, columns=CONTACT_SHEET_COLUMNS):
+    """Process pool job: one labelled grid image of all captures; sources is a list of (theme, path)"""
+    cells = []
+    for theme, path in sources:
+        with Image.open(path) as image:
+            cells.append((theme, resize_to_width(image.convert("RGB"), cell_width)))
+    if not cells:
+        return None
+    columns = max(1, min(columns, len(cells)))
+    rows = (len(cells) + columns - 1) // columns
+    cell_height = max(image.height for _, image in cells) + CONTACT_SHEET_LABEL_HEIGHT
+    pad = CONTACT_SHEET_PADDING
+    sheet = Image.new("RGB", (columns * (cell_width + pad) + pad, rows * (cell_height + pad) + pad), "white")
+    draw = ImageDraw.Draw(sheet)
+    for i, (theme, image) in enumerate(cells):
+        x = pad + (i % columns) * (cell_width + pad)
+        y = pad + (i // columns) * (cell_height + pad)
+        sheet.paste(image, (x, y))
+        draw.text((x, y + image.height + 6), theme, fill="black")
+    return [write_output(sheet, os.path.join(root, f"{CONTACT_SHEET_NAME}.{fmt}"), fmt, root) for fmt in ENCODINGS]
+
+
+def load_manifest(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("version") == MANIFEST_VERSION else None
+
+
+class PreviewPipeline:
+    """Derives thumbnails and encodings of captures in a process pool while capturing continues"""
+
+    def __init__(self, capture_dir=THEMES_DIR, widths=THUMBNAIL_WIDTHS, workers=None):
+        self.capture_dir = os.path.abspath(capture_dir)
+        self.widths = tuple(sorted(set(widths)))
+        self.workers = workers or os.cpu_count() or 2
+        self.manifest_path = os.path.join(self.capture_dir, MANIFEST_NAME)
+        previous = load_manifest(self.manifest_path) or {}
+        self.previous = {e["theme"]: e for e in previous.get("themes", [])}
+        self.pool = None
+        self.jobs = {}       # theme -> Future
+        self.entries = {}    # theme -> manifest entry that is still current
+        self.sources = {}    # theme -> capture path
+        self.errors = {}
+        self.encoded = []    # themes encoded in this run
+        self.started = time.perf_counter()
+
+    def up_to_date(self, theme, source):
+        """Manifest entry of a capture that was already processed with these widths, or None"""
+        entry = self.previous.get(theme)
+        if not entry or entry.get("widths") != list(self.widths):
+            return None
+        with open(source, "rb") as f:
+            if sha256_bytes(f.read()) != entry["source"]["sha256"]:
+                return None
+        if not all(os.path.exists(os.path.join(self.capture_dir, o["path"])) for o in entry["outputs"]):
+            return None
+        return entry
+
+    def submit(self, theme, source):
+        """Queue a written capture; returns immediately"""
+        source = os.path.abspath(source)
+        self.sources[theme] = source
+        entry = self.up_to_date(theme, source)
+        if entry is not None:
+            self.entries[theme] = entry
+            return
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        self.jobs[theme] = self.pool.submit(derive_capture, theme, source, self.capture_dir, self.widths)
+
+    def finish(self):
+        """Wait for the queued jobs, build the contact sheet and write the manifest; returns the manifest"""
+        for theme, future in self.jobs.items():
+            try:
+                entry = future.result()
+                entry["widths"] = list(self.widths)
+                self.entries[theme] = entry
+                self.encoded.append(theme)
+            except Exception as e:
+                self.errors[theme] = str(e)
+        self.jobs.clear()
+
+        # Themes not captured in this run keep their entry, as long as their capture still exists
+        for theme, entry in self.previous.items():
+            if theme not in self.entries and theme not in self.errors \
+                    and os.path.exists(os.path.join(self.capture_dir, entry["source"]["path"])):
+                self.entries[theme] = entry
+                self.sources.setdefault(theme, os.path.join(self.capture_dir, entry["source"]["path"]))
+
+        order = {theme: i for i, theme in enumerate(THEMES)}
+        themes = sorted(self.entries, key=lambda t: (order.get(t, len(order)), t))
+        contact_sheet = None
+        if themes:
+            sources = [(theme, self.sources[theme]) for theme in themes]
+            if self.pool is not None:
+                contact_sheet = self.pool.submit(build_contact_sheet, sources, self.capture_dir).result()
+            else:
+                contact_sheet = build_contact_sheet(sources, self.capture_dir)
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "widths": list(self.widths),
+            "encodings": ENCODINGS,
+            "contact_sheet": contact_sheet,
+            "themes": [self.entries[theme] for theme in themes],
+        }
+        write_atomic(self.manifest_path, (json.dumps(manifest, indent=2) + "\n").encode("utf-8"))
+        return manifest
+
+    def report(self, manifest):
+        encoded = len(self.encoded)
+        source_bytes = sum(e["source"]["bytes"] for e in manifest["themes"])
+        thumb_bytes = sum(o["bytes"] for e in manifest["themes"] for o in e["outputs"]
+                          if o["format"] == "webp" and o["width"] <= min(self.widths, default=0))
+        for theme, error in self.errors.items():
+            print(f"❌ {theme}: {error}")
+        print(f"🖼️  {len(manifest['themes'])} themes in {MANIFEST_NAME} ({encoded} encoded, "
+              f"{len(manifest['themes']) - encoded} unchanged), captures {source_bytes / 1024:.0f} KB, "
+              f"smallest WebP thumbnails {thumb_bytes / 1024:.0f} KB, "
+              f"{time.perf_counter() - self.started:.1f}s since the pipeline started")
+        return not self.errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Derive thumbnails, encodings and a contact sheet from theme previews")
+    parser.add_argument("--capture-dir", default=THEMES_DIR, help="directory with <theme>/<theme>-preview.png")
+    parser.add_argument("--themes", nargs="+", default=list(THEMES), help="themes to process (default: all)")
+    parser.add_argument("--widths", type=int, nargs="+", default=list(THUMBNAIL_WIDTHS),
+                        help=f"thumbnail widths (default: {' '.join(map(str, THUMBNAIL_WIDTHS))})")
+    parser.add_argument("--workers", type=int, default=None, help="encoding processes (default: CPU count)")
+    args = parser.parse_args()
+
+    pipeline = PreviewPipeline(args.capture_dir, args.widths, args.workers)
+    missing = []
+    for theme in args.themes:
+        source = os.path.join(args.capture_dir, theme, f"{theme}-preview.png")
+        if os.path.exists(source):
+            pipeline.submit(theme, source)
+        else:
+            missing.append(theme)
+    for theme in missing:
+        print(f"⚠️  {theme}: no capture at {theme}/{theme}-preview.png")
+    ok = pipeline.report(pipeline.finish())
+    return 0 if ok and not missing else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
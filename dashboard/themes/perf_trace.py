@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Rendering cost per theme and data file for FlowDash, measured over CDP
+
+Loads the dashboard once per theme × data file in a fresh browser context (same flow
+as ``capture_themes_playwright.py``), waits for the readiness signal and reads the
+Chrome DevTools Protocol ``Performance.getMetrics`` counters: script, layout and
+style recalculation time, JS heap and DOM node count. Each pair is measured
+``--repeat`` times and the median is kept; an extra traced load records a Chrome
+trace (open in chrome://tracing or the DevTools Performance panel).
+
+Results are compared against ``perf-baseline.json``; a metric that got worse by more
+than the threshold (and by more than a small absolute amount, to ignore noise on
+tiny values) is reported as a regression and the script exits with status 1.
+
+Usage:
+    python perf_trace.py [--themes glassmorphism neumorphism] [--data-files theme_1.json theme_2.json]
+    python perf_trace.py --update-baseline          # record the current numbers as baseline
+    python perf_trace.py --threshold 0.2 --no-trace
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import statistics
+import sys
+import time
+
+from playwright.async_api import async_playwright
+
+from capture_themes_playwright import ThemeScreenshotCapture
+from render_readiness import wait_until_ready
+
+THEMES_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_FILE = os.path.join(THEMES_DIR, "perf-baseline.json")
+
+# CDP metric name -> (stored name, scale); durations are reported in seconds, stored in ms
+METRICS = {
+    "ScriptDuration": ("scriptMs", 1000),
+    "LayoutDuration": ("layoutMs", 1000),
+    "RecalcStyleDuration": ("recalcStyleMs", 1000),
+    "TaskDuration": ("taskMs", 1000),
+    "LayoutCount": ("layoutCount", 1),
+    "RecalcStyleCount": ("recalcStyleCount", 1),
+    "JSHeapUsedSize": ("jsHeapMB", 1 / (1024 * 1024)),
+    "Nodes": ("domNodes", 1),
+}
+# Worsening below these absolute amounts is never a regression
+MIN_DELTA = {
+    "readyMs": 50, "scriptMs": 20, "layoutMs": 10, "recalcStyleMs": 10, "taskMs": 50,
+    "layoutCount": 5, "recalcStyleCount": 5, "jsHeapMB": 2, "domNodes": 50,
+}
+TRACE_CATEGORIES = ["devtools.timeline", "disabled-by-default-devtools.timeline", "blink", "v8", "loading"]
+
+
+def pair_key(theme, data_file):
+    return f"{theme}|{data_file}"
+
+
+class ThemePerfTrace:
+    def __init__(self, dashboard_url="http://localhost:8000/dashboard/flowdash-js.html", timeout=60000):
+        self.capture = ThemeScreenshotCapture(dashboard_url)
+        self.themes = list(self.capture.themes)
+        self.data_files = [self.capture.data_file]
+        self.timeout = timeout
+
+    def page_url(self, theme, data_file):
+        self.capture.data_file = data_file
+        return self.capture.page_url(theme)
+
+    async def load(self, browser, theme, data_file, trace_path=None):
+        """Load one theme × data file in a fresh context; returns the metrics at readiness"""
+        context = await browser.new_context(viewport=dict(self.capture.viewport))
+        try:
+            page = await context.new_page()
+            cdp = await context.new_cdp_session(page)
+            await cdp.send("Performance.enable")
+            if trace_path:
+                await browser.start_tracing(page=page, path=trace_path, screenshots=False,
+                                            categories=TRACE_CATEGORIES)
+            started = time.perf_counter()
+            try:
+                await page.goto(self.page_url(theme, data_file))
+                if not await wait_until_ready(page, theme, self.timeout):
+                    raise RuntimeError("dashboard did not become ready")
+                ready_ms = (time.perf_counter() - started) * 1000
+            finally:
+                if trace_path:
+                    await browser.stop_tracing()
+            if trace_path:
+                return None
+            await cdp.send("HeapProfiler.collectGarbage")
+            raw = {m["name"]: m["value"] for m in (await cdp.send("Performance.getMetrics"))["metrics"]}
+            metrics = {"readyMs": round(ready_ms, 1)}
+            for name, (key, scale) in METRICS.items():
+                if name in raw:
+                    metrics[key] = round(raw[name] * scale, 2)
+            return metrics
+        finally:
+            await context.close()
+
+    async def run(self, repeat=3, trace_dir=None):
+        """Median metrics per theme × data file; failed pairs map to an error message"""
+        results = {}
+        if trace_dir:
+            os.makedirs(trace_dir, exist_ok=True)
+        async with async_playwright() as p:
+            # Sequential on purpose: concurrent pages would compete for the CPU being measured
+            browser = await p.chromium.launch(headless=True)
+            try:
+                for data_file in self.data_files:
+                    for theme in self.themes:
+                        key = pair_key(theme, data_file)
+                        print(f"⏱️  {theme} × {data_file}")
+                        try:
+                            runs = [await self.load(browser, theme, data_file) for _ in range(repeat)]
+                            results[key] = {k: round(statistics.median(r[k] for r in runs), 2)
+                                            for k in runs[0]}
+                            if trace_dir:
+                                name = f"{theme}-{os.path.splitext(data_file)[0].replace('/', '_')}.json"
+                                await self.load(browser, theme, data_file, os.path.join(trace_dir, name))
+                        except Exception as e:
+                            results[key] = {"error": str(e)}
+                            print(f"   ❌ {e}")
+            finally:
+                await browser.close()
+        return results
+
+
+def compare(current, baseline, threshold):
+    """Regressions as (pair, metric, baseline value, current value, relative change)"""
+    regressions = []
+    for key, metrics in current.items():
+        previous = baseline.get(key)
+        if not previous or "error" in metrics:
+            continue
+        for metric, value in metrics.items():
+            old = previous.get(metric)
+            if not isinstance(old, (int, float)) or old <= 0:
+                continue
+            change = (value - old) / old
+            if change > threshold and value - old > MIN_DELTA.get(metric, 0):
+                regressions.append((key, metric, old, value, change))
+    return regressions
+
+
+def print_table(results):
+    columns = ["readyMs", "scriptMs", "layoutMs", "recalcStyleMs", "jsHeapMB", "domNodes"]
+    print("\n" + f"{'theme × data file':<40}" + "".join(f"{c:>14}" for c in columns))
+    for key, metrics in sorted(results.items()):
+        theme, data_file = key.split("|", 1)
+        label = f"{theme} × {data_file}"
+        if "error" in metrics:
+            print(f"{label:<40}  ❌ {metrics['error']}")
+        else:
+            print(f"{label:<40}" + "".join(f"{metrics.get(c, '-'):>14}" for c in columns))
+
+
+def load_baseline(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Measure FlowDash rendering cost per theme and data file over CDP")
+    parser.add_argument("--url", default="http://localhost:8000/dashboard/flowdash-js.html", help="dashboard page")
+    parser.add_argument("--themes", nargs="+", help="themes to measure (default: all)")
+    parser.add_argument("--data-files", nargs="+", default=["theme_1.json"],
+                        help="data files in dashboard/data (default: theme_1.json)")
+    parser.add_argument("--repeat", type=int, default=3, help="loads per pair, the median is kept (default: 3)")
+    parser.add_argument("--timeout", type=int, default=60000, help="readiness timeout in ms (default: 60000)")
+    parser.add_argument("--trace-dir", default=".perf-traces", help="where Chrome traces are written")
+    parser.add_argument("--no-trace", action="store_true", help="skip the traced load")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline file (default: perf-baseline.json)")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="relative worsening reported as regression (default: 0.2)")
+    parser.add_argument("--update-baseline", action="store_true", help="store the results as the new baseline")
+    args = parser.parse_args()
+
+    tracer = ThemePerfTrace(args.url, timeout=args.timeout)
+    if args.themes:
+        tracer.themes = args.themes
+    tracer.data_files = args.data_files
+    print("🎨 FlowDash theme rendering cost")
+    print("=" * 55)
+    results = await tracer.run(repeat=max(1, args.repeat), trace_dir=None if args.no_trace else args.trace_dir)
+    print_table(results)
+    failed = [key for key, metrics in results.items() if "error" in metrics]
+
+    if args.update_baseline:
+        baseline = load_baseline(args.baseline) or {}
+        merged = dict(baseline.get("results", {}))
+        merged.update({key: metrics for key, metrics in results.items() if "error" not in metrics})
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+                "url": args.url,
+                "viewport": tracer.capture.viewport,
+                "repeat": args.repeat,
+                "results": dict(sorted(merged.items())),
+            }, f, indent=2)
+            f.write("\n")
+        print(f"\n💾 Baseline written: {args.baseline}")
+        return 1 if failed else 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"\n⚠️  No baseline at {args.baseline}; run with --update-baseline to create one")
+        return 1 if failed else 0
+    regressions = compare(results, baseline.get("results", {}), args.threshold)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regressions over {args.threshold:.0%}:")
+        for key, metric, old, new, change in regressions:
+            theme, data_file = key.split("|", 1)
+            print(f"   {theme} × {data_file}: {metric} {old} → {new} (+{change:.0%})")
+    else:
+        print(f"\n✅ No regressions over {args.threshold:.0%} against {args.baseline}")
+    return 1 if regressions or failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Render readiness helpers for the FlowDash capture and test scripts
+
+The dashboard publishes ``window.flowdashReadiness`` (see ``js/readiness.js``) once
+the layout has settled and the initial zoom-to-root is done, and the theme manager
+reports ``window.flowdashTheme.isReady(theme)`` once the theme stylesheet is applied.
+These helpers wait on those signals instead of sleeping for a fixed time.
+"""
+
+READY_SCRIPT = """
+(theme) => !!(window.flowdashReadiness && window.flowdashReadiness.isReady(theme || null))
+"""
+
+# Resolves once the main zoom transform has been unchanged for a few frames
+TRANSFORM_SETTLED_SCRIPT = """
+() => new Promise(resolve => {
+    const g = document.querySelector('#graph > g.dashboard');
+    if (!g) return resolve(false);
+    let last = null, stable = 0;
+    const check = () => {
+        const t = g.getAttribute('transform');
+        stable = (t === last) ? stable + 1 : 0;
+        last = t;
+        if (stable >= 3) return resolve(true);
+        requestAnimationFrame(check);
+    };
+    requestAnimationFrame(check);
+})
+"""
+
+DEFAULT_TIMEOUT_MS = 30000
+
+
+async def wait_until_ready(page, theme=None, timeout=DEFAULT_TIMEOUT_MS):
+    """Wait on a Playwright page until the dashboard (and optionally the theme) is ready"""
+    try:
+        await page.wait_for_function(READY_SCRIPT, arg=theme, polling="raf", timeout=timeout)
+        return True
+    except Exception as e:
+        print(f"   Warning: readiness signal not received: {e}")
+        return False
+
+
+async def wait_for_transform_settled(page):
+    """Wait on a Playwright page until a running zoom transition has finished"""
+    try:
+        return await page.evaluate(TRANSFORM_SETTLED_SCRIPT)
+    except Exception as e:
+        print(f"   Warning: could not wait for zoom to settle: {e}")
+        return False
+
+
+def wait_until_ready_sync(driver, theme=None, timeout=DEFAULT_TIMEOUT_MS):
+    """Wait on a Selenium WebDriver until the dashboard (and optionally the theme) is ready"""
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    script = f"return ({READY_SCRIPT})(arguments[0]);"
+    try:
+        WebDriverWait(driver, timeout / 1000, poll_frequency=0.05).until(
+            lambda d: d.execute_script(script, theme)
+        )
+        return True
+    except Exception as e:
+        print(f"   Warning: readiness signal not received: {e}")
+        return False
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Memory-leak soak test for long-running FlowDash dashboards
+
+Wall displays run the dashboard for weeks, so leaks that are invisible after one theme
+switch add up. This script loads the dashboard once and runs many cycles of the
+operations that rebuild DOM: a theme switch (``window.flowdashTheme.set``), collapsing
+and re-expanding a container, ``zoomToNode`` followed by ``zoomReset`` and, every few
+cycles, ``setData`` with the original data. Every cycle ends in the same state as it
+started, so anything that keeps growing is a leak.
+
+Every ``--sample-every`` cycles, after a forced garbage collection, it samples over
+CDP the used JS heap, the live DOM nodes, the DOM nodes that are no longer attached
+to the document, the JS event listeners and the number of ``.zoom-cockpit`` elements.
+After the warm-up a linear trend is fitted per metric; when the growth per cycle
+exceeds its budget the script writes a heap snapshot for triage (open it in the
+DevTools Memory panel) and exits with status 1. The samples are written to a JSON
+report either way.
+
+Usage:
+    python soak_test.py [--cycles 1000] [--data-file theme_1.json] [--themes light dark]
+    python soak_test.py --operations collapse zoom --budget heapKB=4 listeners=0.1
+    python soak_test.py --cycles 200 --snapshot always
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import statistics
+import sys
+import time
+
+from playwright.async_api import async_playwright
+
+from capture_themes_playwright import ThemeScreenshotCapture
+from render_readiness import wait_for_transform_settled, wait_until_ready
+
+OPERATIONS = ("theme", "collapse", "zoom", "setdata")
+# Allowed growth per cycle of the fitted trend
+DEFAULT_BUDGETS = {"heapKB": 8.0, "domNodes": 0.5, "detachedNodes": 0.5, "listeners": 0.1, "cockpits": 0.01}
+
+# Keeps the unparsed data file in the page, so setData always gets pristine data
+SETUP_SCRIPT = """
+async (file) => {
+    const url = `data/${file}`;
+    const response = await fetch(url);
+    if (!response.ok) throw new Error(`HTTP ${response.status} for ${url}`);
+    window.__flowdashSoak = { text: await response.text(), baseUrl: url.slice(0, url.lastIndexOf('/') + 1) };
+    return !!window.dashboard;
+}
+"""
+
+# One operation of a cycle; returns the id of the node it acted on (or null)
+ACTION_SCRIPT = """
+({ action, index, id, theme }) => {
+    const dashboard = window.dashboard;
+    const nodes = () => [...document.querySelectorAll('#graph g')].map(el => el.__node).filter(Boolean);
+    const pick = (list) => (id !== null ? dashboard.main.root.getNode(id) : list[index % list.length]) || null;
+    switch (action) {
+        case 'theme':
+            window.flowdashTheme.set(theme);
+            return theme;
+        case 'toggle': {
+            const node = pick(nodes().filter(n => n.parentNode && typeof n.collapse === 'function'
+                                             && n.data?.children?.length));
+            if (!node) return null;
+            node.collapsed = !node.collapsed;
+            return String(node.id);
+        }
+        case 'zoom': {
+            const node = pick(nodes().filter(n => n.parentNode && n.visible !== false));
+            if (!node) return null;
+            dashboard.zoomToNode(node);
+            return String(node.id);
+        }
+        case 'reset':
+            dashboard.zoomReset();
+            return null;
+        case 'setData': {
+            const data = JSON.parse(window.__flowdashSoak.text);
+            if (data?.chunked) data.chunked.baseUrl = window.__flowdashSoak.baseUrl;
+            dashboard.setData(data);
+            return null;
+        }
+    }
+    throw new Error(`unknown action ${action}`);
+}
+"""
+
+# Nodes attached to the document, and the zoom cockpits that cleanupOrphanedElements deals with
+PAGE_COUNTS_SCRIPT = """
+() => {
+    const walker = document.createTreeWalker(document, NodeFilter.SHOW_ALL);
+    let attached = 1;
+    while (walker.nextNode()) attached++;
+    return { attached, cockpits: document.querySelectorAll('.zoom-cockpit').length };
+}
+"""
+
+
+def fit_trend(samples, metric):
+    """Growth per cycle of a metric (least-squares slope), or None with fewer than three samples"""
+    points = [(s["cycle"], s[metric]) for s in samples if metric in s]
+    if len(points) < 3 or len({x for x, _ in points}) < 2:
+        return None
+    return statistics.linear_regression([x for x, _ in points], [y for _, y in points]).slope
+
+
+def parse_budgets(items):
+    budgets = dict(DEFAULT_BUDGETS)
+    for item in items or []:
+        metric, _, value = item.partition("=")
+        if metric not in budgets:
+            raise ValueError(f"unknown metric {metric!r} (one of {', '.join(budgets)})")
+        budgets[metric] = float(value)
+    return budgets
+
+
+class DashboardSoakTest:
+    def __init__(self, dashboard_url="http://localhost:8000/dashboard/flowdash-js.html", timeout=30000):
+        self.capture = ThemeScreenshotCapture(dashboard_url)
+        self.themes = list(self.capture.themes)
+        self.operations = list(OPERATIONS)
+        self.setdata_every = 25
+        self.timeout = timeout
+        self.not_ready = 0
+
+    async def wait(self, page, theme):
+        if not await wait_until_ready(page, theme, self.timeout):
+            self.not_ready += 1
+
+    async def act(self, page, action, index=0, node_id=None, theme=None):
+        return await page.evaluate(ACTION_SCRIPT, {"action": action, "index": index, "id": node_id, "theme": theme})
+
+    async def cycle(self, page, n):
+        """One soak cycle; leaves the dashboard in the state it started in (except the theme)"""
+        theme = self.themes[n % len(self.themes)]
+        if "theme" in self.operations:
+            await self.act(page, "theme", theme=theme)
+            await self.wait(page, theme)
+        if "collapse" in self.operations:
+            node_id = await self.act(page, "toggle", index=n)
+            if node_id is not None:
+                await self.wait(page, theme)
+                await self.act(page, "toggle", node_id=node_id)
+                await self.wait(page, theme)
+        if "zoom" in self.operations:
+            if await self.act(page, "zoom", index=n * 7) is not None:
+                await wait_for_transform_settled(page)
+            await self.act(page, "reset")
+            await wait_for_transform_settled(page)
+        if "setdata" in self.operations and (n + 1) % self.setdata_every == 0:
+            await self.act(page, "setData")
+            await self.wait(page, theme)
+
+    async def sample(self, page, cdp, n):
+        # Two passes: the first may only run finalizers that release more objects
+        for _ in range(2):
+            await cdp.send("HeapProfiler.collectGarbage")
+        heap = await cdp.send("Runtime.getHeapUsage")
+        counters = await cdp.send("Memory.getDOMCounters")
+        counts = await page.evaluate(PAGE_COUNTS_SCRIPT)
+        return {
+            "cycle": n,
+            "heapKB": round(heap["usedSize"] / 1024, 1),
+            "domNodes": counters["nodes"],
+            # Live nodes the document no longer contains: detached, or only referenced from JS
+            "detachedNodes": max(0, counters["nodes"] - counts["attached"]),
+            "listeners": counters["jsEventListeners"],
+            "cockpits": counts["cockpits"],
+        }
+
+    async def heap_snapshot(self, cdp, path):
+        chunks = []
+        cdp.on("HeapProfiler.addHeapSnapshotChunk", lambda event: chunks.append(event["chunk"]))
+        await cdp.send("HeapProfiler.collectGarbage")
+        await cdp.send("HeapProfiler.takeHeapSnapshot", {"reportProgress": False})
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("".join(chunks))
+
+    async def run(self, cycles, sample_every, snapshot_path=None):
+        """Run the cycles; returns the samples. snapshot_path is a callable deciding on a heap snapshot"""
+        samples = []
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            try:
+                context = await browser.new_context(viewport=dict(self.capture.viewport))
+                page = await context.new_page()
+                cdp = await context.new_cdp_session(page)
+                await cdp.send("HeapProfiler.enable")
+                first_theme = self.themes[0]
+                await page.goto(self.capture.page_url(first_theme))
+                if not await wait_until_ready(page, first_theme, self.timeout):
+                    raise RuntimeError("dashboard did not become ready")
+                if not await page.evaluate(SETUP_SCRIPT, self.capture.data_file):
+                    raise RuntimeError("window.dashboard is not set by the page")
+
+                samples.append(await self.sample(page, cdp, 0))
+                started = time.perf_counter()
+                for n in range(cycles):
+                    await self.cycle(page, n)
+                    if (n + 1) % sample_every == 0 or n + 1 == cycles:
+                        s = await self.sample(page, cdp, n + 1)
+                        samples.append(s)
+                        rate = (n + 1) / (time.perf_counter() - started)
+                        print(f"   cycle {n + 1:>6}: heap {s['heapKB']:>9.1f} KB, {s['domNodes']:>6} nodes "
+                              f"({s['detachedNodes']} detached), {s['listeners']:>5} listeners, "
+                              f"{s['cockpits']} cockpits  [{rate:.1f} cycles/s]")
+
+                path = snapshot_path(samples) if snapshot_path else None
+                if path:
+                    print(f"📸 Writing heap snapshot {path}")
+                    await self.heap_snapshot(cdp, path)
+            finally:
+                await browser.close()
+        return samples
+
+
+def evaluate(samples, budgets, warmup):
+    """Per metric: (trend per cycle, budget, over budget) on the samples after the warm-up"""
+    steady = [s for s in samples if s["cycle"] >= warmup]
+    results = {}
+    for metric, budget in budgets.items():
+        trend = fit_trend(steady, metric)
+        results[metric] = (trend, budget, trend is not None and trend > budget)
+    return results
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Soak-test the FlowDash dashboard for memory and DOM leaks")
+    parser.add_argument("--url", default="http://localhost:8000/dashboard/flowdash-js.html", help="dashboard page")
+    parser.add_argument("--data-file", default="theme_1.json", help="data file in dashboard/data (default: theme_1.json)")
+    parser.add_argument("--themes", nargs="+", help="themes to cycle through (default: all)")
+    parser.add_argument("--operations", nargs="+", default=list(OPERATIONS), choices=OPERATIONS,
+                        help="operations per cycle (default: all)")
+    parser.add_argument("--cycles", type=int, default=1000, help="number of cycles (default: 1000)")
+    parser.add_argument("--setdata-every", type=int, default=25, help="run setData every N cycles (default: 25)")
+    parser.add_argument("--sample-every", type=int, default=10, help="sample every N cycles (default: 10)")
+    parser.add_argument("--warmup", type=int, default=50,
+                        help="cycles ignored by the trend fit, while caches fill (default: 50)")
+    parser.add_argument("--budget", nargs="+", metavar="METRIC=PER_CYCLE",
+                        help=f"override growth budgets ({', '.join(f'{k}={v:g}' for k, v in DEFAULT_BUDGETS.items())})")
+    parser.add_argument("--timeout", type=int, default=30000, help="readiness timeout in ms (default: 30000)")
+    parser.add_argument("--output-dir", default=".soak-results", help="where the report and heap snapshots go")
+    parser.add_argument("--snapshot", choices=("on-failure", "always", "never"), default="on-failure",
+                        help="when to write a heap snapshot (default: on-failure)")
+    args = parser.parse_args()
+
+    try:
+        budgets = parse_budgets(args.budget)
+    except ValueError as e:
+        parser.error(str(e))
+
+    soak = DashboardSoakTest(args.url, timeout=args.timeout)
+    soak.capture.data_file = args.data_file
+    if args.themes:
+        soak.themes = args.themes
+    soak.operations = args.operations
+    soak.setdata_every = max(1, args.setdata_every)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    name = f"soak-{os.path.splitext(os.path.basename(args.data_file))[0]}-{stamp}"
+    report_path = os.path.join(args.output_dir, name + ".json")
+
+    def snapshot_path(samples):
+        over = any(over for _, _, over in evaluate(samples, budgets, args.warmup).values())
+        if args.snapshot == "always" or (args.snapshot == "on-failure" and over):
+            return os.path.join(args.output_dir, name + ".heapsnapshot")
+        return None
+
+    print("🔁 FlowDash soak test")
+    print("=" * 55)
+    print(f"   {args.cycles} cycles of {', '.join(soak.operations)} on {args.data_file}, "
+          f"themes: {', '.join(soak.themes)}")
+    started = time.perf_counter()
+    samples = await soak.run(max(1, args.cycles), max(1, args.sample_every), snapshot_path)
+    elapsed = time.perf_counter() - started
+
+    results = evaluate(samples, budgets, args.warmup)
+    print(f"\n{'metric':<16}{'start':>12}{'end':>12}{'per cycle':>14}{'budget':>10}")
+    for metric, (trend, budget, over) in results.items():
+        trend_text = "-" if trend is None else f"{trend:+.3f}"
+        print(f"{metric:<16}{samples[0][metric]:>12}{samples[-1][metric]:>12}{trend_text:>14}{budget:>10g}"
+              f"  {'❌' if over else '✅'}")
+
+    failed = [metric for metric, (_, _, over) in results.items() if over]
+    snapshot = os.path.join(args.output_dir, name + ".heapsnapshot")
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "url": args.url,
+            "data_file": args.data_file,
+            "themes": soak.themes,
+            "operations": soak.operations,
+            "cycles": args.cycles,
+            "warmup": args.warmup,
+            "wall_time_s": round(elapsed, 1),
+            "not_ready": soak.not_ready,
+            "trends": {metric: {"per_cycle": trend, "budget": budget, "over_budget": over}
+                       for metric, (trend, budget, over) in results.items()},
+            "heap_snapshot": os.path.basename(snapshot) if os.path.exists(snapshot) else None,
+            "samples": samples,
+        }, f, indent=2)
+        f.write("\n")
+
+    if soak.not_ready:
+        print(f"\n⚠️  {soak.not_ready} operations did not reach the readiness signal")
+    if failed:
+        print(f"\n❌ Growth over budget: {', '.join(failed)} (report: {report_path})")
+        return 1
+    print(f"\n✅ No growth over budget in {args.cycles} cycles ({elapsed:.0f}s, report: {report_path})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -5,6 +5,7 @@ Test script to verify theme switching in the FlowDash dashboard
 
 import asyncio
 from playwright.async_api import async_playwright
+from render_readiness import wait_until_ready
 
 async def test_theme_switching():
     """Test if theme switching is working"""
@@ -17,7 +18,7 @@ async def test_theme_switching():
         
         # Wait for dashboard to load
         await page.wait_for_selector("#graph", timeout=30000)
-        await page.wait_for_timeout(3000)
+        await wait_until_ready(page)
         
         print("✅ Dashboard loaded")
         
@@ -52,17 +53,23 @@ async def test_theme_switching():
         # Try to switch to dark theme
         print("\n🌙 Trying to switch to dark theme...")
         try:
-            # Method 1: Try setTheme function
-            if 'setTheme' in theme_functions:
+            # Method 1: Use the theme manager API
+            uses_theme_manager = await page.evaluate("!!(window.flowdashTheme && window.flowdashTheme.set)")
+            if uses_theme_manager:
+                await page.evaluate("window.flowdashTheme.set('dark')")
+                print("   Used window.flowdashTheme.set")
+            # Method 2: Try setTheme function
+            elif 'setTheme' in theme_functions:
                 await page.evaluate("setTheme('dark', { persist: false, broadcast: true })")
                 print("   Used setTheme function")
             else:
-                # Method 2: Set data-theme attribute
+                # Method 3: Set data-theme attribute
                 await page.evaluate("document.documentElement.setAttribute('data-theme', 'dark')")
                 print("   Used data-theme attribute")
             
-            # Wait a bit
-            await page.wait_for_timeout(2000)
+            # Wait for the theme stylesheet to be applied
+            if uses_theme_manager:
+                await wait_until_ready(page, 'dark', timeout=10000)
             
             # Check new theme
             new_theme = await page.evaluate("""
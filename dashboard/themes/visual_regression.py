@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Visual Regression Check for FlowDash theme previews
+
+Compares freshly captured previews against the committed ``<theme>/<theme>-preview.png``
+baselines using NumPy array operations:
+
+- the image is split into tiles and only rows of tiles with changed pixels are inspected
+- a pixel only counts as different when no pixel in its 3x3 neighbourhood of the other
+  image matches it, so one-pixel anti-aliasing shifts are tolerated
+- each theme has its own colour and changed-area tolerance
+- comparison stops early once a theme is over budget, unless a heatmap is requested
+
+Usage:
+    python visual_regression.py --capture-dir .regression [--heatmap-dir .regression/heatmaps]
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+THEMES_DIR = os.path.dirname(os.path.abspath(__file__))
+
+TILE_SIZE = 64
+
+# color: maximum per-channel difference (0-255) still treated as equal
+# max_diff_ratio: fraction of pixels allowed to differ before the check fails
+DEFAULT_TOLERANCE = {"color": 16, "max_diff_ratio": 0.001}
+THEME_TOLERANCES = {
+    # Blur, translucency and soft shadows render less deterministically
+    "glassmorphism": {"color": 32, "max_diff_ratio": 0.005},
+    "neumorphism": {"color": 24, "max_diff_ratio": 0.003},
+    "cyberpunk": {"color": 24, "max_diff_ratio": 0.002},
+}
+
+# 3x3 neighbourhood used for anti-aliasing tolerant comparison
+_SHIFTS = [(dy, dx) for dy in (0, 1, 2) for dx in (0, 1, 2)]
+
+
+def load_rgba(path):
+    """Load an image as a contiguous (H, W, 4) uint8 array"""
+    with Image.open(path) as im:
+        if im.mode != "RGBA":
+            im = im.convert("RGBA")
+        return np.ascontiguousarray(np.asarray(im, dtype=np.uint8))
+
+
+def tolerance_for(theme, overrides=None):
+    tolerance = dict(DEFAULT_TOLERANCE)
+    tolerance.update(THEME_TOLERANCES.get(theme, {}))
+    if overrides:
+        tolerance.update(overrides.get("default", {}))
+        tolerance.update(overrides.get(theme, {}))
+    return tolerance
+
+
+def dirty_tiles(baseline, capture, tile=TILE_SIZE):
+    """(row, col) indices of tiles containing at least one changed pixel"""
+    h, w = baseline.shape[:2]
+    rows, cols = -(-h // tile), -(-w // tile)
+    changed = np.zeros((rows * tile, cols * tile), dtype=bool)
+    # Compare whole RGBA pixels as 32-bit words
+    changed[:h, :w] = baseline.view(np.uint32)[..., 0] != capture.view(np.uint32)[..., 0]
+    return np.argwhere(changed.reshape(rows, tile, cols, tile).any(axis=(1, 3)))
+
+
+def _neighbourhood_distance(image, padded_other, ys, xs):
+    """Smallest max-channel distance between the given pixels and their 3x3 neighbourhood in the other image"""
+    pixels = image[ys, xs].astype(np.int16)
+    best = None
+    for dy, dx in _SHIFTS:
+        distance = np.abs(pixels - padded_other[ys + dy, xs + dx]).max(axis=1)
+        best = distance if best is None else np.minimum(best, distance)
+    return best
+
+
+def _band_distance(baseline, capture, padded_baseline, padded_capture, y0, y1, x0, x1, color_tolerance):
+    """Per-pixel distance for a band; only pixels over tolerance get the neighbourhood check"""
+    distance = np.abs(baseline[y0:y1, x0:x1].astype(np.int16)
+                      - capture[y0:y1, x0:x1].astype(np.int16)).max(axis=2)
+    ys, xs = np.nonzero(distance > color_tolerance)
+    if len(ys):
+        # Symmetric: a feature missing from either image must be caught
+        distance[ys, xs] = np.maximum(
+            _neighbourhood_distance(capture, padded_baseline, ys + y0, xs + x0),
+            _neighbourhood_distance(baseline, padded_capture, ys + y0, xs + x0),
+        )
+    return distance
+
+
+def compare_images(baseline, capture, tolerance, tile=TILE_SIZE, want_heatmap=False):
+    """Compare two RGBA arrays on their colour channels; returns (result dict, distance map or None)"""
+    h, w = baseline.shape[:2]
+    result = {"passed": True, "diff_pixels": 0, "diff_ratio": 0.0, "max_distance": 0,
+              "dirty_tiles": 0, "early_exit": False}
+    if baseline.shape != capture.shape:
+        result.update(passed=False, error=f"size mismatch: baseline {w}x{h}, "
+                                          f"capture {capture.shape[1]}x{capture.shape[0]}")
+        return result, None
+
+    tiles = dirty_tiles(baseline, capture, tile)
+    result["dirty_tiles"] = int(len(tiles))
+    heatmap = np.zeros((h, w), dtype=np.uint8) if want_heatmap else None
+    if len(tiles) == 0:
+        return result, heatmap
+
+    budget = tolerance["max_diff_ratio"] * h * w
+    baseline, capture = baseline[..., :3], capture[..., :3]
+    padded_baseline = np.pad(baseline, ((1, 1), (1, 1), (0, 0)), mode="edge")
+    padded_capture = np.pad(capture, ((1, 1), (1, 1), (0, 0)), mode="edge")
+    diff_pixels = 0
+    max_distance = 0
+    # Inspect one band of tile rows at a time, spanning only its dirty columns
+    for row in np.unique(tiles[:, 0]):
+        cols = tiles[tiles[:, 0] == row, 1]
+        y0, x0 = row * tile, cols.min() * tile
+        y1, x1 = min(y0 + tile, h), min((cols.max() + 1) * tile, w)
+        distance = _band_distance(baseline, capture, padded_baseline, padded_capture,
+                                  y0, y1, x0, x1, tolerance["color"])
+        diff_pixels += int(np.count_nonzero(distance > tolerance["color"]))
+        max_distance = max(max_distance, int(distance.max()))
+        if heatmap is not None:
+            heatmap[y0:y1, x0:x1] = distance.astype(np.uint8)
+        elif diff_pixels > budget:
+            result["early_exit"] = True
+            break
+
+    result.update(diff_pixels=diff_pixels, diff_ratio=diff_pixels / float(h * w),
+                  max_distance=max_distance, passed=diff_pixels <= budget)
+    return result, heatmap
+
+
+def write_heatmap(path, baseline, distance, color_tolerance):
+    """Dimmed grayscale baseline with differences drawn in red, scaled by distance"""
+    gray = (baseline[..., :3].astype(np.float32) @ np.array([0.299, 0.587, 0.114], dtype=np.float32)) * 0.35
+    out = np.repeat(gray[..., None], 3, axis=2)
+    intensity = distance.astype(np.float32) / 255.0
+    over = distance > color_tolerance
+    out[..., 0] = np.where(over, 255.0, np.maximum(out[..., 0], intensity * 255.0))
+    out[..., 1] = np.where(over, out[..., 1] * (1.0 - intensity), out[..., 1])
+    out[..., 2] = np.where(over, out[..., 2] * (1.0 - intensity), out[..., 2])
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    Image.fromarray(out.clip(0, 255).astype(np.uint8), "RGB").save(path)
+
+
+def verify_image(rel_path, baseline_dir, capture_dir, heatmap_dir=None, overrides=None):
+    """Verify one capture against its baseline; rel_path is relative to both directories"""
+    theme = rel_path.replace("\\", "/").split("/", 1)[0]
+    tolerance = tolerance_for(theme, overrides)
+    result = {"name": rel_path, "theme": theme, "tolerance": tolerance}
+    baseline_path = os.path.join(baseline_dir, rel_path)
+    capture_path = os.path.join(capture_dir, rel_path)
+    if not os.path.exists(baseline_path):
+        result.update(passed=False, error="no baseline")
+        return result
+    try:
+        with open(baseline_path, "rb") as f:
+            baseline_bytes = f.read()
+        with open(capture_path, "rb") as f:
+            capture_bytes = f.read()
+        if baseline_bytes == capture_bytes:
+            # Byte-identical files need no decoding
+            result.update(passed=True, diff_pixels=0, diff_ratio=0.0, max_distance=0,
+                          dirty_tiles=0, early_exit=False)
+            return result
+        baseline = load_rgba(baseline_path)
+        capture = load_rgba(capture_path)
+    except Exception as e:
+        result.update(passed=False, error=str(e))
+        return result
+
+    comparison, distance = compare_images(baseline, capture, tolerance, want_heatmap=heatmap_dir is not None)
+    result.update(comparison)
+    if distance is not None and comparison["diff_pixels"] > 0:
+        heatmap_path = os.path.join(heatmap_dir, rel_path.replace(".png", "-diff.png"))
+        write_heatmap(heatmap_path, baseline, distance, tolerance["color"])
+        result["heatmap"] = heatmap_path
+    return result
+
+
+def find_captures(capture_dir):
+    """Relative paths of all ``<theme>/*-preview.png`` files below capture_dir"""
+    found = []
+    for theme in sorted(os.listdir(capture_dir)):
+        theme_dir = os.path.join(capture_dir, theme)
+        if not os.path.isdir(theme_dir):
+            continue
+        for name in sorted(os.listdir(theme_dir)):
+            if name.endswith("-preview.png"):
+                found.append(f"{theme}/{name}")
+    return found
+
+
+def verify_captures(capture_dir, baseline_dir=THEMES_DIR, rel_paths=None, heatmap_dir=None,
+                    overrides=None, workers=None):
+    """Verify captures against baselines in parallel; returns a list of result dicts"""
+    rel_paths = rel_paths if rel_paths is not None else find_captures(capture_dir)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(
+            lambda rel: verify_image(rel, baseline_dir, capture_dir, heatmap_dir, overrides), rel_paths))
+
+
+def report(results):
+    """Print a summary and return True when every capture passed"""
+    passed = 0
+    for r in results:
+        if r.get("passed"):
+            passed += 1
+            print(f"✅ {r['name']}: {r.get('diff_pixels', 0)} px differ")
+        elif "error" in r:
+            print(f"❌ {r['name']}: {r['error']}")
+        else:
+            extra = " (early exit)" if r.get("early_exit") else ""
+            print(f"❌ {r['name']}: {r['diff_pixels']} px differ "
+                  f"({r['diff_ratio']:.4%} > {r['tolerance']['max_diff_ratio']:.4%}){extra}")
+            if r.get("heatmap"):
+                print(f"   Heatmap: {r['heatmap']}")
+    print(f"\n🔍 Visual regression: {passed}/{len(results)} captures match their baseline")
+    return passed == len(results)
+
+
+def load_overrides(path):
+    if not path:
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare captured theme previews against the baselines")
+    parser.add_argument("--capture-dir", required=True, help="directory with <theme>/<theme>-preview.png captures")
+    parser.add_argument("--baseline-dir", default=THEMES_DIR, help="directory with the baseline previews")
+    parser.add_argument("--heatmap-dir", help="write diff heatmaps for failing captures here")
+    parser.add_argument("--tolerances", help="JSON file with per-theme tolerance overrides")
+    args = parser.parse_args()
+
+    results = verify_captures(args.capture_dir, args.baseline_dir, heatmap_dir=args.heatmap_dir,
+                              overrides=load_overrides(args.tolerances))
+    if not results:
+        print(f"❌ No captures found in {args.capture_dir}")
+        return 1
+    return 0 if report(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
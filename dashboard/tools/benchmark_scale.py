@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Scale benchmark for the FlowDash dashboard using Playwright
+
+Loads generated dashboards of increasing size (see ``generate_graph.py``) and records
+per size:
+
+- time to first render: first animation frame after the first node is in the DOM
+- layout settle time: last display change before ``flowdash:layoutsettled``
+- ready time: layout settled and initial zoom-to-root done (``flowdash:ready``)
+- zoom frame times while zooming to sample nodes and back
+- JS heap after a forced garbage collection
+
+Results are written as JSON; ``--compare`` checks them against an earlier run.
+
+Usage:
+    python serve.py 8000 --directory ..    # in another terminal, from dashboard/tools
+    python benchmark_scale.py --sizes 1000 5000 20000 [--repeat 3] [--output scale.json]
+    python benchmark_scale.py --sizes 1000 5000 --compare scale-previous.json [--threshold 0.25]
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import statistics
+import sys
+
+from playwright.async_api import async_playwright
+
+from dashboard_data import DASHBOARD_DIR, walk_nodes
+from generate_graph import GENERATED_DIR, GENERATOR_VERSION, generate_dashboard, write_dashboard
+
+# The page URL is shared with the capture scripts
+sys.path.append(os.path.join(DASHBOARD_DIR, "themes"))
+from capture_service import page_url  # noqa: E402
+
+RESULTS_VERSION = 1
+# Quiet period js/readiness.js waits after the last display change
+SETTLE_MS = 250
+FRAME_BUDGET_MS = 1000 / 60
+
+# Installed before any page script runs; collects render milestones
+INSTRUMENT_SCRIPT = """
+(() => {
+    const bench = window.__flowdashBench = { firstRender: null, layoutSettled: null, ready: null };
+    const observer = new MutationObserver(() => {
+        if (!document.querySelector('#graph g.dashboard rect')) return;
+        observer.disconnect();
+        requestAnimationFrame(() => { bench.firstRender = performance.now(); });
+    });
+    observer.observe(document, { childList: true, subtree: true });
+    addEventListener('flowdash:layoutsettled', () => { bench.layoutSettled ??= performance.now(); });
+    addEventListener('flowdash:ready', () => { bench.ready ??= performance.now(); });
+})();
+"""
+
+# Zooms to sample leaf nodes and back while recording animation frame durations
+ZOOM_SCRIPT = """
+async ({ samples, holdMs }) => {
+    const dashboard = window.dashboard;
+    const leaves = dashboard.main.root.getAllNodes(false, true).filter(n => !n.isContainer);
+    const step = Math.max(1, Math.floor(leaves.length / samples));
+    const targets = leaves.filter((_, i) => i % step === 0).slice(0, samples);
+    const frames = [];
+    let running = true, last = performance.now();
+    const tick = (now) => {
+        frames.push(now - last);
+        last = now;
+        if (running) requestAnimationFrame(tick);
+    };
+    requestAnimationFrame((now) => { last = now; requestAnimationFrame(tick); });
+    const hold = () => new Promise(resolve => setTimeout(resolve, holdMs));
+    for (const node of targets) {
+        dashboard.zoomToNodeById(node.id);
+        await hold();
+        dashboard.zoomReset();
+        await hold();
+    }
+    running = false;
+    return { targets: targets.length, frames };
+}
+"""
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize_frames(frames):
+    if not frames:
+        return {"frames": 0}
+    return {
+        "frames": len(frames),
+        "mean_ms": round(statistics.fmean(frames), 2),
+        "p50_ms": round(percentile(frames, 0.50), 2),
+        "p95_ms": round(percentile(frames, 0.95), 2),
+        "max_ms": round(max(frames), 2),
+        # Frames that took longer than 1.5 frame budgets at 60 Hz
+        "dropped": sum(1 for f in frames if f > FRAME_BUDGET_MS * 1.5),
+    }
+
+
+def ensure_dataset(size, depth, edge_density, seed):
+    """Path of the generated dashboard for a size (relative to data/)
+
+    The file is (re)generated when it is missing or its ``generator`` block was written with
+    other parameters, so the results never describe different data than was measured.
+    """
+    name = f"scale-{size}.json"
+    path = os.path.join(GENERATED_DIR, name)
+    wanted = {"version": GENERATOR_VERSION, "nodes": size, "depth": depth, "edgeDensity": edge_density, "seed": seed}
+    dashboard = None
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            dashboard = json.load(f)
+        if dashboard.get("generator") != wanted:
+            print(f"🔁 {name} was generated with {dashboard.get('generator')}, regenerating")
+            dashboard = None
+    if dashboard is None:
+        dashboard = generate_dashboard(size, depth, edge_density, seed)
+        write_dashboard(dashboard, path)
+    counts = {"nodes": sum(1 for _ in walk_nodes(dashboard["nodes"])), "edges": len(dashboard["edges"])}
+    return f"generated/{name}", counts
+
+
+class ScaleBenchmark:
+    def __init__(self, dashboard_url="http://localhost:8000/dashboard/flowdash-js.html",
+                 viewport=None, timeout=120000, zoom_samples=5, zoom_hold_ms=900):
+        self.dashboard_url = dashboard_url
+        self.viewport = viewport or {"width": 1200, "height": 800}
+        self.timeout = timeout
+        self.zoom_samples = zoom_samples
+        self.zoom_hold_ms = zoom_hold_ms
+
+    async def measure(self, browser, data_file):
+        """One cold load of a data file in a fresh context; returns a dict of metrics"""
+        context = await browser.new_context(viewport=dict(self.viewport))
+        try:
+            await context.add_init_script(INSTRUMENT_SCRIPT)
+            page = await context.new_page()
+            cdp = await context.new_cdp_session(page) if browser.browser_type.name == "chromium" else None
+            await page.goto(page_url(self.dashboard_url, data_file))
+            await page.wait_for_function("() => window.__flowdashBench && window.__flowdashBench.ready !== null",
+                                         polling="raf", timeout=self.timeout)
+            marks = await page.evaluate("() => window.__flowdashBench")
+            metrics = {
+                "first_render_ms": round(marks["firstRender"], 1) if marks["firstRender"] is not None else None,
+                "settle_ms": round(marks["layoutSettled"] - SETTLE_MS, 1),
+                "ready_ms": round(marks["ready"], 1),
+                "dom_elements": await page.evaluate("() => document.querySelectorAll('#graph *').length"),
+            }
+            metrics.update(await self.heap(page, cdp))
+
+            zoom = await page.evaluate(ZOOM_SCRIPT, {"samples": self.zoom_samples, "holdMs": self.zoom_hold_ms})
+            metrics["zoom"] = summarize_frames(zoom["frames"])
+            metrics["zoom"]["targets"] = zoom["targets"]
+            return metrics
+        finally:
+            await context.close()
+
+    async def heap(self, page, cdp):
+        if cdp is not None:
+            await cdp.send("HeapProfiler.collectGarbage")
+            usage = await cdp.send("Runtime.getHeapUsage")
+            return {"heap_used_bytes": int(usage["usedSize"]), "heap_total_bytes": int(usage["totalSize"])}
+        used = await page.evaluate("() => performance.memory ? performance.memory.usedJSHeapSize : null")
+        return {"heap_used_bytes": used, "heap_total_bytes": None}
+
+    async def run(self, datasets, repeat=1, browser_name="chromium"):
+        results = []
+        async with async_playwright() as p:
+            browser = await getattr(p, browser_name).launch(headless=True)
+            try:
+                for size, data_file, counts in datasets:
+                    print(f"\n📏 {data_file}: {counts['nodes']} nodes, {counts['edges']} edges")
+                    runs = []
+                    for i in range(repeat):
+                        try:
+                            metrics = await self.measure(browser, data_file)
+                        except Exception as e:
+                            print(f"❌ Run {i + 1}/{repeat} failed: {e}")
+                            continue
+                        runs.append(metrics)
+                        print(f"   Run {i + 1}/{repeat}: first render {metrics['first_render_ms']} ms, "
+                              f"settled {metrics['settle_ms']} ms, zoom p95 {metrics['zoom'].get('p95_ms')} ms, "
+                              f"heap {(metrics['heap_used_bytes'] or 0) / 1e6:.1f} MB")
+                    results.append({"size": size, "file": data_file, **counts,
+                                    "runs": runs, "median": median_metrics(runs)})
+                version = browser.version
+            finally:
+                await browser.close()
+        return {
+            "version": RESULTS_VERSION,
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "url": self.dashboard_url,
+            "browser": f"{browser_name} {version}",
+            "viewport": self.viewport,
+            "results": results,
+        }
+
+
+def median_metrics(runs):
+    """Median of every numeric metric over the runs, including nested zoom metrics"""
+    if not runs:
+        return None
+
+    def median_of(key, rows):
+        values = [r[key] for r in rows if isinstance(r.get(key), (int, float))]
+        return round(statistics.median(values), 2) if values else None
+
+    summary = {key: median_of(key, runs) for key in runs[0] if key != "zoom"}
+    summary["zoom"] = {key: median_of(key, [r["zoom"] for r in runs]) for key in runs[0]["zoom"]}
+    return summary
+
+
+# Metrics checked by --compare; all are "lower is better"
+COMPARED_METRICS = (
+    ("first_render_ms",), ("settle_ms",), ("ready_ms",), ("heap_used_bytes",), ("zoom", "p95_ms"),
+)
+
+
+def compare(current, previous, threshold):
+    """Print metrics that got worse by more than threshold; returns True when none did"""
+    previous_by_file = {r["file"]: r for r in previous.get("results", [])}
+    ok = True
+    for result in current["results"]:
+        before = previous_by_file.get(result["file"])
+        if not before or not before.get("median") or not result.get("median"):
+            continue
+        for path in COMPARED_METRICS:
+            old, new = before["median"], result["median"]
+            for key in path:
+                old, new = (old or {}).get(key), (new or {}).get(key)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if change > threshold:
+                ok = False
+                print(f"❌ {result['file']} {'.'.join(path)}: {old} → {new} (+{change:.0%})")
+    print("✅ No scaling regressions" if ok else f"\n⚠️  Regressions above {threshold:.0%} found")
+    return ok
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark FlowDash rendering at increasing graph sizes")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000],
+                        help="approximate node counts to benchmark (default: 1000 5000 20000)")
+    parser.add_argument("--depth", type=int, default=3, help="container depth of generated graphs (default: 3)")
+    parser.add_argument("--edge-density", type=float, default=1.0, help="edge density of generated graphs")
+    parser.add_argument("--seed", type=int, default=42, help="generator seed (default: 42)")
+    parser.add_argument("--repeat", type=int, default=3, help="cold loads per size (default: 3)")
+    parser.add_argument("--browser", default="chromium", choices=("chromium", "firefox", "webkit"))
+    parser.add_argument("--url", default="http://localhost:8000/dashboard/flowdash-js.html",
+                        help="dashboard page to load")
+    parser.add_argument("--timeout", type=int, default=120000, help="per-load timeout in ms (default: 120000)")
+    parser.add_argument("--output", default="scale-benchmark.json", help="results file (default: scale-benchmark.json)")
+    parser.add_argument("--compare", help="earlier results file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="relative slowdown counted as a regression (default: 0.25)")
+    args = parser.parse_args()
+
+    datasets = []
+    for size in args.sizes:
+        data_file, counts = ensure_dataset(size, args.depth, args.edge_density, args.seed)
+        datasets.append((size, data_file, counts))
+
+    print("🚀 Starting scale benchmark...")
+    benchmark = ScaleBenchmark(args.url, timeout=args.timeout)
+    results = await benchmark.run(datasets, repeat=args.repeat, browser_name=args.browser)
+    results["generator"] = {"version": GENERATOR_VERSION, "depth": args.depth,
+                            "edgeDensity": args.edge_density, "seed": args.seed}
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Results written to {args.output}")
+
+    if any(not r["runs"] for r in results["results"]):
+        return 1
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+        return 0 if compare(results, previous, args.threshold) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
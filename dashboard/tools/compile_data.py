@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Compile FlowDash dashboard data files: validate them and add a lookup index
+
+Validates each file in one pass over the node tree (node shape, statuses, duplicate
+ids, edges and parentIds pointing at unknown nodes) and writes an ``index`` section
+into the file with datasetId -> node ids. The dashboard (``js/dataIndex.js``) uses the
+section for dataset lookups while its fingerprint matches the node tree; files with
+errors are not written. Only the section is replaced, the rest of the file keeps its
+formatting.
+
+Role children that adapter, foundation and mart containers create at runtime
+(``<role>_<container id>``) are valid edge endpoints and parentIds.
+
+Usage:
+    python compile_data.py [FILES...]        # default: all dashboard/data/*.json
+    python compile_data.py --check           # exit 1 on errors or a missing/stale index
+"""
+
+import argparse
+import glob
+import os
+import sys
+
+from dashboard_data import (DATA_DIR, NODE_STATUSES, data_path, js_string, load_dashboard, role_children,
+                            write_json_section)
+
+INDEX_VERSION = 2
+SECTION = "index"
+
+STATUSES = {status.lower() for status in NODE_STATUSES}
+
+
+def data_fingerprint(nodes):
+    """FNV-1a hash of the node tree; mirrors dataFingerprint() in js/dataIndex.js"""
+    h = 0x811C9DC5
+
+    def visit(items, depth):
+        nonlocal h
+        for node in items or []:
+            dataset_id = node.get("datasetId")
+            line = (f"{depth}\t{js_string(node['id']) if 'id' in node else 'undefined'}\t"
+                    f"{'' if dataset_id is None else js_string(dataset_id)}\t{len(node.get('children') or [])}\n")
+            units = line.encode("utf-16-le")
+            for i in range(0, len(units), 2):
+                h = ((h ^ (units[i] | units[i + 1] << 8)) * 0x01000193) & 0xFFFFFFFF
+            visit(node.get("children"), depth + 1)
+
+    visit(nodes, 0)
+    return f"{h:08x}"
+
+
+def edge_endpoint(value):
+    if isinstance(value, dict):
+        value = value.get("id")
+    return value if isinstance(value, (str, int)) and not isinstance(value, bool) else None
+
+
+def compile_dashboard(dashboard):
+    """Validate a dashboard and build its index section; returns (index, errors)"""
+    errors = []
+    paths, datasets = {}, {}  # paths only locate duplicate ids in error messages
+    implied = set()  # runtime role child ids
+    parent_refs = []
+    node_count = 0
+
+    if not isinstance(dashboard, dict) or not isinstance(dashboard.get("nodes"), list):
+        return None, ["top level: expected an object with a 'nodes' list"]
+
+    def visit(items, prefix, location):
+        nonlocal node_count
+        for i, node in enumerate(items):
+            where = f"{location}[{i}]"
+            if not isinstance(node, dict):
+                errors.append(f"{where}: node is not an object")
+                continue
+            node_count += 1
+            node_id = node.get("id")
+            if not isinstance(node_id, (str, int)) or isinstance(node_id, bool) or node_id == "":
+                errors.append(f"{where}: missing or invalid id {node_id!r}")
+                continue
+            key = js_string(node_id)
+            if key in paths:
+                errors.append(f"{where}: duplicate id {key!r} (first at nodes{format_path(paths[key])})")
+                continue
+            paths[key] = prefix + [i]
+
+            for field in ("label", "type"):
+                if field in node and not isinstance(node[field], str):
+                    errors.append(f"{where} ({key}): {field} must be a string")
+            if node.get("layout") is not None and not isinstance(node["layout"], dict):
+                errors.append(f"{where} ({key}): layout must be an object")
+            state = node.get("state")
+            if state is not None and str(state).lower() not in STATUSES:
+                errors.append(f"{where} ({key}): unknown state {state!r}")
+            dataset_id = node.get("datasetId")
+            if dataset_id is not None:
+                if isinstance(dataset_id, (str, int)) and not isinstance(dataset_id, bool):
+                    datasets.setdefault(js_string(dataset_id), []).append(key)
+                else:
+                    errors.append(f"{where} ({key}): invalid datasetId {dataset_id!r}")
+            refs = node.get("parentIds", [node["parentId"]] if node.get("parentId") is not None else [])
+            parent_refs.extend((where, key, ref) for ref in (refs if isinstance(refs, list) else [refs]))
+
+            children = node.get("children")
+            if children is not None and not isinstance(children, list):
+                errors.append(f"{where} ({key}): children must be a list")
+                children = None
+            implied.update(role_children(node))
+            if children:
+                visit(children, prefix + [i], f"{where}.children")
+
+    visit(dashboard["nodes"], [], "nodes")
+
+    known = paths.keys() | implied
+    for where, key, ref in parent_refs:
+        if js_string(ref) not in known:
+            errors.append(f"{where} ({key}): parentId {ref!r} does not exist")
+
+    edges = dashboard.get("edges", [])
+    if not isinstance(edges, list):
+        errors.append("edges: expected a list")
+        edges = []
+    for i, edge in enumerate(edges):
+        where = f"edges[{i}]"
+        if not isinstance(edge, dict):
+            errors.append(f"{where}: edge is not an object")
+            continue
+        source, target = edge_endpoint(edge.get("source")), edge_endpoint(edge.get("target"))
+        dangling = [f"{end} {edge.get(end)!r}" for end, value in (("source", source), ("target", target))
+                    if value is None or js_string(value) not in known]
+        if dangling:
+            errors.append(f"{where}: unknown {' and '.join(dangling)}")
+
+    if errors:
+        return None, errors
+    return {
+        "version": INDEX_VERSION,
+        "fingerprint": data_fingerprint(dashboard["nodes"]),
+        "nodeCount": node_count,
+        "datasets": datasets,
+    }, []
+
+
+def format_path(path):
+    return "".join(f"[{i}]" if n == 0 else f".children[{i}]" for n, i in enumerate(path))
+
+
+def data_file_name(arg):
+    if os.path.exists(arg):
+        return os.path.relpath(os.path.abspath(arg), DATA_DIR).replace(os.sep, "/")
+    return arg
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate FlowDash data files and write their lookup index")
+    parser.add_argument("files", nargs="*", help="data files in dashboard/data (default: all *.json)")
+    parser.add_argument("--check", action="store_true", help="do not write; fail on errors or a missing/stale index")
+    parser.add_argument("--max-errors", type=int, default=20, help="errors listed per file (default: 20)")
+    args = parser.parse_args()
+
+    files = [data_file_name(f) for f in args.files] or sorted(
+        os.path.basename(p) for p in glob.glob(os.path.join(DATA_DIR, "*.json")))
+    print(f"{'🔍 Checking' if args.check else '🛠️  Compiling'} {len(files)} data files...")
+    ok = True
+    for name in files:
+        try:
+            dashboard = load_dashboard(name)
+        except (OSError, ValueError) as e:
+            ok = False
+            print(f"❌ {name}: {e}")
+            continue
+        index, errors = compile_dashboard(dashboard)
+        if errors:
+            ok = False
+            print(f"❌ {name}: {len(errors)} errors")
+            for error in errors[:args.max_errors]:
+                print(f"   {error}")
+            if len(errors) > args.max_errors:
+                print(f"   ... {len(errors) - args.max_errors} more")
+            continue
+        summary = f"{index['nodeCount']} nodes, {len(index['datasets'])} datasets, fingerprint {index['fingerprint']}"
+        if args.check:
+            if dashboard.get(SECTION) == index:
+                print(f"✅ {name}: index is current ({summary})")
+            else:
+                ok = False
+                print(f"❌ {name}: index {'is stale' if SECTION in dashboard else 'is missing'}")
+        elif dashboard.get(SECTION) == index:
+            print(f"✅ {name}: index already current ({summary})")
+        else:
+            write_json_section(data_path(name), SECTION, index)
+            print(f"✅ {name}: index written ({summary})")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
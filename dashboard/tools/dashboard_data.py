@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for reading FlowDash dashboard data files (``dashboard/data/*.json``)
+
+A dashboard file has ``settings``, a ``nodes`` tree (containers carry ``children``)
+and a flat ``edges`` list with ``source``/``target`` node ids.
+"""
+
+import decimal
+import json
+import math
+import os
+import stat
+import tempfile
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+DASHBOARD_DIR = os.path.dirname(TOOLS_DIR)
+DATA_DIR = os.path.join(DASHBOARD_DIR, "data")
+
+# os.umask can only be read by setting it
+UMASK = os.umask(0)
+os.umask(UMASK)
+
+# Mirrors NodeStatus in js/nodeBase.js
+NODE_STATUSES = (
+    "Undetermined", "Unknown", "Disabled",
+    "Ready", "Updating", "Updated", "Skipped",
+    "Delayed", "Warning", "Error",
+)
+
+
+def data_path(name):
+    """Resolve a bare data file name (e.g. theme_2.json) against dashboard/data"""
+    if os.path.exists(name) or os.path.isabs(name):
+        return name
+    return os.path.join(DATA_DIR, name)
+
+
+def load_dashboard(path):
+    with open(data_path(path), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_atomic(path, data):
+    """Write bytes to path via a temporary file and rename, so readers never see partial output
+
+    mkstemp creates owner-only files, so the temporary file first gets the mode of the file it
+    replaces, or 0666 minus the umask for a new file, as open() would create it.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = 0o666 & ~UMASK
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_json_atomic(path, data):
+    """Write a data file via a temporary file, so readers never see a partial file"""
+    write_atomic(path, (json.dumps(data, indent=2, ensure_ascii=False) + "\n").encode("utf-8"))
+
+
+def top_level_members(text):
+    """(key, key_start, value_start, value_end) of each member of the JSON object in text"""
+    decoder = json.JSONDecoder()
+    ws = json.decoder.WHITESPACE.match
+    pos = ws(text, 0).end()
+    if text[pos:pos + 1] != "{":
+        raise ValueError("expected a JSON object")
+    members = []
+    pos = ws(text, pos + 1).end()
+    while text[pos:pos + 1] != "}":
+        if members:
+            if text[pos:pos + 1] != ",":
+                raise ValueError(f"expected ',' at offset {pos}")
+            pos = ws(text, pos + 1).end()
+        key_start = pos
+        key, pos = decoder.raw_decode(text, pos)
+        pos = ws(text, pos).end()
+        if text[pos:pos + 1] != ":":
+            raise ValueError(f"expected ':' at offset {pos}")
+        value_start = ws(text, pos + 1).end()
+        _, pos = decoder.raw_decode(text, value_start)
+        members.append((key, key_start, value_start, pos))
+        pos = ws(text, pos).end()
+    return members
+
+
+def write_json_section(path, key, value):
+    """Set one top-level section of a data file and leave the rest of its text untouched
+
+    Data files are formatted by hand, so rewriting the whole file would reformat it. The
+    section is dumped with the file's own indentation and replaces the existing value, or
+    is appended as the last member.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    members = top_level_members(text)
+    if members:
+        first = members[0][1]
+        indent = text[text.rfind("\n", 0, first) + 1:first]
+    else:
+        indent = "  "
+    dumped = json.dumps(value, indent=indent or None, ensure_ascii=False).replace("\n", "\n" + indent)
+    existing = next((m for m in members if m[0] == key), None)
+    if existing is not None:
+        text = text[:existing[2]] + dumped + text[existing[3]:]
+    elif members:
+        end = members[-1][3]
+        separator = ",\n" + indent if indent else ","
+        text = f"{text[:end]}{separator}{json.dumps(key)}: {dumped}{text[end:]}"
+    else:
+        start = text.index("{") + 1
+        text = f"{text[:start]}\n{indent}{json.dumps(key)}: {dumped}\n{text[start:].lstrip()}"
+    write_atomic(path, text.encode("utf-8"))
+
+
+def walk_nodes(nodes, parent=None, depth=0):
+    """Yield (node, parent, depth) for every node in the tree, parents before children"""
+    for node in nodes or []:
+        yield node, parent, depth
+        yield from walk_nodes(node.get("children"), node, depth + 1)
+
+
+# Mirrors containerNodeTypes in js/nodeRegistry.js
+CONTAINER_TYPES = ("group", "lane", "columns", "adapter", "foundation", "mart", "edge-demo")
+
+
+def is_container(node):
+    return str(node.get("type", "")).lower() in CONTAINER_TYPES
+
+
+def js_number(value):
+    """Number.prototype.toString() of a number: shortest digits, exponent outside [1e-7, 1e21)"""
+    if value != value:
+        return "NaN"
+    if value in (math.inf, -math.inf):
+        return "Infinity" if value > 0 else "-Infinity"
+    if value == 0:
+        return "0"
+    if value < 0:
+        return "-" + js_number(-value)
+    # repr gives the shortest round-tripping digits, as JavaScript does
+    _, digits, exponent = decimal.Decimal(repr(float(value))).normalize().as_tuple()
+    digits = "".join(map(str, digits))
+    k, n = len(digits), exponent + len(digits)
+    if k <= n <= 21:
+        return digits + "0" * (n - k)
+    if 0 < n <= 21:
+        return f"{digits[:n]}.{digits[n:]}"
+    if -6 < n <= 0:
+        return f"0.{'0' * -n}{digits}"
+    mantissa = digits if k == 1 else f"{digits[0]}.{digits[1:]}"
+    return f"{mantissa}e{'+' if n > 0 else '-'}{abs(n - 1)}"
+
+
+def js_string(value):
+    """String(value) as JavaScript would produce it, e.g. for node ids used as keys"""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int) and abs(value) < 10 ** 21:
+        return str(value)
+    if isinstance(value, (int, float)):
+        return js_number(value)
+    return str(value)
+
+
+# Mirrors the role children adapter, foundation and mart nodes add to their data
+# (initializeNodeDataStatic in js/nodeAdapter.js, js/nodeFoundation.js, js/nodeMart.js):
+# role -> label fragments that identify an explicit child with that role
+ROLE_LABELS = {
+    "adapter": {"staging": ("staging", "stg"), "archive": ("archive", "arc"),
+                "transform": ("transform", "trf", "trn", "tfm")},
+    "foundation": {"raw": ("raw",), "base": ("base",)},
+    "mart": {"load": ("load",), "report": ("report", "rprt")},
+}
+ADAPTER_MODE_ROLES = {
+    "full": ("staging", "archive", "transform"),
+    "staging-archive": ("staging", "archive"),
+    "staging-transform": ("staging", "transform"),
+    "archive-only": ("archive",),
+}
+
+
+def child_role(child, node_type):
+    """Role of an explicit child of an adapter/foundation/mart node, or None"""
+    labels = ROLE_LABELS.get(node_type, {})
+    role = str(child.get("role") or "").lower()
+    if role:
+        return role if role in labels else None
+    category = str(child.get("category") or "").lower()
+    if category in labels:
+        return category
+    label = str(child.get("label") or "").lower()
+    return next((r for r, fragments in labels.items() if any(f in label for f in fragments)), None)
+
+
+def role_children(node):
+    """Ids of the role children the dashboard adds to an adapter, foundation or mart node"""
+    node_type = str(node.get("type", "")).lower()
+    layout = node.get("layout") or {}
+    mode = layout.get("mode")
+    if node_type == "adapter":
+        roles = ADAPTER_MODE_ROLES.get(mode or "full", ADAPTER_MODE_ROLES["full"])
+    elif node_type == "foundation":
+        roles = () if isinstance(mode, str) and mode.lower() == "manual" else ("raw", "base")
+    elif node_type == "mart":
+        roles = ("load", "report") if (mode or "auto") == "auto" else ()
+    else:
+        return []
+    present = {child_role(child, node_type) for child in node.get("children") or [] if isinstance(child, dict)}
+    return [f"{role}_{js_string(node.get('id'))}" for role in roles if role not in present]
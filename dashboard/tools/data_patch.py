@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+"""
+Structural diff and patch for FlowDash dashboard data files, plus a patch service
+
+``diff`` computes a minimal patch between two versions of a dashboard file, keyed by
+node id: removed nodes (topmost only), added subtrees, moved or reordered nodes,
+changed node fields (label, layout, type, state, ...) and edge changes (keyed by
+source/target). ``apply`` reproduces the new version from the old one and the patch.
+The dashboard applies patches with ``Dashboard.applyPatch`` (``js/dataPatch.js``),
+which re-renders only the affected containers and edges and keeps the zoom.
+
+Every version is identified by ``data_version`` - a hash of the nodes and (in any order)
+the edges that ``dataVersion()`` in ``js/dataPatch.js`` computes the same way in the
+browser.
+Settings are not part of patches: a patch that carries ``settings`` makes the
+dashboard fall back to a full reload.
+
+``serve`` watches ``dashboard/data`` and keeps the recent versions of every file, so
+a dashboard can ask for the patch from the version it shows to the current one:
+
+    GET /version?file=theme_2.json              {"file": ..., "version": ...}
+    GET /patch?file=theme_2.json&from=<version> {"version": ..., "patch": {...} | null}
+                                                409 when there is no patch (unknown version,
+                                                duplicate ids): load the full file
+
+Usage:
+    python data_patch.py diff old.json new.json [--output patch.json]
+    python data_patch.py apply old.json patch.json [--output new.json]
+    python data_patch.py serve [--port 8011] [--interval 5]
+"""
+
+import argparse
+import asyncio
+import copy
+import glob
+import json
+import os
+import sys
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlsplit
+
+from dashboard_data import DATA_DIR, data_path, js_string, load_dashboard, write_json_atomic
+
+PATCH_VERSION = 1
+HISTORY_SIZE = 24
+PATCH_CACHE_SIZE = 64
+
+
+class PatchUnavailable(Exception):
+    """No patch from the requested version; the client has to load the full file"""
+
+
+def canonical(value):
+    """Canonical JSON text; mirrors canonical() in js/precomputedLayout.js"""
+    if value is None:
+        return "null"
+    if isinstance(value, list):
+        return "[" + ",".join(canonical(v) for v in value) + "]"
+    if isinstance(value, dict):
+        return "{" + ",".join(f"{json.dumps(k, ensure_ascii=False)}:{canonical(value[k])}"
+                              for k in sorted(value)) + "}"
+    if isinstance(value, str):
+        return json.dumps(value, ensure_ascii=False)
+    return js_string(value)
+
+
+def _imul(a, b):
+    return (a * b) & 0xFFFFFFFF
+
+
+def hash53(text, seed=0):
+    """53-bit string hash (cyrb53) over UTF-16 code units; mirrors hash53() in js/precomputedLayout.js"""
+    h1, h2 = 0xDEADBEEF ^ seed, 0x41C6CE57 ^ seed
+    units = text.encode("utf-16-le")
+    for i in range(0, len(units), 2):
+        ch = units[i] | units[i + 1] << 8
+        h1 = _imul(h1 ^ ch, 2654435761)
+        h2 = _imul(h2 ^ ch, 1597334677)
+    h1 = _imul(h1 ^ (h1 >> 16), 2246822507)
+    h1 ^= _imul(h2 ^ (h2 >> 13), 3266489909)
+    h2 = _imul(h2 ^ (h2 >> 16), 2246822507)
+    h2 ^= _imul(h1 ^ (h1 >> 13), 3266489909)
+    return f"{4294967296 * (2097151 & h2) + h1:014x}"
+
+
+def data_version(dashboard):
+    """Version of the nodes and edges of a dashboard; mirrors dataVersion() in js/dataPatch.js
+
+    Patches do not keep the order of edges, so edges count as a multiset: the sorted
+    hashes of the edges (hex, so both sides sort them the same way) are hashed.
+    """
+    edges = sorted(hash53(canonical(edge)) for edge in dashboard.get("edges") or [])
+    return hash53(canonical([dashboard.get("nodes") or [], edges]))
+
+
+def index_tree(nodes):
+    """id -> (node, parent id) for a node tree; patches need unique ids"""
+    entries = {}
+
+    def visit(items, parent):
+        for node in items or []:
+            key = js_string(node.get("id"))
+            if key in entries:
+                raise ValueError(f"duplicate node id {key!r}")
+            entries[key] = (node, parent)
+            visit(node.get("children"), key)
+
+    visit(nodes, None)
+    return entries
+
+
+def edge_key(edge):
+    ends = [edge.get(end) for end in ("source", "target")]
+    return tuple(js_string(e.get("id") if isinstance(e, dict) else e) for e in ends)
+
+
+def group_edges(edges):
+    groups = {}
+    for edge in edges or []:
+        if isinstance(edge, dict):
+            groups.setdefault(edge_key(edge), []).append(edge)
+    return groups
+
+
+def longest_increasing(values):
+    """Positions of a longest strictly increasing subsequence of values"""
+    tails, previous = [], [None] * len(values)
+    for i, value in enumerate(values):
+        lo, hi = 0, len(tails)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if values[tails[mid]] < value:
+                lo = mid + 1
+            else:
+                hi = mid
+        previous[i] = tails[lo - 1] if lo else None
+        if lo == len(tails):
+            tails.append(i)
+        else:
+            tails[lo] = i
+    keep, i = set(), tails[-1] if tails else None
+    while i is not None:
+        keep.add(i)
+        i = previous[i]
+    return keep
+
+
+def diff_dashboards(old, new):
+    """Minimal structural patch that turns old into new"""
+    old_nodes, new_nodes = index_tree(old.get("nodes")), index_tree(new.get("nodes"))
+    old_position = {}
+    for key, (node, parent) in old_nodes.items():
+        siblings = old.get("nodes") if parent is None else old_nodes[parent][0].get("children")
+        old_position[key] = next(i for i, sibling in enumerate(siblings) if sibling is node)
+
+    # New ids are sent as whole subtrees, including anything that moved into them
+    added, fresh = [], set()
+
+    def collect(items, parent, in_added):
+        for i, node in enumerate(items or []):
+            key = js_string(node.get("id"))
+            is_fresh = in_added or key not in old_nodes
+            if is_fresh:
+                fresh.add(key)
+                if not in_added:
+                    added.append({"parent": parent, "index": i, "node": node})
+            collect(node.get("children"), key, is_fresh)
+
+    collect(new.get("nodes"), None, False)
+    kept = set(new_nodes) - fresh
+    removed = [key for key, (_, parent) in old_nodes.items()
+               if key not in kept and (parent is None or parent in kept)]
+
+    moved, updated = [], []
+
+    def place(items, parent):
+        stayed = []  # (index, id) of kept children that did not change parent
+        for i, node in enumerate(items or []):
+            key = js_string(node.get("id"))
+            if key not in kept:
+                continue
+            if old_nodes[key][1] != parent:
+                moved.append({"id": key, "parent": parent, "index": i})
+            else:
+                stayed.append((i, key))
+            place(node.get("children"), key)
+        in_order = longest_increasing([old_position[key] for _, key in stayed])
+        moved.extend({"id": key, "parent": parent, "index": i}
+                     for n, (i, key) in enumerate(stayed) if n not in in_order)
+
+    place(new.get("nodes"), None)
+
+    for key in (key for key in new_nodes if key in kept):
+        before, after = old_nodes[key][0], new_nodes[key][0]
+        changes = {k: v for k, v in after.items() if k != "children" and (k not in before or before[k] != v)}
+        unset = [k for k in before if k != "children" and k not in after]
+        if "children" in before and "children" not in after:
+            unset.append("children")
+        elif "children" not in before and after.get("children") == []:
+            changes["children"] = []
+        if changes or unset:
+            update = {"id": key}
+            if changes:
+                update["set"] = changes
+            if unset:
+                update["unset"] = unset
+            updated.append(update)
+
+    old_edges, new_edges = group_edges(old.get("edges")), group_edges(new.get("edges"))
+    patch = {
+        "version": PATCH_VERSION,
+        "from": data_version(old),
+        "to": data_version(new),
+        "removed": removed,
+        "added": added,
+        "moved": moved,
+        "updated": updated,
+        "edges": {
+            "removed": [list(key) for key, edges in old_edges.items() if new_edges.get(key) != edges],
+            "added": [edge for key, edges in new_edges.items() if old_edges.get(key) != edges for edge in edges],
+        },
+    }
+    if old.get("settings") != new.get("settings"):
+        patch["settings"] = new.get("settings")
+    return patch
+
+
+def apply_patch(dashboard, patch):
+    """The dashboard with the patch applied (the input is not modified)"""
+    if patch.get("version") != PATCH_VERSION:
+        raise ValueError(f"unsupported patch version {patch.get('version')!r}")
+    data = copy.deepcopy(dashboard)
+    entries = index_tree(data.get("nodes"))
+
+    def siblings(parent):
+        if parent is None:
+            return data.setdefault("nodes", [])
+        node = entries[parent][0]
+        if node.get("children") is None:
+            node["children"] = []
+        return node["children"]
+
+    def detach(key):
+        node, parent = entries[key]
+        items = siblings(parent)
+        del items[next(i for i, sibling in enumerate(items) if sibling is node)]
+        return node
+
+    for key in patch["removed"]:
+        detach(key)
+    inserts = [(move["index"], move["parent"], detach(move["id"])) for move in patch["moved"]]
+    inserts += [(add["index"], add["parent"], copy.deepcopy(add["node"])) for add in patch["added"]]
+    for update in patch["updated"]:
+        node = entries[update["id"]][0]
+        node.update(copy.deepcopy(update.get("set", {})))
+        for field in update.get("unset", []):
+            node.pop(field, None)
+    # Ascending final positions: every insert lands between siblings that are already in place
+    for index, parent, node in sorted(inserts, key=lambda insert: insert[0]):
+        siblings(parent).insert(index, node)
+
+    removed_edges = {tuple(key) for key in patch["edges"]["removed"]}
+    data["edges"] = [edge for edge in data.get("edges") or []
+                     if not (isinstance(edge, dict) and edge_key(edge) in removed_edges)]
+    data["edges"].extend(copy.deepcopy(patch["edges"]["added"]))
+    if "settings" in patch:
+        data["settings"] = copy.deepcopy(patch["settings"])
+    return data
+
+
+def patch_size(patch):
+    return len(json.dumps(patch, separators=(",", ":")).encode("utf-8"))
+
+
+def describe(patch):
+    return (f"{len(patch['removed'])} removed, {len(patch['added'])} added, {len(patch['moved'])} moved, "
+            f"{len(patch['updated'])} updated nodes; {len(patch['edges']['removed'])} removed, "
+            f"{len(patch['edges']['added'])} added edges")
+
+
+class DataVersions:
+    """Recent versions of the data files, to compute patches from any of them to the current one"""
+
+    def __init__(self, data_dir=DATA_DIR, history_size=HISTORY_SIZE):
+        self.data_dir = os.path.realpath(data_dir)
+        self.history_size = history_size
+        self.files = {}     # name -> {"mtime_ns", "version", "history": OrderedDict(version -> data)}
+        self.patches = OrderedDict()
+
+    def resolve(self, name):
+        path = os.path.realpath(os.path.join(self.data_dir, name or ""))
+        if not path.startswith(self.data_dir + os.sep) or not path.endswith(".json"):
+            raise ValueError(f"not a data file: {name!r}")
+        return path
+
+    def refresh(self, name):
+        """Current version of a data file, loading it again when it changed on disk"""
+        path = self.resolve(name)
+        mtime_ns = os.stat(path).st_mtime_ns
+        entry = self.files.get(name)
+        if entry is None or entry["mtime_ns"] != mtime_ns:
+            data = load_dashboard(path)
+            version = data_version(data)
+            entry = self.files.setdefault(name, {"history": OrderedDict()})
+            entry.update(mtime_ns=mtime_ns, version=version)
+            entry["history"].pop(version, None)
+            entry["history"][version] = data
+            while len(entry["history"]) > self.history_size:
+                entry["history"].popitem(last=False)
+        return entry["version"]
+
+    def refresh_all(self):
+        for path in glob.glob(os.path.join(self.data_dir, "*.json")):
+            try:
+                self.refresh(os.path.basename(path))
+            except (OSError, ValueError) as e:
+                print(f"⚠️  {os.path.basename(path)}: {e}")
+
+    def patch(self, name, from_version):
+        """Patch from a known version to the current one (None when unchanged)"""
+        current = self.refresh(name)
+        if from_version == current:
+            return current, None
+        history = self.files[name]["history"]
+        if from_version not in history:
+            raise PatchUnavailable("unknown version")
+        key = (name, from_version, current)
+        if key not in self.patches:
+            try:
+                self.patches[key] = diff_dashboards(history[from_version], history[current])
+            except ValueError as e:
+                raise PatchUnavailable(str(e))
+            while len(self.patches) > PATCH_CACHE_SIZE:
+                self.patches.popitem(last=False)
+        return current, self.patches[key]
+
+
+class PatchServer:
+    def __init__(self, versions):
+        self.versions = versions
+
+    async def handle(self, reader, writer):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+            method, target, _ = head.decode("latin-1").split("\r\n")[0].split(" ", 2)
+            url = urlsplit(target)
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+            if method == "OPTIONS":
+                await self.send(writer, 204, b"", extra={"Access-Control-Allow-Methods": "GET, OPTIONS"})
+            elif method != "GET":
+                await self.send_json(writer, 405, {"error": "method not allowed"})
+            elif url.path == "/version":
+                version = self.versions.refresh(query.get("file"))
+                await self.send_json(writer, 200, {"file": query.get("file"), "version": version})
+            elif url.path == "/patch":
+                try:
+                    version, patch = self.versions.patch(query.get("file"), query.get("from"))
+                except PatchUnavailable as e:
+                    version = self.versions.refresh(query.get("file"))
+                    await self.send_json(writer, 409, {"error": str(e), "version": version})
+                    return
+                await self.send_json(writer, 200, {"version": version, "patch": patch})
+            else:
+                await self.send_json(writer, 404, {"error": "not found"})
+        except (ValueError, OSError) as e:
+            try:
+                await self.send_json(writer, 400, {"error": str(e)})
+            except ConnectionError:
+                pass
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    async def send(self, writer, status, body, content_type="application/json", extra=None):
+        head = [f"HTTP/1.1 {status} {'OK' if status < 300 else 'Error'}",
+                f"Content-Type: {content_type}",
+                f"Content-Length: {len(body)}",
+                "Cache-Control: no-cache",
+                "Access-Control-Allow-Origin: *",
+                "Connection: close"]
+        head.extend(f"{k}: {v}" for k, v in (extra or {}).items())
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    async def send_json(self, writer, status, payload):
+        await self.send(writer, status, json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+
+
+async def serve(args):
+    versions = DataVersions()
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, versions.refresh_all)
+    print(f"📚 Watching {len(versions.files)} data files in {versions.data_dir}")
+    server = PatchServer(versions)
+    srv = await asyncio.start_server(server.handle, args.bind, args.port, limit=64 * 1024)
+    print(f"🩹 Data patches on http://{args.bind or 'localhost'}:{args.port}/patch")
+    async with srv:
+        # Pick up new versions even when nobody asks, so older versions stay patchable
+        while True:
+            await asyncio.sleep(args.interval)
+            await loop.run_in_executor(None, versions.refresh_all)
+
+
+def write_output(data, output):
+    if output:
+        write_json_atomic(output, data)
+    else:
+        json.dump(data, sys.stdout, indent=2, ensure_ascii=False)
+        sys.stdout.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Structural diff/patch for FlowDash data files")
+    commands = parser.add_subparsers(dest="command", required=True)
+    diff_cmd = commands.add_parser("diff", help="patch between two versions of a data file")
+    diff_cmd.add_argument("old")
+    diff_cmd.add_argument("new")
+    diff_cmd.add_argument("--output", "-o", help="write the patch here (default: stdout)")
+    apply_cmd = commands.add_parser("apply", help="apply a patch to a data file")
+    apply_cmd.add_argument("data_file")
+    apply_cmd.add_argument("patch")
+    apply_cmd.add_argument("--output", "-o", help="write the result here (default: stdout)")
+    serve_cmd = commands.add_parser("serve", help="serve patches between versions of dashboard/data files")
+    serve_cmd.add_argument("--port", type=int, default=8011, help="port to listen on (default: 8011)")
+    serve_cmd.add_argument("--bind", default=None, help="address to bind to (default: all interfaces)")
+    serve_cmd.add_argument("--interval", type=float, default=5, help="seconds between data dir scans (default: 5)")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        try:
+            asyncio.run(serve(args))
+        except KeyboardInterrupt:
+            print("\n⏹️  Patch service stopped")
+        return 0
+
+    try:
+        if args.command == "diff":
+            old, new = load_dashboard(args.old), load_dashboard(args.new)
+            patch = diff_dashboards(old, new)
+            write_output(patch, args.output)
+            print(f"🩹 {describe(patch)}: {patch_size(patch) / 1024:.1f} KB "
+                  f"(full file {os.path.getsize(data_path(args.new)) / 1024:.0f} KB)", file=sys.stderr)
+        else:
+            with open(args.patch, "r", encoding="utf-8") as f:
+                patch = json.load(f)
+            dashboard = load_dashboard(args.data_file)
+            if patch.get("from") != data_version(dashboard):
+                print(f"❌ {args.data_file} is not the version the patch was made for", file=sys.stderr)
+                return 1
+            write_output(apply_patch(dashboard, patch), args.output)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Synthetic large-graph generator for FlowDash scale testing
+
+Emits dashboard JSON in the same schema as ``dashboard/data/*.json``: a root
+``columns`` node with Sources / Foundation / Marts stages, nested
+``columns``/``lane`` containers, ``adapter``/``foundation``/``mart`` groups with
+role children, and ``edges`` flowing from sources to foundations to marts. Like
+in the real data, edges connect leaf nodes: the last role of a group (e.g. an
+adapter's archive) feeds the first role of a group in the next stage (raw, load).
+The same arguments and seed always produce the same file.
+
+Usage:
+    python generate_graph.py --nodes 5000 [--depth 3] [--edge-density 1.5] [--seed 42] [--out FILE]
+    python generate_graph.py --sizes 1000 5000 20000 40000    # writes data/generated/scale-<n>.json
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+
+from dashboard_data import DATA_DIR, walk_nodes
+
+GENERATED_DIR = os.path.join(DATA_DIR, "generated")
+# Bumped when the same arguments produce a different graph
+GENERATOR_VERSION = 2
+
+# Share of groups per stage, in flow order
+STAGES = (
+    ("sources", "Sources", "adapter", 0.5),
+    ("foundation", "Foundation", "foundation", 0.3),
+    ("marts", "Marts", "mart", 0.2),
+)
+ADAPTER_MODES = (
+    ("staging-archive", ("staging", "archive"), 0.6),
+    ("full", ("staging", "archive", "transform"), 0.25),
+    ("archive-only", ("archive",), 0.15),
+)
+GROUP_ROLES = {"foundation": ("raw", "base"), "mart": ("load", "report")}
+# Leaf statuses weighted towards a healthy warehouse
+STATUS_WEIGHTS = (
+    ("Ready", 40), ("Updated", 25), ("Updating", 8), ("Skipped", 6), ("Unknown", 6),
+    ("Delayed", 5), ("Warning", 5), ("Error", 3), ("Disabled", 2),
+)
+SETTINGS = {
+    "showCenterMark": False,
+    "showConnectionPoints": False,
+    "showGhostLines": False,
+    "showEdges": True,
+    "curved": False,
+    "showBoundingBox": False,
+    "zoomToRoot": True,
+    "toggleCollapseOnStatusChange": True,
+}
+
+
+class GraphGenerator:
+    def __init__(self, nodes=1000, depth=3, edge_density=1.0, seed=42):
+        if depth < 1:
+            raise ValueError("depth must be at least 1")
+        self.target_nodes = nodes
+        self.depth = depth
+        self.edge_density = edge_density
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.next_id = 1
+        self.next_dataset_id = 1
+        statuses, weights = zip(*STATUS_WEIGHTS)
+        self.statuses, self.status_weights = statuses, weights
+
+    def new_id(self):
+        node_id = str(self.next_id)
+        self.next_id += 1
+        return node_id
+
+    def status(self):
+        return self.rng.choices(self.statuses, self.status_weights)[0]
+
+    def leaf(self, label, role):
+        dataset_id = self.next_dataset_id
+        self.next_dataset_id += 1
+        return {
+            "id": self.new_id(),
+            "label": label,
+            "description": None,
+            "type": "node",
+            "datasetId": dataset_id,
+            "category": role,
+            "layout": None,
+            "children": [],
+            "state": self.status(),
+        }
+
+    def group(self, kind, index):
+        name = f"{kind}_{index:05d}"
+        if kind == "adapter":
+            modes, roles, weights = zip(*ADAPTER_MODES)
+            pick = self.rng.choices(range(len(modes)), weights)[0]
+            mode, child_roles = modes[pick], roles[pick]
+            layout = {"mode": mode, "displayMode": "role", "arrangement": None, "minimumSize": None}
+        else:
+            child_roles = GROUP_ROLES[kind]
+            layout = None
+        return {
+            "id": self.new_id(),
+            "label": name.upper(),
+            "description": None,
+            "type": kind.capitalize(),
+            "datasetId": None,
+            "category": "Unknown",
+            "layout": layout,
+            "children": [self.leaf(f"{role}.{name}", role) for role in child_roles],
+            "state": "Unknown",
+        }
+
+    def container(self, kind, label, children):
+        return {
+            "id": self.new_id(),
+            "label": label,
+            "type": kind,
+            "children": children,
+            "state": "Unknown",
+        }
+
+    def nest(self, items, levels, label):
+        """Wrap items in `levels` alternating lane/columns containers, lanes innermost"""
+        if levels == 0:
+            return items
+        fanout = max(1, math.ceil(len(items) ** (1.0 / (levels + 1))))
+        size = max(1, math.ceil(len(items) / fanout))
+        kind = "lane" if levels == 1 else "columns"
+        wrapped = []
+        for start in range(0, len(items), size):
+            name = f"{label} {len(wrapped) + 1}"
+            wrapped.append(self.container(kind, name, self.nest(items[start:start + size], levels - 1, name)))
+        return wrapped
+
+    def group_count(self):
+        """Groups needed for the target node count, ignoring the small nesting overhead"""
+        adapter_size = sum(len(roles) * w for _, roles, w in ADAPTER_MODES) + 1
+        avg = sum(share * (adapter_size if kind == "adapter" else 3) for _, _, kind, share in STAGES)
+        return max(len(STAGES), round(self.target_nodes / avg))
+
+    def edges(self, stage_groups):
+        """Leaf edges from each stage to the next, mostly between groups at similar positions
+
+        An edge runs from the last role of a source group to the first role of a target group.
+        """
+        edges, seen = [], set()
+        for sources, targets in zip(stage_groups, stage_groups[1:]):
+            count = round(len(sources) * self.edge_density)
+            for _ in range(count):
+                i = self.rng.randrange(len(sources))
+                # Keep edges local so the layout resembles a real warehouse, with some long links
+                center = i * len(targets) / len(sources)
+                spread = max(1.0, len(targets) * (0.02 if self.rng.random() < 0.9 else 0.5))
+                j = min(len(targets) - 1, max(0, int(self.rng.gauss(center, spread))))
+                key = (sources[i]["children"][-1]["id"], targets[j]["children"][0]["id"])
+                if key in seen:
+                    continue
+                seen.add(key)
+                edges.append({
+                    "id": str(len(edges) + 1),
+                    "isActive": self.rng.random() < 0.8,
+                    "source": key[0],
+                    "target": key[1],
+                    "type": "SSIS",
+                    "state": self.status(),
+                })
+        return edges
+
+    def generate(self):
+        total_groups = self.group_count()
+        stage_nodes, stage_groups = [], []
+        for stage_id, stage_label, kind, share in STAGES:
+            groups = [self.group(kind, i) for i in range(max(1, round(total_groups * share)))]
+            stage_groups.append(groups)
+            stage = self.container("columns", stage_label, self.nest(groups, self.depth - 1, stage_label))
+            stage["id"] = stage_id
+            stage_nodes.append(stage)
+        root = self.container("columns", f"Generated DWH ({self.target_nodes} nodes)", stage_nodes)
+        root["id"] = "generated"
+        root["layout"] = {"minimumSize": {"width": 200, "height": 100, "useRootRatio": True}}
+        return {
+            "settings": dict(SETTINGS),
+            "generator": {"version": GENERATOR_VERSION, "nodes": self.target_nodes, "depth": self.depth,
+                          "edgeDensity": self.edge_density, "seed": self.seed},
+            "nodes": [root],
+            "edges": self.edges(stage_groups),
+        }
+
+
+def generate_dashboard(nodes=1000, depth=3, edge_density=1.0, seed=42):
+    return GraphGenerator(nodes, depth, edge_density, seed).generate()
+
+
+def write_dashboard(dashboard, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(dashboard, f, separators=(",", ":"))
+    node_count = sum(1 for _ in walk_nodes(dashboard["nodes"]))
+    print(f"✅ {path}: {node_count} nodes, {len(dashboard['edges'])} edges")
+    return node_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic FlowDash dashboards for scale testing")
+    size = parser.add_mutually_exclusive_group(required=True)
+    size.add_argument("--nodes", type=int, help="approximate number of nodes")
+    size.add_argument("--sizes", type=int, nargs="+", help=f"write scale-<n>.json for each size to {GENERATED_DIR}")
+    parser.add_argument("--depth", type=int, default=3, help="container levels below the root (default: 3)")
+    parser.add_argument("--edge-density", type=float, default=1.0, help="edges per group between stages (default: 1.0)")
+    parser.add_argument("--seed", type=int, default=42, help="random seed (default: 42)")
+    parser.add_argument("--out", help="output file for --nodes (default: data/generated/scale-<n>.json)")
+    args = parser.parse_args()
+
+    if args.nodes is not None:
+        out = args.out or os.path.join(GENERATED_DIR, f"scale-{args.nodes}.json")
+        write_dashboard(generate_dashboard(args.nodes, args.depth, args.edge_density, args.seed), out)
+    else:
+        if args.out:
+            parser.error("--out can only be used with --nodes")
+        for n in args.sizes:
+            write_dashboard(generate_dashboard(n, args.depth, args.edge_density, args.seed),
+                            os.path.join(GENERATED_DIR, f"scale-{n}.json"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
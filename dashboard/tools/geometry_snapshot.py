@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Geometry snapshot regression check for the FlowDash demo pages
+
+Instead of comparing pixels, every page is rendered once and the layout it produced is
+read back in a single batched ``page.evaluate``: per node its bounding box (relative to
+the graph SVG), its translate transform, its status and whether it is collapsed, and
+per edge the bounding box of its path. The result is stored as a compact JSON snapshot
+and compared numerically against the baseline with per-field tolerances, so
+anti-aliasing and font hinting do not matter, but a node that moved, resized, changed
+status or disappeared does.
+
+Targets are the demo pages in ``01_basicNodes`` … ``08_martNodes`` and, with
+``--data``, data files shown in ``flowdash-js.html``. All targets run in one headless
+browser with several pages at once in separate browser contexts.
+
+The repository root must be served (e.g. ``python dashboard/tools/serve.py 8000``).
+
+Usage:
+    python geometry_snapshot.py --update                       # write the baselines
+    python geometry_snapshot.py                                # compare against them
+    python geometry_snapshot.py --changed-since HEAD~1 --themes light dark
+    python geometry_snapshot.py --data theme_1.json theme_2.json --tolerance x=2 y=2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from urllib.parse import urlencode
+
+from playwright.async_api import async_playwright
+
+from render_demos import READY_SCRIPT, REPO_ROOT, THEMES, changed_files, find_demo_pages, is_dirty
+
+from capture_service import page_url  # on the path via render_demos
+
+SNAPSHOT_VERSION = 1
+DEFAULT_SNAPSHOT_DIR = os.path.join(REPO_ROOT, "tests", "geometry-snapshots")
+DATA_PAGE = "dashboard/flowdash-js.html"
+
+NODE_FIELDS = ("type", "x", "y", "width", "height", "tx", "ty", "status", "collapsed")
+EDGE_FIELDS = ("x", "y", "width", "height")
+# Allowed absolute difference per numeric field, in px; other fields must match exactly
+DEFAULT_TOLERANCES = {"x": 1.0, "y": 1.0, "width": 1.0, "height": 1.0, "tx": 0.5, "ty": 0.5, "edge": 2.0}
+
+# Everything in one round trip: nodes are the elements carrying their node object
+# (nodeBase.js sets __node), edges the non-ghost edge groups. Ids that occur more
+# than once get a #n suffix so every entry has a stable key.
+GEOMETRY_SCRIPT = """
+() => {
+    const svg = document.querySelector('svg#graph') || document.querySelector('svg');
+    if (!svg) return null;
+    const origin = svg.getBoundingClientRect();
+    const round = (v) => Math.round(v * 10) / 10;
+    const box = (el) => {
+        const b = el.getBoundingClientRect();
+        return [round(b.x - origin.x), round(b.y - origin.y), round(b.width), round(b.height)];
+    };
+    const translate = (el) => {
+        const m = /translate\\(\\s*([-+\\d.e]+)(?:[\\s,]+([-+\\d.e]+))?/.exec(el.getAttribute('transform') || '');
+        return m ? [round(+m[1]), round(+(m[2] || 0))] : [0, 0];
+    };
+    const unique = (seen, id) => {
+        const n = (seen.get(id) || 0) + 1;
+        seen.set(id, n);
+        return n === 1 ? id : `${id}#${n}`;
+    };
+    const nodeIds = new Map();
+    const edgeIds = new Map();
+    const nodes = {};
+    for (const el of svg.querySelectorAll('g')) {
+        const node = el.__node;
+        if (!node) continue;
+        nodes[unique(nodeIds, String(node.id))] = [String(node.data?.type ?? ''), ...box(el), ...translate(el),
+            el.getAttribute('status') || '', el.classList.contains('collapsed') ? 1 : 0];
+    }
+    const edges = {};
+    for (const el of svg.querySelectorAll('g.edge:not(.ghostline)')) {
+        const path = el.querySelector('path.path') || el.querySelector('path');
+        if (path && el.id) edges[unique(edgeIds, el.id)] = box(path);
+    }
+    return { svg: [round(origin.width), round(origin.height)], nodes, edges };
+}
+"""
+
+
+def target_url(target, theme):
+    """Page path below the served root for a target (demo page or data:<file>)"""
+    if target.startswith("data:"):
+        return page_url(DATA_PAGE, target[5:], theme)
+    return f"{target}?{urlencode({'theme': theme})}"
+
+
+def snapshot_path(snapshot_dir, target):
+    if target.startswith("data:"):
+        return os.path.join(snapshot_dir, "data", os.path.splitext(target[5:])[0] + ".json")
+    return os.path.join(snapshot_dir, os.path.splitext(target)[0] + ".json")
+
+
+def load_snapshot(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return snapshot if snapshot.get("version") == SNAPSHOT_VERSION else None
+
+
+def write_snapshot(path, target, themes):
+    """One file per target, keyed by theme; one line per node keeps git diffs readable"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    lines = [f'{{"version": {SNAPSHOT_VERSION}, "target": {json.dumps(target)}, "themes": {{']
+    for i, (theme, geometry) in enumerate(sorted(themes.items())):
+        lines.append(f'  {json.dumps(theme)}: {{"svg": {json.dumps(geometry["svg"])}, "nodes": {{')
+        lines.append(",\n".join(f"    {json.dumps(k)}: {json.dumps(v)}" for k, v in sorted(geometry["nodes"].items())))
+        lines.append('  }, "edges": {')
+        lines.append(",\n".join(f"    {json.dumps(k)}: {json.dumps(v)}" for k, v in sorted(geometry["edges"].items())))
+        lines.append("  }}" + ("," if i < len(themes) - 1 else ""))
+    lines.append("}}")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(line for line in lines if line) + "\n")
+
+
+def compare_values(kind, key, fields, expected, actual, tolerances):
+    """Differences between two value lists of one node or edge"""
+    diffs = []
+    for field, old, new in zip(fields, expected, actual):
+        if isinstance(old, (int, float)) and isinstance(new, (int, float)):
+            tolerance = tolerances["edge"] if kind == "edge" else tolerances.get(field, 0.0)
+            if abs(new - old) <= tolerance:
+                continue
+            diffs.append(f"{kind} {key}: {field} {old} -> {new} (Δ{new - old:+.1f})")
+        elif old != new:
+            diffs.append(f"{kind} {key}: {field} {old!r} -> {new!r}")
+    return diffs
+
+
+def compare_geometry(expected, actual, tolerances=DEFAULT_TOLERANCES):
+    """Human-readable differences between a baseline and a fresh geometry; empty if they match"""
+    diffs = []
+    for kind, fields, section in (("node", NODE_FIELDS, "nodes"), ("edge", EDGE_FIELDS, "edges")):
+        old, new = expected.get(section, {}), actual.get(section, {})
+        diffs += [f"{kind} {key}: missing" for key in sorted(old.keys() - new.keys())]
+        diffs += [f"{kind} {key}: unexpected" for key in sorted(new.keys() - old.keys())]
+        for key in sorted(old.keys() & new.keys()):
+            diffs += compare_values(kind, key, fields, old[key], new[key], tolerances)
+    return diffs
+
+
+def parse_tolerances(items):
+    tolerances = dict(DEFAULT_TOLERANCES)
+    for item in items or []:
+        field, _, value = item.partition("=")
+        if field not in tolerances:
+            raise ValueError(f"unknown tolerance field {field!r} (one of {', '.join(tolerances)})")
+        tolerances[field] = float(value)
+    return tolerances
+
+
+async def capture(browser, base_url, target, theme, viewport, timeout):
+    """Geometry of one target in one theme, or an error message"""
+    context = await browser.new_context(viewport=dict(viewport), reduced_motion="reduce")
+    try:
+        page = await context.new_page()
+        await page.goto(f"{base_url.rstrip('/')}/{target_url(target, theme)}")
+        await page.wait_for_function(READY_SCRIPT, arg=theme, polling="raf", timeout=timeout)
+        geometry = await page.evaluate(GEOMETRY_SCRIPT)
+        return (geometry, None) if geometry else (None, "no graph SVG")
+    except Exception as e:
+        return None, str(e).splitlines()[0]
+    finally:
+        await context.close()
+
+
+async def capture_all(jobs, options):
+    semaphore = asyncio.Semaphore(options["contexts"])
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        try:
+            async def run(target, theme):
+                async with semaphore:
+                    return target, theme, *await capture(browser, options["base_url"], target, theme,
+                                                         options["viewport"], options["timeout"])
+            return await asyncio.gather(*(run(target, theme) for target, theme in jobs))
+        finally:
+            await browser.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare FlowDash node and edge geometry against snapshots")
+    parser.add_argument("--base-url", default="http://localhost:8000", help="URL the repository root is served at")
+    parser.add_argument("--snapshot-dir", default=DEFAULT_SNAPSHOT_DIR,
+                        help="where the baselines are kept (default: tests/geometry-snapshots)")
+    parser.add_argument("--themes", nargs="+", default=["light"], choices=THEMES, help="themes to check (default: light)")
+    parser.add_argument("--pages", nargs="+", help="only check demo pages matching these substrings")
+    parser.add_argument("--data", nargs="+", default=[], metavar="FILE",
+                        help="also check these data files (names as passed to flowdash-js.html?file=)")
+    parser.add_argument("--changed-since", metavar="REF", help="only check pages changed since this git ref")
+    parser.add_argument("--tolerance", nargs="+", metavar="FIELD=PX",
+                        help=f"override tolerances ({', '.join(f'{k}={v:g}' for k, v in DEFAULT_TOLERANCES.items())})")
+    parser.add_argument("--contexts", type=int, default=8, help="concurrent pages (default: 8)")
+    parser.add_argument("--timeout", type=int, default=15000, help="readiness timeout per page in ms")
+    parser.add_argument("--update", action="store_true", help="write the captured geometry as new baselines")
+    parser.add_argument("--max-diffs", type=int, default=10, help="differences listed per page and theme")
+    args = parser.parse_args()
+
+    try:
+        tolerances = parse_tolerances(args.tolerance)
+    except ValueError as e:
+        parser.error(str(e))
+
+    targets = find_demo_pages()
+    if args.pages:
+        targets = [t for t in targets if any(s in t for s in args.pages)]
+    if args.changed_since:
+        changed = changed_files(args.changed_since)
+        targets = [t for t in targets if is_dirty(t, changed)]
+        print(f"🔍 {len(targets)} pages changed since {args.changed_since}")
+    targets += [f"data:{name}" for name in args.data]
+    jobs = [(target, theme) for target in targets for theme in args.themes]
+    if not jobs:
+        print("✅ Nothing to check")
+        return 0
+
+    print(f"📐 Capturing geometry of {len(targets)} targets × {len(args.themes)} themes on {args.contexts} contexts")
+    started = time.perf_counter()
+    options = {"base_url": args.base_url, "viewport": {"width": 1200, "height": 800},
+               "timeout": args.timeout, "contexts": args.contexts}
+    results = asyncio.run(capture_all(jobs, options))
+    elapsed = time.perf_counter() - started
+
+    captured = {}
+    errors = []
+    for target, theme, geometry, error in results:
+        if error:
+            errors.append(f"❌ {target} [{theme}]: {error}")
+        else:
+            captured.setdefault(target, {})[theme] = geometry
+
+    failed = 0
+    missing = 0
+    for target in sorted(captured):
+        path = snapshot_path(args.snapshot_dir, target)
+        baseline = load_snapshot(path)
+        if args.update:
+            # Themes that were not captured this time keep their baseline
+            themes = dict(baseline["themes"]) if baseline else {}
+            themes.update(captured[target])
+            write_snapshot(path, target, themes)
+            continue
+        for theme, geometry in sorted(captured[target].items()):
+            expected = (baseline or {}).get("themes", {}).get(theme)
+            if expected is None:
+                missing += 1
+                print(f"⚠️  {target} [{theme}]: no baseline (run with --update)")
+                continue
+            diffs = compare_geometry(expected, geometry, tolerances)
+            if diffs:
+                failed += 1
+                print(f"❌ {target} [{theme}]: {len(diffs)} differences")
+                for diff in diffs[:args.max_diffs]:
+                    print(f"     {diff}")
+                if len(diffs) > args.max_diffs:
+                    print(f"     … {len(diffs) - args.max_diffs} more")
+
+    for error in errors:
+        print(error)
+    checked = sum(len(themes) for themes in captured.values())
+    if args.update:
+        print(f"\n💾 {checked} snapshots of {len(captured)} targets written to {args.snapshot_dir} in {elapsed:.1f}s")
+    else:
+        print(f"\n{'🎉' if not failed and not errors else '📊'} {checked - failed - missing}/{len(jobs)} "
+              f"matched, {failed} changed, {missing} without baseline, {len(errors)} failed in {elapsed:.1f}s")
+    return 1 if failed or errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
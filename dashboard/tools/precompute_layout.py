@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Offline layout precomputation for FlowDash dashboard data files
+
+Renders each data file once per theme in a headless browser, extracts the settled
+node geometry and text measurements (``extractLayout`` in ``js/precomputedLayout.js``)
+and writes them back into the file as a versioned ``precomputedLayout`` section keyed
+by a hash of the graph structure. The dashboard trusts that section while the
+structure, geometry settings and theme match, and skips the DOM text measurements
+and the post-init re-measure; otherwise it lays out as usual.
+
+The dashboard must be served (e.g. ``python serve.py 8000`` from the repository root).
+
+Usage:
+    python precompute_layout.py [FILES...] [--themes retro dark] [--workers 4]
+    python precompute_layout.py --check      # exit 1 when a file has a missing or stale layout
+"""
+
+import argparse
+import asyncio
+import datetime
+import glob
+import json
+import os
+import sys
+
+from playwright.async_api import async_playwright
+
+from dashboard_data import DASHBOARD_DIR, DATA_DIR, data_path, write_json_section
+
+# The readiness predicate and the page URL are shared with the capture scripts
+sys.path.append(os.path.join(DASHBOARD_DIR, "themes"))
+from capture_service import page_url  # noqa: E402
+from render_readiness import READY_SCRIPT  # noqa: E402
+
+LAYOUT_VERSION = 1
+SECTION = "precomputedLayout"
+
+EXTRACT_SCRIPT = """
+async () => {
+    await document.fonts.ready;
+    return window.flowDashboard.extractLayout(window.dashboard);
+}
+"""
+STATE_SCRIPT = """
+() => ({ hash: window.dashboard.layoutHash, used: !!window.dashboard.usesPrecomputedLayout,
+         theme: (window.flowdashTheme && window.flowdashTheme.get()) || 'default' })
+"""
+
+
+def merge_layout(dashboard, layout, viewport):
+    """Store an extracted layout in the data; other themes are kept while the hash matches"""
+    section = dashboard.get(SECTION)
+    if (not isinstance(section, dict) or section.get("version") != LAYOUT_VERSION
+            or section.get("structureHash") != layout["structureHash"]):
+        section = {"version": LAYOUT_VERSION, "structureHash": layout["structureHash"], "themes": {}}
+    section["generatedAt"] = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+    section["viewport"] = viewport
+    section["themes"][layout["theme"]] = {"nodes": layout["nodes"]}
+    dashboard[SECTION] = section
+
+
+class LayoutPrecomputer:
+    def __init__(self, dashboard_url="http://localhost:8000/dashboard/flowdash-js.html",
+                 viewport=None, timeout=120000):
+        self.dashboard_url = dashboard_url
+        self.viewport = viewport or {"width": 1200, "height": 800}
+        self.timeout = timeout
+
+    def page_url(self, data_file, theme=None):
+        return page_url(self.dashboard_url, data_file, theme)
+
+    async def open(self, browser, data_file, theme, strip_layout):
+        context = await browser.new_context(viewport=dict(self.viewport))
+        page = await context.new_page()
+        if strip_layout:
+            async def without_layout(route):
+                # Measure from scratch: hide any existing precomputed layout from the page
+                response = await route.fetch()
+                body = await response.json()
+                body.pop(SECTION, None)
+                await route.fulfill(response=response, json=body)
+            await page.route(f"**/data/{data_file}", without_layout)
+        await page.goto(self.page_url(data_file, theme))
+        await page.wait_for_function(READY_SCRIPT, arg=theme, polling="raf", timeout=self.timeout)
+        return context, page
+
+    async def extract(self, browser, data_file, theme):
+        context, page = await self.open(browser, data_file, theme, strip_layout=True)
+        try:
+            return await page.evaluate(EXTRACT_SCRIPT)
+        finally:
+            await context.close()
+
+    async def state(self, browser, data_file, theme):
+        context, page = await self.open(browser, data_file, theme, strip_layout=False)
+        try:
+            return await page.evaluate(STATE_SCRIPT)
+        finally:
+            await context.close()
+
+    async def run(self, data_files, themes, workers=4, check=False):
+        """Precompute (or with check=True, verify) layouts; returns True when all files are fine"""
+        semaphore = asyncio.Semaphore(workers)
+        results = {}
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+
+            async def job(data_file, theme):
+                async with semaphore:
+                    try:
+                        if check:
+                            results[(data_file, theme)] = await self.state(browser, data_file, theme)
+                        else:
+                            results[(data_file, theme)] = await self.extract(browser, data_file, theme)
+                    except Exception as e:
+                        results[(data_file, theme)] = e
+
+            try:
+                await asyncio.gather(*(job(f, t) for f in data_files for t in themes))
+            finally:
+                await browser.close()
+
+        ok = True
+        for data_file in data_files:
+            path = data_path(data_file)
+            with open(path, "r", encoding="utf-8") as f:
+                dashboard = json.load(f)
+            changed = False
+            for theme in themes:
+                result = results[(data_file, theme)]
+                label = f"{data_file} [{theme or 'page default'}]"
+                if isinstance(result, Exception) or result is None:
+                    ok = False
+                    print(f"❌ {label}: {result or 'dashboard did not render'}")
+                elif check:
+                    if result["used"]:
+                        print(f"✅ {label}: precomputed layout is current")
+                    else:
+                        ok = False
+                        section = dashboard.get(SECTION) or {}
+                        reason = ("missing" if not section else
+                                  "stale structure" if section.get("structureHash") != result["hash"] else
+                                  f"no layout for theme {result['theme']}")
+                        print(f"❌ {label}: precomputed layout {reason}")
+                else:
+                    merge_layout(dashboard, result, self.viewport)
+                    changed = True
+                    print(f"✅ {label}: {len(result['nodes'])} nodes, hash {result['structureHash']}")
+            if changed:
+                write_json_section(path, SECTION, dashboard[SECTION])
+        return ok
+
+
+def data_file_name(arg):
+    """Data file name relative to dashboard/data, as the page's ?file= parameter expects"""
+    if os.path.exists(arg):
+        return os.path.relpath(os.path.abspath(arg), DATA_DIR).replace(os.sep, "/")
+    return arg
+
+
+def default_data_files():
+    return sorted(os.path.basename(p) for p in glob.glob(os.path.join(DATA_DIR, "*.json")))
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Bake precomputed layouts into FlowDash data files")
+    parser.add_argument("files", nargs="*", help="data files in dashboard/data (default: all *.json)")
+    parser.add_argument("--themes", nargs="+", default=[None],
+                        help="themes to bake layouts for (default: the page's default theme)")
+    parser.add_argument("--url", default="http://localhost:8000/dashboard/flowdash-js.html",
+                        help="dashboard page to render with")
+    parser.add_argument("--workers", type=int, default=4, help="pages rendered concurrently (default: 4)")
+    parser.add_argument("--timeout", type=int, default=120000, help="per-page timeout in ms (default: 120000)")
+    parser.add_argument("--check", action="store_true", help="only report files whose layout is missing or stale")
+    args = parser.parse_args()
+
+    data_files = [data_file_name(f) for f in args.files] or default_data_files()
+    print(f"{'🔍 Checking' if args.check else '📐 Precomputing'} layouts for {len(data_files)} files...")
+    precomputer = LayoutPrecomputer(args.url, timeout=args.timeout)
+    ok = await precomputer.run(data_files, args.themes, workers=args.workers, check=args.check)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Parallel batch renderer for the FlowDash demo pages
+
+Finds every demo page in ``01_basicNodes`` … ``08_martNodes`` and renders each page ×
+theme to PNG and to a self-contained SVG (computed styles inlined). Jobs are sharded
+across a process pool; every process runs its own headless browser and renders
+several pages at once in separate browser contexts. Results and timings are written
+to ``index.json`` in the output directory.
+
+With ``--changed-since REF`` only pages whose own files (or the shared dashboard
+runtime) changed since the git ref are re-rendered; the other index entries are kept.
+
+The repository root must be served (e.g. ``python dashboard/tools/serve.py 8000``).
+
+Usage:
+    python render_demos.py [--processes 4] [--contexts 4] [--themes light dark] [--output-dir .demo-renders]
+    python render_demos.py --changed-since origin/main
+"""
+
+import argparse
+import asyncio
+import datetime
+import glob
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from playwright.async_api import async_playwright
+
+from dashboard_data import DASHBOARD_DIR
+
+# The theme list and the readiness predicate are shared with the capture scripts
+sys.path.append(os.path.join(DASHBOARD_DIR, "themes"))
+from capture_service import THEMES  # noqa: E402
+from render_readiness import READY_SCRIPT  # noqa: E402
+
+REPO_ROOT = os.path.dirname(DASHBOARD_DIR)
+DEMO_DIRS = ("01_basicNodes", "02_rectangularNodes", "03_circleNodes", "04_laneNodes",
+             "05_columnsNodes", "06_adapterNodes", "07_foundationNodes", "08_martNodes")
+# Changes below these paths affect every demo page
+SHARED_PATHS = ("dashboard/js/", "dashboard/libs/", "dashboard/themes/", "dashboard/flowdash.css",
+                "dashboard/flowdash-demo.css")
+INDEX_NAME = "index.json"
+
+# Clone the graph SVG with the styles that matter for rendering inlined, so it renders without the CSS
+SERIALIZE_SVG_SCRIPT = """
+() => {
+    const svg = document.querySelector('svg#graph') || document.querySelector('svg');
+    if (!svg) return null;
+    const props = ['fill', 'fill-opacity', 'stroke', 'stroke-width', 'stroke-dasharray', 'stroke-opacity',
+                   'opacity', 'font-family', 'font-size', 'font-weight', 'font-style', 'text-anchor',
+                   'dominant-baseline', 'display', 'visibility', 'filter', 'marker-end', 'marker-start'];
+    const clone = svg.cloneNode(true);
+    const source = [svg, ...svg.querySelectorAll('*')];
+    const target = [clone, ...clone.querySelectorAll('*')];
+    source.forEach((el, i) => {
+        const computed = getComputedStyle(el);
+        const style = props.map(p => `${p}:${computed.getPropertyValue(p)}`).join(';');
+        target[i].setAttribute('style', style);
+    });
+    const rect = svg.getBoundingClientRect();
+    clone.setAttribute('xmlns', 'http://www.w3.org/2000/svg');
+    clone.setAttribute('width', Math.round(rect.width));
+    clone.setAttribute('height', Math.round(rect.height));
+    return new XMLSerializer().serializeToString(clone);
+}
+"""
+
+REFERENCE_PATTERN = re.compile(r"""(?:src|href)\s*=\s*["']([^"']+)["']|from\s+["']([^"']+)["']|import\(\s*["']([^"']+)["']""")
+
+
+def find_demo_pages(root=REPO_ROOT):
+    """Repository-relative paths of demo pages that build a dashboard"""
+    pages = []
+    for demo_dir in DEMO_DIRS:
+        for path in glob.glob(os.path.join(root, demo_dir, "**", "*.html"), recursive=True):
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                if "Dashboard(" not in f.read():
+                    continue  # index and overview pages
+            pages.append(os.path.relpath(path, root).replace(os.sep, "/"))
+    return sorted(pages)
+
+
+def page_dependencies(page, root=REPO_ROOT):
+    """Repository-relative files a page references directly, plus its own directory"""
+    page_dir = os.path.dirname(page)
+    deps = {page}
+    with open(os.path.join(root, page), "r", encoding="utf-8", errors="replace") as f:
+        html = f.read()
+    for match in REFERENCE_PATTERN.finditer(html):
+        ref = next(g for g in match.groups() if g)
+        if "://" in ref or ref.startswith(("#", "data:", "/")):
+            continue
+        deps.add(os.path.normpath(os.path.join(page_dir, ref.split("?", 1)[0])).replace(os.sep, "/"))
+    return deps
+
+
+def changed_files(ref, root=REPO_ROOT):
+    """Files changed since a git ref, including uncommitted and untracked changes"""
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=root, check=True, capture_output=True, text=True).stdout
+
+    changed = set(git("diff", "--name-only", ref).splitlines())
+    for line in git("status", "--porcelain", "--untracked-files=all").splitlines():
+        changed.add(line[3:].split(" -> ")[-1].strip('"'))
+    return changed
+
+
+def is_dirty(page, changed, root=REPO_ROOT):
+    if any(path.startswith(SHARED_PATHS) for path in changed):
+        return True
+    page_dir = os.path.dirname(page) + "/"
+    deps = page_dependencies(page, root)
+    return any(path.startswith(page_dir) or path in deps for path in changed)
+
+
+def output_base(output_dir, page, theme):
+    return os.path.join(output_dir, os.path.splitext(page)[0], theme)
+
+
+async def render_job(browser, base_url, output_dir, page_path, theme, viewport, timeout):
+    """Render one page in one theme; returns an index entry"""
+    entry = {"page": page_path, "theme": theme, "ok": False, "ready": False}
+    base = output_base(output_dir, page_path, theme)
+    os.makedirs(os.path.dirname(base), exist_ok=True)
+    started = time.perf_counter()
+    context = await browser.new_context(viewport=dict(viewport))
+    try:
+        page = await context.new_page()
+        errors = []
+        page.on("pageerror", lambda e: errors.append(str(e)))
+        await page.goto(f"{base_url.rstrip('/')}/{page_path}?theme={theme}")
+        loaded = time.perf_counter()
+        try:
+            await page.wait_for_function(READY_SCRIPT, arg=theme, polling="raf", timeout=timeout)
+            entry["ready"] = True
+        except Exception:
+            pass  # pages without the readiness signal are still captured, flagged as not ready
+        ready = time.perf_counter()
+
+        graph = page.locator("svg#graph")
+        target = graph.first if await graph.count() else page
+        with open(base + ".png", "wb") as f:
+            f.write(await target.screenshot())
+        svg = await page.evaluate(SERIALIZE_SVG_SCRIPT)
+        if svg is not None:
+            with open(base + ".svg", "w", encoding="utf-8") as f:
+                f.write(svg)
+        done = time.perf_counter()
+
+        entry.update(
+            ok=True,
+            png=os.path.relpath(base + ".png", output_dir).replace(os.sep, "/"),
+            svg=os.path.relpath(base + ".svg", output_dir).replace(os.sep, "/") if svg is not None else None,
+            timings_ms={"load": round((loaded - started) * 1000, 1),
+                        "ready": round((ready - loaded) * 1000, 1),
+                        "capture": round((done - ready) * 1000, 1),
+                        "total": round((done - started) * 1000, 1)},
+        )
+        if errors:
+            entry["page_errors"] = errors
+    except Exception as e:
+        entry["error"] = str(e)
+        entry["timings_ms"] = {"total": round((time.perf_counter() - started) * 1000, 1)}
+    finally:
+        await context.close()
+    return entry
+
+
+async def render_shard_async(jobs, options):
+    semaphore = asyncio.Semaphore(options["contexts"])
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        try:
+            async def run(page_path, theme):
+                async with semaphore:
+                    return await render_job(browser, options["base_url"], options["output_dir"], page_path,
+                                            theme, options["viewport"], options["timeout"])
+            return await asyncio.gather(*(run(page_path, theme) for page_path, theme in jobs))
+        finally:
+            await browser.close()
+
+
+def render_shard(shard_id, jobs, options):
+    """Process pool entry point: one browser per process"""
+    entries = asyncio.run(render_shard_async(jobs, options))
+    for entry in entries:
+        entry["shard"] = shard_id
+    return entries
+
+
+def load_index(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"entries": []}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render all FlowDash demo pages × themes to PNG and SVG")
+    parser.add_argument("--base-url", default="http://localhost:8000", help="URL the repository root is served at")
+    parser.add_argument("--output-dir", default=os.path.join(REPO_ROOT, ".demo-renders"),
+                        help="where renders and index.json are written (default: .demo-renders)")
+    parser.add_argument("--themes", nargs="+", default=list(THEMES), choices=THEMES, help="themes to render")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 2, help="browser processes")
+    parser.add_argument("--contexts", type=int, default=4, help="concurrent pages per browser (default: 4)")
+    parser.add_argument("--timeout", type=int, default=15000, help="readiness timeout per page in ms")
+    parser.add_argument("--changed-since", metavar="REF", help="only re-render pages changed since this git ref")
+    parser.add_argument("--pages", nargs="+", help="only render pages matching these substrings")
+    args = parser.parse_args()
+
+    pages = find_demo_pages()
+    if args.pages:
+        pages = [p for p in pages if any(s in p for s in args.pages)]
+    if args.changed_since:
+        changed = changed_files(args.changed_since)
+        pages = [p for p in pages if is_dirty(p, changed)]
+        print(f"🔍 {len(pages)} pages changed since {args.changed_since}")
+    jobs = [(page, theme) for page in pages for theme in args.themes]
+    index_path = os.path.join(args.output_dir, INDEX_NAME)
+    if not jobs:
+        print("✅ Nothing to render")
+        return 0
+
+    processes = max(1, min(args.processes, len(jobs)))
+    shards = [jobs[i::processes] for i in range(processes)]
+    options = {"base_url": args.base_url, "output_dir": os.path.abspath(args.output_dir),
+               "viewport": {"width": 1200, "height": 800}, "timeout": args.timeout, "contexts": args.contexts}
+    os.makedirs(args.output_dir, exist_ok=True)
+    print(f"🚀 Rendering {len(pages)} pages × {len(args.themes)} themes = {len(jobs)} jobs "
+          f"on {processes} processes × {args.contexts} contexts")
+
+    started = time.perf_counter()
+    entries = []
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [pool.submit(render_shard, i, shard, options) for i, shard in enumerate(shards)]
+        for future in as_completed(futures):
+            try:
+                shard_entries = future.result()
+            except Exception as e:
+                print(f"❌ Shard failed: {e}")
+                continue
+            entries.extend(shard_entries)
+            failed = sum(1 for e in shard_entries if not e["ok"])
+            print(f"   Shard {shard_entries[0]['shard'] if shard_entries else '?'}: "
+                  f"{len(shard_entries) - failed}/{len(shard_entries)} rendered")
+    elapsed = time.perf_counter() - started
+
+    # Keep entries of pages that were not re-rendered this time
+    rendered = {(e["page"], e["theme"]) for e in entries}
+    previous = load_index(index_path).get("entries", []) if args.changed_since or args.pages else []
+    kept = [e for e in previous if (e["page"], e["theme"]) not in rendered]
+    all_entries = sorted(kept + entries, key=lambda e: (e["page"], e["theme"]))
+    index = {
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "base_url": args.base_url,
+        "processes": processes,
+        "contexts": args.contexts,
+        "wall_time_s": round(elapsed, 2),
+        "rendered": len(entries),
+        "entries": all_entries,
+    }
+    with open(index_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2)
+
+    failures = [e for e in entries if not e["ok"]]
+    not_ready = [e for e in entries if e["ok"] and not e["ready"]]
+    for e in failures:
+        print(f"❌ {e['page']} [{e['theme']}]: {e.get('error')}")
+    if not_ready:
+        print(f"⚠️  {len(not_ready)} renders captured without a readiness signal")
+    print(f"\n🎉 {len(entries) - len(failures)}/{len(entries)} renders in {elapsed:.1f}s, index: {index_path}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Static file server for the FlowDash dashboard and demo pages
+
+Drop-in replacement for ``python -m http.server 8000`` for local use and for the
+Playwright ``webServer``:
+
+- asyncio based, so many concurrent connections (test workers, reloads) are served in parallel
+- HTTP/1.1 keep-alive
+- gzip (and brotli, when the ``brotli`` package is installed) encodings of text assets are
+  built once at startup and rebuilt when a file changes on disk
+- strong ETags per encoding (``"<sha1>"``, ``"<sha1>-gz"``, ``"<sha1>-br"``) with ``If-None-Match``
+  revalidation, so reloads get ``304 Not Modified``
+- files that changed on disk are re-read and recompressed in a worker thread, off the event loop
+- uncompressed bodies are sent with ``sendfile`` (zero-copy where the platform supports it)
+
+Usage:
+    python serve.py [port] [--directory DIR] [--bind ADDRESS] [--verbose]
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import html
+import mimetypes
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+from urllib.parse import quote, unquote, urlsplit
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "text/", "application/javascript", "application/json", "image/svg+xml", "application/xml",
+)
+MIN_COMPRESS_SIZE = 512
+MAX_CACHED_SIZE = 16 * 1024 * 1024
+SKIP_DIRS = {".git", "node_modules", "__pycache__", ".venv", "venv", "test-results", "playwright-report"}
+KEEP_ALIVE_TIMEOUT = 15
+MAX_HEADER_BYTES = 64 * 1024
+
+mimetypes.add_type("text/javascript", ".js")
+mimetypes.add_type("text/javascript", ".mjs")
+mimetypes.add_type("text/javascript", ".cjs")
+mimetypes.add_type("application/json", ".json")
+mimetypes.add_type("image/svg+xml", ".svg")
+
+# ETag suffix of each content-coding; a strong validator must differ per representation
+ETAG_SUFFIXES = {"gzip": "-gz", "br": "-br"}
+
+REASONS = {200: "OK", 301: "Moved Permanently", 304: "Not Modified", 400: "Bad Request",
+           403: "Forbidden", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+def content_type_for(path):
+    ctype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    if ctype.startswith("text/") or ctype in ("application/json", "image/svg+xml"):
+        ctype += "; charset=utf-8"
+    return ctype
+
+
+def is_compressible(ctype):
+    return ctype.startswith(COMPRESSIBLE_TYPES)
+
+
+class CachedFile:
+    """Validators and precompressed encodings of one file on disk"""
+
+    __slots__ = ("path", "size", "mtime_ns", "digest", "content_type", "encodings")
+
+    def __init__(self, path, stat):
+        self.path = path
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        self.content_type = content_type_for(path)
+        self.encodings = {}
+        with open(path, "rb") as f:
+            data = f.read()
+        self.digest = hashlib.sha1(data).hexdigest()
+        if self.size >= MIN_COMPRESS_SIZE and is_compressible(self.content_type):
+            self.encodings["gzip"] = gzip.compress(data, compresslevel=6, mtime=0)
+            if brotli is not None:
+                self.encodings["br"] = brotli.compress(data, quality=9)
+            # Keep only encodings that are actually smaller
+            self.encodings = {k: v for k, v in self.encodings.items() if len(v) < self.size}
+
+    def is_current(self, stat):
+        return stat.st_size == self.size and stat.st_mtime_ns == self.mtime_ns
+
+    def etag(self, encoding=None):
+        """Strong ETag of the identity body, or of one of the encodings"""
+        return f'"{self.digest}{ETAG_SUFFIXES.get(encoding, "")}"'
+
+
+class FileCache:
+    def __init__(self, root):
+        self.root = os.path.realpath(root)
+        self.files = {}
+
+    def warm(self, workers=None):
+        """Hash and precompress every servable file below root"""
+        paths = []
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+            paths.extend(os.path.join(dirpath, name) for name in filenames)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for entry in pool.map(self._load, paths):
+                if entry is not None:
+                    self.files[entry.path] = entry
+        return len(self.files)
+
+    def _load(self, path):
+        try:
+            stat = os.stat(path)
+            if stat.st_size > MAX_CACHED_SIZE:
+                return None
+            return CachedFile(path, stat)
+        except OSError:
+            return None
+
+    def lookup(self, path, stat):
+        """The cached entry while it matches the file on disk, else None; never touches the file"""
+        entry = self.files.get(path)
+        return entry if entry is not None and entry.is_current(stat) else None
+
+    def get(self, path, stat):
+        """The cached entry, (re)built from disk when missing or stale; blocking"""
+        entry = self.files.get(path)
+        if entry is None or not entry.is_current(stat):
+            if stat.st_size > MAX_CACHED_SIZE:
+                return None
+            entry = self.files[path] = CachedFile(path, stat)
+        return entry
+
+
+def accepted_encodings(header):
+    accepted = set()
+    for part in (header or "").split(","):
+        token, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        if token:
+            accepted.add(token.strip().lower())
+    return accepted
+
+
+class StaticServer:
+    def __init__(self, root, verbose=False):
+        self.root = os.path.realpath(root)
+        self.cache = FileCache(self.root)
+        self.verbose = verbose
+
+    def log(self, peer, method, target, status, size):
+        if self.verbose:
+            host = peer[0] if peer else "-"
+            print(f'{host} - - [{time.strftime("%d/%b/%Y %H:%M:%S")}] "{method} {target}" {status} {size}')
+
+    def resolve(self, target):
+        """Map a request path to a file system path inside root, or None"""
+        path = unquote(urlsplit(target).path)
+        full = os.path.realpath(os.path.join(self.root, path.lstrip("/")))
+        if full != self.root and not full.startswith(self.root + os.sep):
+            return None
+        return full
+
+    async def handle(self, reader, writer):
+        peer = writer.get_extra_info("peername")
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEP_ALIVE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self.send_error(writer, 400, keep_alive=False)
+                    break
+                if len(head) > MAX_HEADER_BYTES:
+                    await self.send_error(writer, 400, keep_alive=False)
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    await self.send_error(writer, 400, keep_alive=False)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    name, sep, value = line.partition(":")
+                    if sep:
+                        headers[name.strip().lower()] = value.strip()
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+                try:
+                    status, size = await self.respond(writer, method, target, headers, keep_alive)
+                except OSError:
+                    status, size = await self.send_error(writer, 500, keep_alive=False)
+                    keep_alive = False
+                self.log(peer, method, target, status, size)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    async def respond(self, writer, method, target, headers, keep_alive):
+        if method not in ("GET", "HEAD"):
+            return await self.send_error(writer, 405, keep_alive, extra={"Allow": "GET, HEAD"})
+        path = self.resolve(target)
+        if path is None:
+            return await self.send_error(writer, 403, keep_alive)
+        if os.path.isdir(path):
+            url_path = urlsplit(target).path
+            if not url_path.endswith("/"):
+                return await self.send_error(writer, 301, keep_alive, extra={"Location": quote(url_path) + "/"})
+            index = os.path.join(path, "index.html")
+            if not os.path.isfile(index):
+                return await self.send_listing(writer, method, path, url_path, keep_alive)
+            path = index
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return await self.send_error(writer, 404, keep_alive)
+
+        entry = self.cache.lookup(path, stat)
+        if entry is None:
+            # Reading and compressing a changed file must not block the other connections
+            entry = await asyncio.get_running_loop().run_in_executor(None, self.cache.get, path, stat)
+        base = {
+            "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+            "Cache-Control": "no-cache",
+            "Content-Type": entry.content_type if entry else content_type_for(path),
+        }
+        if entry is not None:
+            accepted = accepted_encodings(headers.get("accept-encoding"))
+            encoding = next((e for e in ("br", "gzip") if e in entry.encodings and e in accepted), None)
+            etag = entry.etag(encoding)
+            base["ETag"] = etag
+            if entry.encodings:
+                base["Vary"] = "Accept-Encoding"
+            if_none_match = headers.get("if-none-match")
+            if if_none_match and (if_none_match == "*" or etag in
+                                  [t.strip().removeprefix("W/") for t in if_none_match.split(",")]):
+                await self.send_head(writer, 304, base, None, keep_alive)
+                await writer.drain()
+                return 304, 0
+            if encoding is not None:
+                base["Content-Encoding"] = encoding
+                body = entry.encodings[encoding]
+                await self.send_head(writer, 200, base, len(body), keep_alive)
+                if method == "GET":
+                    writer.write(body)
+                    await writer.drain()
+                return 200, len(body)
+
+        await self.send_head(writer, 200, base, stat.st_size, keep_alive)
+        await writer.drain()
+        if method == "GET" and stat.st_size:
+            with open(path, "rb") as f:
+                # Zero-copy where the transport and OS allow it, buffered copy otherwise
+                await asyncio.get_running_loop().sendfile(writer.transport, f, 0, stat.st_size)
+        return 200, stat.st_size
+
+    async def send_head(self, writer, status, headers, length, keep_alive):
+        lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+                 f"Date: {formatdate(usegmt=True)}",
+                 "Server: FlowDashServe",
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        if length is not None:
+            lines.append(f"Content-Length: {length}")
+        lines.extend(f"{k}: {v}" for k, v in headers.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+
+    async def send_error(self, writer, status, keep_alive, extra=None):
+        body = f"<h1>{status} {REASONS.get(status, '')}</h1>\n".encode("utf-8")
+        headers = {"Content-Type": "text/html; charset=utf-8"}
+        headers.update(extra or {})
+        await self.send_head(writer, status, headers, len(body), keep_alive)
+        writer.write(body)
+        await writer.drain()
+        return status, len(body)
+
+    async def send_listing(self, writer, method, path, url_path, keep_alive):
+        names = sorted(os.listdir(path), key=str.lower)
+        items = []
+        for name in names:
+            display = name + "/" if os.path.isdir(os.path.join(path, name)) else name
+            items.append(f'<li><a href="{quote(display)}">{html.escape(display)}</a></li>')
+        title = html.escape(f"Directory listing for {url_path}")
+        body = (f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>{title}</title></head>"
+                f"<body><h1>{title}</h1><hr><ul>{''.join(items)}</ul><hr></body></html>").encode("utf-8")
+        await self.send_head(writer, 200, {"Content-Type": "text/html; charset=utf-8"}, len(body), keep_alive)
+        if method == "GET":
+            writer.write(body)
+        await writer.drain()
+        return 200, len(body)
+
+
+async def serve(root, port, bind, verbose):
+    server = StaticServer(root, verbose)
+    started = time.perf_counter()
+    count = await asyncio.get_running_loop().run_in_executor(None, server.cache.warm)
+    encodings = "br, gzip" if brotli is not None else "gzip"
+    print(f"📦 Cached {count} files ({encodings}) in {time.perf_counter() - started:.2f}s")
+    srv = await asyncio.start_server(server.handle, bind, port, backlog=1024, limit=MAX_HEADER_BYTES)
+    print(f"🌐 Serving {server.root} on http://{bind or 'localhost'}:{port}/")
+    async with srv:
+        await srv.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the FlowDash pages with caching and compression")
+    parser.add_argument("port", nargs="?", type=int, default=8000, help="port to listen on (default: 8000)")
+    parser.add_argument("--directory", "-d", default=os.getcwd(), help="directory to serve (default: current)")
+    parser.add_argument("--bind", "-b", default="", help="address to bind to (default: all interfaces)")
+    parser.add_argument("--verbose", "-v", action="store_true", help="log every request")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.directory, args.port, args.bind or None, args.verbose))
+    except KeyboardInterrupt:
+        print("\n⏹️  Server stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
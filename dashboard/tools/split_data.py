@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Split a FlowDash dashboard data file into a root manifest and lazily loaded subtree chunks
+
+Containers that start collapsed (as ``status_rollup.py`` derives it from the statuses
+and ``toggleCollapseOnStatusChange``) are cut out of the tree: the manifest keeps a stub
+of the container - its own fields, the rolled-up status, ``collapsed: true`` and a
+``chunk`` reference - and its children go into a separate chunk file, together with the
+edges that touch them. Chunks are nested the same way and named after the hash of their
+content (so a parent chunk changes when a nested one does), written gzip-compressed:
+
+    data/<name>.chunked/manifest.json
+    data/<name>.chunked/chunks/<hash>.json.gz
+
+The dashboard (``js/chunkedData.js``) loads a chunk when its container is expanded or
+zoomed into, and prefetches chunks of containers near the viewport. Load the manifest
+like any data file: ``flowdash-js.html?file=<name>.chunked/manifest.json``.
+
+Only lane, columns and group containers are cut; adapter, foundation and mart nodes
+would create their role children for an empty stub. Subtrees involved in ``parentId``
+re-parenting stay in the manifest. Container statuses and collapse states are written
+into the data, because the dashboard cannot derive them from children it has not loaded.
+
+Usage:
+    python split_data.py theme_2.json
+    python split_data.py theme_2.json --min-nodes 10 --output-dir /tmp/theme_2.chunked
+"""
+
+import argparse
+import glob
+import gzip
+import hashlib
+import json
+import os
+import sys
+
+from dashboard_data import DATA_DIR, data_path, js_string, load_dashboard, role_children, walk_nodes, write_json_atomic
+from status_rollup import StatusRollup
+
+CHUNK_FORMAT_VERSION = 1
+CHUNK_TYPES = ("group", "lane", "columns")
+# Sections that describe the full tree and do not match the manifest
+DROPPED_SECTIONS = ("precomputedLayout", "index")
+
+
+def parent_refs(node):
+    refs = node.get("parentIds", [node["parentId"]] if node.get("parentId") is not None else [])
+    return [js_string(ref) for ref in (refs if isinstance(refs, list) else [refs])]
+
+
+def canonical_json(data):
+    return json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class DataSplitter:
+    def __init__(self, dashboard, min_nodes=20):
+        self.dashboard = dashboard
+        self.min_nodes = min_nodes
+        self.rollup = StatusRollup(dashboard)
+        self.nodes = [n for n in dashboard.get("nodes") or [] if isinstance(n, dict)]
+        self.size = {}      # id(node) -> nodes in its subtree, itself included
+        self.pinned = {}    # id(node) -> subtree takes part in parentId re-parenting
+        referenced = {ref for node, _, _ in walk_nodes(self.nodes) for ref in parent_refs(node)}
+        self._measure(self.nodes, referenced)
+        self.cuts = [node for node, _, depth in walk_nodes(self.nodes) if depth > 0 and self.is_cut(node)]
+
+    def _measure(self, nodes, referenced):
+        for node in nodes:
+            children = [c for c in node.get("children") or [] if isinstance(c, dict)]
+            self._measure(children, referenced)
+            self.size[id(node)] = 1 + sum(self.size[id(c)] for c in children)
+            self.pinned[id(node)] = (bool(parent_refs(node)) or js_string(node.get("id")) in referenced
+                                     or any(self.pinned[id(c)] for c in children))
+
+    def is_cut(self, node):
+        key = js_string(node.get("id"))
+        return (str(node.get("type", "")).lower() in CHUNK_TYPES
+                and self.rollup.collapsed.get(key, False)
+                and self.size[id(node)] > self.min_nodes
+                and not self.pinned[id(node)])
+
+    def owners(self):
+        """node id -> id(cut container) whose chunk holds the node, None for the manifest"""
+        cut_ids = {id(node) for node in self.cuts}
+        owner = {}
+
+        def visit(nodes, current):
+            for node in nodes:
+                if not isinstance(node, dict):
+                    continue
+                key = js_string(node.get("id"))
+                owner.setdefault(key, current)
+                inner = id(node) if id(node) in cut_ids else current
+                for role_id in role_children(node):
+                    owner.setdefault(role_id, inner)
+                visit(node.get("children") or [], inner)
+
+        visit(self.nodes, None)
+        return owner
+
+    def split(self):
+        """Returns (manifest, {ref: chunk content})"""
+        owner = self.owners()
+        root_edges, chunk_edges = [], {}
+        for edge in self.dashboard.get("edges") or []:
+            ends = [edge.get(end) for end in ("source", "target")] if isinstance(edge, dict) else []
+            ends = [js_string(e.get("id") if isinstance(e, dict) else e) for e in ends]
+            holders = {owner[e] for e in ends if owner.get(e) is not None}
+            if not holders:
+                root_edges.append(edge)
+            for holder in holders:
+                chunk_edges.setdefault(holder, []).append(edge)
+
+        refs, chunks = {}, {}
+        for node in reversed(self.cuts):  # nested chunks first, their refs go into the parent
+            content = {
+                "version": CHUNK_FORMAT_VERSION,
+                "container": js_string(node.get("id")),
+                "nodes": self.copy_tree(node.get("children") or [], refs),
+                "edges": chunk_edges.get(id(node), []),
+            }
+            ref = hashlib.sha256(canonical_json(content)).hexdigest()[:16]
+            chunks[ref] = content
+            refs[id(node)] = {"ref": ref, "nodes": sum(1 for _ in walk_nodes(content["nodes"]))}
+
+        manifest = {k: v for k, v in self.dashboard.items() if k not in DROPPED_SECTIONS}
+        manifest["nodes"] = self.copy_tree(self.dashboard.get("nodes") or [], refs)
+        manifest["edges"] = root_edges
+        manifest["chunked"] = {
+            "version": CHUNK_FORMAT_VERSION,
+            "encoding": "gzip",
+            "path": "chunks/",
+            "chunks": len(chunks),
+            "nodes": len(self.rollup.order),
+        }
+        return manifest, chunks
+
+    def copy_tree(self, nodes, refs):
+        copies = []
+        for node in nodes:
+            if not isinstance(node, dict):
+                copies.append(node)
+                continue
+            key = js_string(node.get("id"))
+            copy = {k: v for k, v in node.items() if k != "children"}
+            if key in self.rollup.containers:
+                copy["state"] = self.rollup.status[key]
+                copy["collapsed"] = self.rollup.collapsed[key]
+            if id(node) in refs:
+                copy["children"] = []
+                copy["chunk"] = refs[id(node)]
+            elif "children" in node:
+                copy["children"] = self.copy_tree(node["children"] or [], refs)
+            copies.append(copy)
+        return copies
+
+
+def write_chunks(chunk_dir, chunks, compress=True, prune=True):
+    """Write the chunk files that do not exist yet; returns (written, total bytes)"""
+    os.makedirs(chunk_dir, exist_ok=True)
+    suffix = ".json.gz" if compress else ".json"
+    written, total = 0, 0
+    for ref, content in chunks.items():
+        path = os.path.join(chunk_dir, ref + suffix)
+        if not os.path.exists(path):
+            data = canonical_json(content)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(gzip.compress(data, compresslevel=9, mtime=0) if compress else data)
+            os.replace(tmp_path, path)
+            written += 1
+        total += os.path.getsize(path)
+    if prune:
+        for path in glob.glob(os.path.join(chunk_dir, "*.json*")):
+            if os.path.basename(path).split(".", 1)[0] not in chunks:
+                os.remove(path)
+    return written, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Split a FlowDash data file into a manifest and lazily loaded chunks")
+    parser.add_argument("data_file", help="dashboard data file (name in dashboard/data or a path)")
+    parser.add_argument("--output-dir", help="output directory (default: dashboard/data/<name>.chunked)")
+    parser.add_argument("--min-nodes", type=int, default=20,
+                        help="only cut containers with more nodes below them than this (default: 20)")
+    parser.add_argument("--no-compress", action="store_true", help="write plain .json chunks")
+    parser.add_argument("--keep-stale", action="store_true", help="do not remove chunks the manifest no longer uses")
+    args = parser.parse_args()
+
+    dashboard = load_dashboard(args.data_file)
+    stem = os.path.splitext(os.path.basename(args.data_file))[0]
+    output_dir = args.output_dir or os.path.join(DATA_DIR, f"{stem}.chunked")
+    splitter = DataSplitter(dashboard, min_nodes=args.min_nodes)
+    manifest, chunks = splitter.split()
+    if args.no_compress:
+        manifest["chunked"]["encoding"] = "identity"
+
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, "manifest.json")
+    write_json_atomic(manifest_path, manifest)
+    written, chunk_bytes = write_chunks(os.path.join(output_dir, manifest["chunked"]["path"]), chunks,
+                                        compress=not args.no_compress, prune=not args.keep_stale)
+
+    total = manifest["chunked"]["nodes"]
+    in_manifest = sum(1 for _ in walk_nodes(manifest["nodes"]))
+    print(f"📂 {args.data_file}: {total} nodes, {os.path.getsize(data_path(args.data_file)) / 1024:.0f} KB")
+    print(f"✂️  {len(chunks)} chunks ({written} new, {chunk_bytes / 1024:.0f} KB), "
+          f"min {args.min_nodes} nodes per chunk")
+    print(f"✅ {manifest_path}: {in_manifest} nodes ({in_manifest / max(total, 1):.0%}), "
+          f"{os.path.getsize(manifest_path) / 1024:.0f} KB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Status event load generator for the FlowDash dashboard using Playwright
+
+Replays a stream of status events against a loaded dashboard at increasing event
+rates and measures, per rate, how the status → collapse → re-render path keeps up:
+
+- latency from the scheduled injection of an event to the first painted frame after
+  it (measured from the schedule, so an injector that falls behind counts as latency)
+- dropped frames: animation frames longer than 1.5 frame budgets at 60 Hz
+- main-thread long tasks (PerformanceObserver ``longtask``): count, total and max
+- how late the injector ran behind its schedule
+
+Events are applied in the page with ``updateDatasetStatus`` or ``setStatusToNodeById``;
+each rate runs in a freshly loaded page. The stream is either synthetic (random
+statuses for the leaf nodes and datasets of the data file, evenly spaced, in bursts
+or Poisson-distributed) or recorded: a JSON Lines file with one event per line in the
+``status_push.py`` POST format plus a time offset in seconds,
+    {"t": 0.125, "datasetId": "...", "status": "Error"}
+which is retimed to each rate, keeping its burst shape.
+
+Results are written as JSON; ``--compare`` checks p95/p99 latency per rate against an
+earlier run.
+
+Usage:
+    python status_load.py --data-file theme_2.json --rates 10 50 100 200 500 [--duration 10]
+    python status_load.py --data-file theme_2.json --burst-size 200 --rates 100 400
+    python status_load.py --data-file theme_2.json --events nightly.jsonl --rates 50 100
+    python status_load.py --data-file theme_2.json --compare status-load-v1.json [--threshold 0.25]
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import random
+import os
+import statistics
+import sys
+
+from playwright.async_api import async_playwright
+
+from benchmark_scale import percentile, summarize_frames
+from dashboard_data import DASHBOARD_DIR, NODE_STATUSES, load_dashboard
+from status_push import status_targets
+
+# The readiness predicate and the page URL are shared with the capture scripts
+sys.path.append(os.path.join(DASHBOARD_DIR, "themes"))
+from capture_service import page_url  # noqa: E402
+from render_readiness import READY_SCRIPT  # noqa: E402
+
+RESULTS_VERSION = 1
+# Worsening below this many ms is never a regression
+MIN_DELTA_MS = 5
+
+# Injects the events on schedule and records when the first frame after each one is
+# painted: a rAF callback takes the events injected so far, and a message posted from
+# it is delivered after that frame's rendering steps.
+REPLAY_SCRIPT = """
+async ({ events, drainMs }) => {
+    const dashboard = window.dashboard;
+    const latencies = [], lateness = [], frames = [], longTasks = [];
+    let pending = [], inFlight = [], missing = 0, injected = 0, running = true, last = null;
+
+    let observer = null;
+    try {
+        observer = new PerformanceObserver((list) => list.getEntries().forEach(e => longTasks.push(e.duration)));
+        observer.observe({ type: 'longtask' });
+    } catch {}
+
+    const channel = new MessageChannel();
+    channel.port1.onmessage = () => {
+        const painted = performance.now();
+        for (const scheduled of inFlight.shift() || []) latencies.push(painted - scheduled);
+    };
+    const frame = (now) => {
+        if (last !== null) frames.push(now - last);
+        last = now;
+        inFlight.push(pending);
+        pending = [];
+        channel.port2.postMessage(null);
+        if (running) requestAnimationFrame(frame);
+    };
+    requestAnimationFrame(frame);
+
+    const apply = (kind, id, status) => {
+        if (kind === 'd') return dashboard.updateDatasetStatus(id, status);
+        if (!dashboard.main.root.getNode(id)) return false;
+        dashboard.setStatusToNodeById(id, status);
+        return true;
+    };
+
+    const start = performance.now() + 100;
+    let i = 0;
+    await new Promise((resolve) => {
+        const inject = () => {
+            const now = performance.now();
+            while (i < events.length && start + events[i][0] <= now) {
+                const [offset, kind, id, status] = events[i++];
+                const scheduled = start + offset;
+                lateness.push(now - scheduled);
+                if (!apply(kind, id, status)) missing++;
+                injected++;
+                pending.push(scheduled);
+            }
+            if (i < events.length) setTimeout(inject, Math.max(0, start + events[i][0] - performance.now()));
+            else resolve();
+        };
+        setTimeout(inject, Math.max(0, start - performance.now()));
+    });
+    const elapsedMs = performance.now() - start;
+
+    // Wait until every event is painted, then a little longer for trailing long tasks
+    const deadline = performance.now() + 30000;
+    while ((pending.length || inFlight.some(batch => batch.length)) && performance.now() < deadline) {
+        await new Promise(resolve => setTimeout(resolve, 16));
+    }
+    await new Promise(resolve => setTimeout(resolve, drainMs));
+    running = false;
+    observer?.disconnect();
+    return { latencies, lateness, frames, longTasks, injected, missing, elapsedMs };
+}
+"""
+
+
+def synthetic_events(dashboard, rate, duration, burst_size=1, poisson=False, seed=None):
+    """Random status events as (offset ms, kind, id, status); bursts of burst_size at rate/burst_size per second"""
+    rng = random.Random(seed)
+    node_ids, dataset_ids = status_targets(dashboard)
+    if not node_ids:
+        raise ValueError("no leaf nodes to send status events to")
+    statuses = [s for s in NODE_STATUSES if s != "Undetermined"]
+    events = []
+    interval = burst_size / rate
+    offset, bursts = 0.0, 0
+    while offset < duration:
+        for _ in range(burst_size):
+            if dataset_ids and rng.random() < 0.5:
+                events.append((offset * 1000, "d", str(rng.choice(dataset_ids)), rng.choice(statuses)))
+            else:
+                events.append((offset * 1000, "n", str(rng.choice(node_ids)), rng.choice(statuses)))
+        bursts += 1
+        offset = offset + rng.expovariate(1 / interval) if poisson else bursts * interval
+    return events
+
+
+def load_recorded(path):
+    """Recorded events as (offset s, kind, id, status), sorted by time"""
+    events = []
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            if event.get("status") not in NODE_STATUSES or ("nodeId" in event) == ("datasetId" in event):
+                raise ValueError(f"{path}:{number}: expected a known status and exactly one of nodeId/datasetId")
+            kind, target = ("n", event["nodeId"]) if "nodeId" in event else ("d", event["datasetId"])
+            events.append((float(event.get("t", 0)), kind, str(target), event["status"]))
+    events.sort(key=lambda e: e[0])
+    if not events:
+        raise ValueError(f"{path}: no events")
+    return events
+
+
+def retime(recorded, rate, duration):
+    """Scale recorded offsets so the stream averages rate events/s; cut after duration seconds"""
+    span = recorded[-1][0] - recorded[0][0]
+    native = len(recorded) / span if span > 0 else None
+    scale = native / rate if native else 0.0
+    events = []
+    for offset, kind, target, status in recorded:
+        at = (offset - recorded[0][0]) * scale if native else len(events) / rate
+        if at >= duration:
+            break
+        events.append((at * 1000, kind, target, status))
+    return events
+
+
+def summarize(run, rate):
+    latencies = run["latencies"]
+    long_tasks = run["longTasks"]
+    frames = summarize_frames(run["frames"])
+    return {
+        "rate": rate,
+        "events": run["injected"],
+        "missing": run["missing"],
+        "achieved_rate": round(run["injected"] / (run["elapsedMs"] / 1000), 1) if run["elapsedMs"] > 0 else None,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50), 1) if latencies else None,
+            "p95": round(percentile(latencies, 0.95), 1) if latencies else None,
+            "p99": round(percentile(latencies, 0.99), 1) if latencies else None,
+            "max": round(max(latencies), 1) if latencies else None,
+            "mean": round(statistics.fmean(latencies), 1) if latencies else None,
+        },
+        "injector_late_p95_ms": round(percentile(run["lateness"], 0.95), 1) if run["lateness"] else None,
+        "frames": frames["frames"],
+        "dropped_frames": frames.get("dropped", 0),
+        "long_tasks": {
+            "count": len(long_tasks),
+            "total_ms": round(sum(long_tasks), 1),
+            "max_ms": round(max(long_tasks), 1) if long_tasks else 0,
+        },
+    }
+
+
+class StatusLoadTest:
+    def __init__(self, dashboard_url="http://localhost:8000/dashboard/flowdash-js.html",
+                 viewport=None, timeout=60000, drain_ms=500):
+        self.dashboard_url = dashboard_url
+        self.viewport = viewport or {"width": 1200, "height": 800}
+        self.timeout = timeout
+        self.drain_ms = drain_ms
+
+    async def replay(self, browser, data_file, events):
+        """Replay events against a freshly loaded dashboard; returns the raw measurements"""
+        context = await browser.new_context(viewport=dict(self.viewport))
+        try:
+            page = await context.new_page()
+            await page.goto(page_url(self.dashboard_url, data_file))
+            await page.wait_for_function(READY_SCRIPT, polling="raf", timeout=self.timeout)
+            return await page.evaluate(REPLAY_SCRIPT, {"events": events, "drainMs": self.drain_ms})
+        finally:
+            await context.close()
+
+    async def run(self, data_file, streams, browser_name="chromium"):
+        """streams: list of (rate, events); returns the summary per rate"""
+        results = []
+        async with async_playwright() as p:
+            browser = await getattr(p, browser_name).launch(headless=True)
+            try:
+                for rate, events in streams:
+                    print(f"\n📨 {rate} events/s: {len(events)} events")
+                    try:
+                        summary = summarize(await self.replay(browser, data_file, events), rate)
+                    except Exception as e:
+                        print(f"   ❌ {e}")
+                        results.append({"rate": rate, "error": str(e)})
+                        continue
+                    latency = summary["latency_ms"]
+                    print(f"   latency p50 {latency['p50']} ms, p95 {latency['p95']} ms, p99 {latency['p99']} ms; "
+                          f"{summary['dropped_frames']}/{summary['frames']} frames dropped, "
+                          f"{summary['long_tasks']['count']} long tasks ({summary['long_tasks']['total_ms']} ms)")
+                    if summary["missing"]:
+                        print(f"   ⚠️  {summary['missing']} events addressed unknown nodes or datasets")
+                    results.append(summary)
+                version = browser.version
+            finally:
+                await browser.close()
+        return {
+            "version": RESULTS_VERSION,
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "url": self.dashboard_url,
+            "file": data_file,
+            "browser": f"{browser_name} {version}",
+            "viewport": self.viewport,
+            "results": results,
+        }
+
+
+def print_curve(results):
+    print(f"\n{'rate/s':>8}{'achieved':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+          f"{'dropped':>10}{'long tasks':>12}")
+    for r in results:
+        if "error" in r:
+            print(f"{r['rate']:>8}  ❌ {r['error']}")
+            continue
+        latency = r["latency_ms"]
+        print(f"{r['rate']:>8}{r['achieved_rate']:>10}{latency['p50']:>10}{latency['p95']:>10}{latency['p99']:>10}"
+              f"{latency['max']:>10}{r['dropped_frames']:>10}{r['long_tasks']['count']:>12}")
+
+
+def compare(current, previous, threshold):
+    """Print latency percentiles that got worse by more than threshold; returns True when none did"""
+    previous_by_rate = {r["rate"]: r for r in previous.get("results", []) if "error" not in r}
+    ok = True
+    for result in current["results"]:
+        before = previous_by_rate.get(result["rate"])
+        if not before or "error" in result:
+            continue
+        for key in ("p95", "p99"):
+            old, new = before["latency_ms"].get(key), result["latency_ms"].get(key)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if change > threshold and new - old > MIN_DELTA_MS:
+                ok = False
+                print(f"❌ {result['rate']} events/s {key}: {old} → {new} ms (+{change:.0%})")
+    print("✅ No latency regressions" if ok else f"\n⚠️  Regressions above {threshold:.0%} found")
+    return ok
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Replay status events against FlowDash and measure render latency")
+    parser.add_argument("--data-file", default="theme_1.json", help="data file in dashboard/data (default: theme_1.json)")
+    parser.add_argument("--rates", type=float, nargs="+", default=[10, 50, 100, 200, 500],
+                        help="event rates per second to run (default: 10 50 100 200 500)")
+    parser.add_argument("--duration", type=float, default=10, help="seconds of events per rate (default: 10)")
+    parser.add_argument("--events", help="recorded events (JSON Lines) instead of a synthetic stream")
+    parser.add_argument("--burst-size", type=int, default=1, help="synthetic events injected at once (default: 1)")
+    parser.add_argument("--poisson", action="store_true", help="exponentially distributed gaps between bursts")
+    parser.add_argument("--seed", type=int, default=42, help="synthetic stream seed (default: 42)")
+    parser.add_argument("--browser", default="chromium", choices=("chromium", "firefox", "webkit"))
+    parser.add_argument("--url", default="http://localhost:8000/dashboard/flowdash-js.html",
+                        help="dashboard page to load")
+    parser.add_argument("--timeout", type=int, default=60000, help="page readiness timeout in ms (default: 60000)")
+    parser.add_argument("--output", default="status-load.json", help="results file (default: status-load.json)")
+    parser.add_argument("--compare", help="earlier results file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="relative latency increase counted as a regression (default: 0.25)")
+    args = parser.parse_args()
+
+    try:
+        if args.events:
+            recorded = load_recorded(args.events)
+            streams = [(rate, retime(recorded, rate, args.duration)) for rate in args.rates]
+        else:
+            dashboard = load_dashboard(args.data_file)
+            streams = [(rate, synthetic_events(dashboard, rate, args.duration, max(1, args.burst_size),
+                                               args.poisson, args.seed)) for rate in args.rates]
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+
+    print("🚀 Starting status load test...")
+    load_test = StatusLoadTest(args.url, timeout=args.timeout)
+    results = await load_test.run(args.data_file, streams, browser_name=args.browser)
+    results["stream"] = ({"events": args.events} if args.events else
+                         {"burstSize": args.burst_size, "poisson": args.poisson, "seed": args.seed})
+    results["duration_s"] = args.duration
+    print_curve(results["results"])
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Results written to {args.output}")
+
+    if any("error" in r for r in results["results"]):
+        return 1
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+        return 0 if compare(results, previous, args.threshold) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Batched live status push service for FlowDash dashboards
+
+Receives node and dataset status changes (HTTP POST or the built-in simulator),
+merges them per node/dataset within a short window so superseded states are
+dropped, and pushes compact batches to dashboards over Server-Sent Events.
+The browser side is ``connectStatusStream`` in ``js/statusStream.js``.
+
+Endpoints:
+    GET  /events   SSE stream; the first event is a snapshot of all known states
+    POST /status   JSON object or list: {"nodeId": "...", "status": "Ready"}
+                   or {"datasetId": "...", "status": "Error"}
+    GET  /stats    counters as JSON
+
+Batch format (``event: status``):
+    {"seq": 12, "n": {"<nodeId>": "<status>"}, "d": {"<datasetId>": "<status>"}}
+
+A batch applies its dataset statuses before its node statuses, like
+``Dashboard.applyStatusBatch``. Updates keep their arrival order: a dataset update that
+arrives after a node update goes into the next batch, so both orders give the final
+state of applying the updates one by one.
+
+With ``--rollup DATA_FILE`` the server also computes container statuses and collapse
+decisions (``status_rollup.py``) and sends only those that changed:
+    {"seq": 13, "n": {...}, "c": {"<containerId>": "<status>"}, "x": {"<containerId>": true}}
+
+Usage:
+    python status_push.py [--port 8010] [--window-ms 250]
+    python status_push.py --simulate theme_2.json --rate 200 --rollup theme_2.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+from dashboard_data import NODE_STATUSES, load_dashboard, walk_nodes
+from status_rollup import StatusRollup
+
+HEARTBEAT_SECONDS = 15
+MAX_BODY_BYTES = 4 * 1024 * 1024
+
+
+# Batch keys: node statuses, dataset statuses, container statuses and collapse decisions (rollup)
+BATCH_KEYS = ("n", "d", "c", "x")
+
+
+def empty_parts():
+    return {key: {} for key in BATCH_KEYS}
+
+
+def ordered_parts(updates):
+    """Split ((kind, id), status) updates in arrival order into batches that keep that order
+
+    A batch applies its datasets ("d") before its nodes ("n"), so a dataset update that
+    follows a node update starts a new batch.
+    """
+    batches = []
+    for (kind, key), status in updates:
+        if not batches or (kind == "d" and batches[-1]["n"]):
+            batches.append(empty_parts())
+        batches[-1][kind][key] = status
+    return batches
+
+
+class Subscriber:
+    """One SSE connection; batches merge here until the connection catches up"""
+
+    def __init__(self):
+        self.pending = []
+        self.wakeup = asyncio.Event()
+
+    def merge(self, parts):
+        # Appending to the last batch keeps the order unless it would apply datasets before its nodes
+        if self.pending and not (parts.get("d") and self.pending[-1]["n"]):
+            for key, updates in parts.items():
+                self.pending[-1][key].update(updates)
+        else:
+            batch = empty_parts()
+            for key, updates in parts.items():
+                batch[key].update(updates)
+            self.pending.append(batch)
+        self.wakeup.set()
+
+    def take(self):
+        batches = self.pending
+        self.pending = []
+        self.wakeup.clear()
+        return batches
+
+
+class StatusBatcher:
+    def __init__(self, window_ms=250, rollup=None):
+        self.window = window_ms / 1000.0
+        self.rollup = rollup
+        # (kind, id) -> status, in arrival order; kind is "n" (node) or "d" (dataset)
+        self.pending = {}
+        self.pending_kinds = {"n": 0, "d": 0}
+        # (kind, id) -> (status, update number), in the order clients applied them
+        self.latest = {}
+        self.last_update = {"n": 0, "d": 0}
+        self.updates = 0
+        self.subscribers = set()
+        self.seq = 0
+        self.stats = {"received": 0, "superseded": 0, "batches": 0, "sent_updates": 0}
+
+    def submit(self, status, node_id=None, dataset_id=None):
+        if status not in NODE_STATUSES or (node_id is None) == (dataset_id is None):
+            raise ValueError("expected a known status and exactly one of nodeId/datasetId")
+        self.stats["received"] += 1
+        kind, other = ("n", "d") if node_id is not None else ("d", "n")
+        key = (kind, node_id if node_id is not None else dataset_id)
+        if key in self.pending:
+            self.stats["superseded"] += 1
+            del self.pending[key]
+            self.pending_kinds[kind] -= 1
+        status_now, update = self.latest.get(key, (None, 0))
+        if status_now == status and update > self.last_update[other] and not self.pending_kinds[other]:
+            # Back to the state clients already have, and no update of the other kind may have
+            # overridden it since: nothing to send
+            return
+        self.pending[key] = status
+        self.pending_kinds[kind] += 1
+
+    def apply_pending(self):
+        """Fold the current window into the latest state and fan it out to subscribers"""
+        if not self.pending:
+            return
+        updates = list(self.pending.items())
+        self.pending = {}
+        self.pending_kinds = {"n": 0, "d": 0}
+        for key, status in updates:
+            self.updates += 1
+            self.latest.pop(key, None)
+            self.latest[key] = (status, self.updates)
+            self.last_update[key[0]] = self.updates
+        for parts in ordered_parts(updates):
+            if self.rollup is not None:
+                delta = self.rollup.apply(parts["n"], parts["d"])
+                parts.update(c=delta["statuses"], x=delta["collapsed"])
+            self.stats["batches"] += 1
+            self.stats["sent_updates"] += sum(len(updates) for updates in parts.values())
+            for subscriber in self.subscribers:
+                subscriber.merge(parts)
+
+    def snapshot(self):
+        """Full current state as batches in order, sent to new subscribers"""
+        batches = ordered_parts((key, status) for key, (status, _) in self.latest.items()) or [empty_parts()]
+        if self.rollup is not None:
+            state = self.rollup.snapshot()
+            batches[-1].update(c=state["statuses"], x=state["collapsed"])
+        return batches
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.window)
+            self.apply_pending()
+
+    def encode(self, parts):
+        self.seq += 1
+        batch = {"seq": self.seq}
+        batch.update((key, parts[key]) for key in BATCH_KEYS if parts.get(key))
+        return f"event: status\nid: {self.seq}\ndata: {json.dumps(batch, separators=(',', ':'))}\n\n"
+
+
+class PushServer:
+    def __init__(self, batcher):
+        self.batcher = batcher
+
+    async def handle(self, reader, writer):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+            lines = head.decode("latin-1").split("\r\n")
+            method, target, _ = lines[0].split(" ", 2)
+            headers = {}
+            for line in lines[1:]:
+                name, sep, value = line.partition(":")
+                if sep:
+                    headers[name.strip().lower()] = value.strip()
+            path = target.split("?", 1)[0]
+            if method == "OPTIONS":
+                await self.send(writer, 204, b"", extra={
+                    "Access-Control-Allow-Methods": "GET, POST, OPTIONS",
+                    "Access-Control-Allow-Headers": "Content-Type"})
+            elif method == "GET" and path == "/events":
+                await self.stream(writer)
+            elif method == "POST" and path == "/status":
+                length = int(headers.get("content-length", "0"))
+                if length > MAX_BODY_BYTES:
+                    await self.send_json(writer, 413, {"error": "body too large"})
+                    return
+                await self.receive(writer, await reader.readexactly(length))
+            elif method == "GET" and path == "/stats":
+                stats = dict(self.batcher.stats, subscribers=len(self.batcher.subscribers))
+                await self.send_json(writer, 200, stats)
+            else:
+                await self.send_json(writer, 404, {"error": "not found"})
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            try:
+                await self.send_json(writer, 400, {"error": "bad request"})
+            except ConnectionError:
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    async def send(self, writer, status, body, content_type="application/json", extra=None):
+        head = [f"HTTP/1.1 {status} {'OK' if status < 300 else 'Error'}",
+                f"Content-Type: {content_type}",
+                f"Content-Length: {len(body)}",
+                "Access-Control-Allow-Origin: *",
+                "Connection: close"]
+        head.extend(f"{k}: {v}" for k, v in (extra or {}).items())
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    async def send_json(self, writer, status, payload):
+        await self.send(writer, status, json.dumps(payload).encode("utf-8"))
+
+    async def receive(self, writer, body):
+        payload = json.loads(body.decode("utf-8") or "[]")
+        updates = payload if isinstance(payload, list) else [payload]
+        accepted = 0
+        for update in updates:
+            try:
+                self.batcher.submit(update.get("status"), update.get("nodeId"), update.get("datasetId"))
+                accepted += 1
+            except (AttributeError, ValueError):
+                pass
+        await self.send_json(writer, 202, {"accepted": accepted, "rejected": len(updates) - accepted})
+
+    async def stream(self, writer):
+        writer.write(("HTTP/1.1 200 OK\r\n"
+                      "Content-Type: text/event-stream\r\n"
+                      "Cache-Control: no-cache\r\n"
+                      "Access-Control-Allow-Origin: *\r\n"
+                      "Connection: keep-alive\r\n\r\n"
+                      "retry: 2000\n\n").encode("latin-1"))
+        subscriber = Subscriber()
+        # Start every client from the full current state
+        for parts in self.batcher.snapshot():
+            subscriber.merge(parts)
+        self.batcher.subscribers.add(subscriber)
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(subscriber.wakeup.wait(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    writer.write(b": ping\n\n")
+                    await writer.drain()
+                    continue
+                for parts in subscriber.take():
+                    if any(parts.values()):
+                        writer.write(self.batcher.encode(parts).encode("utf-8"))
+                await writer.drain()
+        finally:
+            self.batcher.subscribers.discard(subscriber)
+
+
+def status_targets(dashboard):
+    """Ids of the leaf nodes and the dataset ids of a dashboard, i.e. what status changes address"""
+    node_ids, dataset_ids = [], []
+    for node, _, _ in walk_nodes(dashboard.get("nodes")):
+        if node.get("children"):
+            continue
+        node_ids.append(node["id"])
+        if node.get("datasetId") is not None:
+            dataset_ids.append(node["datasetId"])
+    return node_ids, dataset_ids
+
+
+async def simulate(batcher, data_file, rate, seed=None):
+    """Emit random status changes for the nodes and datasets of a dashboard file"""
+    rng = random.Random(seed)
+    node_ids, dataset_ids = status_targets(load_dashboard(data_file))
+    statuses = [s for s in NODE_STATUSES if s != "Undetermined"]
+    if not node_ids:
+        print(f"❌ No leaf nodes found in {data_file}")
+        return
+    print(f"🎲 Simulating {rate} status changes/s over {len(node_ids)} nodes and {len(dataset_ids)} datasets")
+    interval = 1.0 / rate
+    next_at = time.perf_counter()
+    while True:
+        if dataset_ids and rng.random() < 0.5:
+            batcher.submit(rng.choice(statuses), dataset_id=rng.choice(dataset_ids))
+        else:
+            batcher.submit(rng.choice(statuses), node_id=rng.choice(node_ids))
+        next_at += interval
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        elif delay < -1.0:
+            next_at = time.perf_counter()  # fell behind; don't burst to catch up
+        else:
+            await asyncio.sleep(0)
+
+
+async def serve(args):
+    rollup = None
+    if args.rollup:
+        rollup = StatusRollup(load_dashboard(args.rollup))
+        print(f"🧮 Rolling up statuses for {len(rollup.counts)} containers of {args.rollup}")
+    batcher = StatusBatcher(args.window_ms, rollup)
+    server = PushServer(batcher)
+    tasks = [asyncio.create_task(batcher.run())]
+    if args.simulate:
+        tasks.append(asyncio.create_task(simulate(batcher, args.simulate, args.rate, args.seed)))
+    srv = await asyncio.start_server(server.handle, args.bind, args.port, limit=64 * 1024)
+    print(f"📡 Status push on http://{args.bind or 'localhost'}:{args.port}/events "
+          f"(window {args.window_ms} ms)")
+    async with srv:
+        await srv.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Push batched FlowDash status updates over SSE")
+    parser.add_argument("--port", type=int, default=8010, help="port to listen on (default: 8010)")
+    parser.add_argument("--bind", default=None, help="address to bind to (default: all interfaces)")
+    parser.add_argument("--window-ms", type=int, default=250, help="batching window in ms (default: 250)")
+    parser.add_argument("--simulate", metavar="DATA_FILE", help="generate random updates for a dashboard file")
+    parser.add_argument("--rate", type=float, default=100, help="simulated updates per second (default: 100)")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for the simulator")
+    parser.add_argument("--rollup", metavar="DATA_FILE",
+                        help="also push container statuses and collapse decisions computed for this dashboard")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        print("\n⏹️  Status push stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
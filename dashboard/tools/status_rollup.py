@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Incremental status rollup for FlowDash dashboards, mirroring ``js/statusManager.js``
+
+Loads a dashboard data file and keeps, per container, the counts of the leaf statuses
+below it. A leaf update adjusts the counts on its ancestor path only, re-derives those
+containers' statuses (``determineAggregateStatus``) and collapse state
+(``shouldCollapseOnStatus``) in the order the node status setters apply them in the
+browser, and reports only the container statuses and collapse decisions that
+actually changed. The settings ``cascadeOnStatusChange`` and
+``toggleCollapseOnStatusChange`` are honoured as in the dashboard.
+
+Used by ``status_push.py --rollup`` and headless, e.g. for alerting: updates are read
+as JSON lines ({"nodeId"|"datasetId": ..., "status": ...}) and deltas written as JSON lines.
+
+Usage:
+    python status_rollup.py theme_2.json < updates.jsonl
+    python status_rollup.py theme_2.json --updates updates.jsonl --alert Error Warning
+"""
+
+import argparse
+import json
+import sys
+from collections import Counter
+
+from dashboard_data import NODE_STATUSES, is_container, js_string, load_dashboard, role_children
+
+# Mirrors StatusManager.determineAggregateStatus and shouldCollapseOnStatus
+STATUS_PRIORITY = ("Error", "Warning", "Delayed", "Unknown", "Updating", "Updated", "Skipped", "Ready")
+COLLAPSE_STATUSES = ("Ready", "Disabled", "Updated", "Skipped")
+UNKNOWN = "Unknown"
+
+# Mirrors DEFAULT_SETTINGS in js/configManager.js (flowdash-js / flowdash-bundle)
+DEFAULT_SETTINGS = {"cascadeOnStatusChange": True, "toggleCollapseOnStatusChange": True}
+
+
+def determine_aggregate_status(counts):
+    """Aggregate status of a container from its leaf status counts"""
+    for status in STATUS_PRIORITY:
+        if counts.get(status):
+            return status
+    return UNKNOWN
+
+
+def should_collapse_on_status(status, toggle_collapse=True):
+    return toggle_collapse and status in COLLAPSE_STATUSES
+
+
+class StatusRollup:
+    def __init__(self, dashboard, settings=None):
+        merged = dict(DEFAULT_SETTINGS)
+        merged.update((dashboard.get("settings") or {}))
+        merged.update(settings or {})
+        self.cascade = bool(merged["cascadeOnStatusChange"])
+        self.toggle_collapse = bool(merged["toggleCollapseOnStatusChange"])
+
+        self.parent = {}
+        self.children = {}      # container id -> child ids (including runtime role children)
+        self.containers = set()
+        self.status = {}
+        self.collapsed = {}     # container id -> bool
+        self.counts = {}        # container id -> Counter of leaf statuses in its subtree
+        self.datasets = {}      # datasetId -> node ids
+        self.order = []         # depth-first, parents before children
+        self._touched = None
+
+        for node, parent in self._walk(dashboard.get("nodes") or []):
+            node_id = js_string(node.get("id"))
+            if node_id in self.parent:
+                continue  # first wins, like getNode
+            self.order.append(node_id)
+            self.parent[node_id] = parent
+            if parent is not None:
+                self.children.setdefault(parent, []).append(node_id)
+            state = node.get("state")
+            self.status[node_id] = UNKNOWN if state is None else state
+            if is_container(node):
+                self.containers.add(node_id)
+                self.collapsed[node_id] = bool(node.get("collapsed", False))
+            dataset_id = node.get("datasetId")
+            if dataset_id is not None:
+                self.datasets.setdefault(js_string(dataset_id), []).append(node_id)
+
+        for node_id in reversed(self.order):
+            if self.children.get(node_id):
+                counts = Counter()
+                for child in self.children[node_id]:
+                    counts.update(self.counts[child] if child in self.counts else (self.status[child],))
+                self.counts[node_id] = counts
+        self._initialize()
+
+    def _walk(self, nodes):
+        """(node, parent id) depth-first, including the role children containers add at runtime"""
+        stack = [(node, None) for node in reversed(nodes)]
+        while stack:
+            node, parent = stack.pop()
+            if not isinstance(node, dict):
+                continue
+            yield node, parent
+            node_id = js_string(node.get("id"))
+            children = [c for c in node.get("children") or [] if isinstance(c, dict)]
+            children += [{"id": role_id, "type": "node"} for role_id in role_children(node)]
+            stack.extend((child, node_id) for child in reversed(children))
+
+    def _initialize(self):
+        # Dashboard.initializeChildrenStatusses: containers without a status of their own take the rollup
+        if not self.cascade:
+            return
+        for node_id in reversed(self.order):
+            if self.children.get(node_id) and self.status[node_id] in (None, "", UNKNOWN):
+                self._set_status(node_id, self.aggregate(node_id))
+
+    def is_leaf(self, node_id):
+        return not self.children.get(node_id)
+
+    def aggregate(self, container_id):
+        """StatusManager.calculateContainerStatus for a container"""
+        if not self.cascade or not self.children.get(container_id):
+            return UNKNOWN
+        return determine_aggregate_status(self.counts[container_id])
+
+    def ancestors(self, node_id):
+        parent = self.parent.get(node_id)
+        while parent is not None:
+            yield parent
+            parent = self.parent.get(parent)
+
+    def _record(self, table, node_id, value):
+        if self._touched is not None:
+            self._touched.setdefault((table, node_id), getattr(self, table).get(node_id))
+        getattr(self, table)[node_id] = value
+
+    def _expand_ancestors(self, node_id):
+        for ancestor in self.ancestors(node_id):
+            if self.collapsed.get(ancestor):
+                self._record("collapsed", ancestor, False)
+
+    def _set_status(self, node_id, value):
+        """The BaseNode status setter, followed by the cascade up the ancestor path"""
+        while node_id is not None:
+            self._record("status", node_id, value)
+            if self.toggle_collapse:
+                if node_id in self.containers:
+                    effective = self.aggregate(node_id) if self.children.get(node_id) else value
+                    if should_collapse_on_status(effective):
+                        self._record("collapsed", node_id, True)
+                    else:
+                        self._record("collapsed", node_id, False)
+                        self._expand_ancestors(node_id)
+                elif not should_collapse_on_status(value):
+                    self._expand_ancestors(node_id)
+            if not self.cascade:
+                return
+            node_id = self.parent.get(node_id)
+            if node_id is not None:
+                value = self.aggregate(node_id)
+
+    def _update(self, node_id, status):
+        old = self.status.get(node_id)
+        if old == status:
+            return
+        if self.is_leaf(node_id):
+            for ancestor in self.ancestors(node_id):
+                counts = self.counts[ancestor]
+                counts[old] -= 1
+                if counts[old] <= 0:
+                    del counts[old]
+                counts[status] += 1
+        self._set_status(node_id, status)
+
+    def apply(self, nodes=None, datasets=None):
+        """Apply status updates like Dashboard.applyStatusBatch (datasets first, then nodes).
+
+        Returns ``{"statuses": {container id: status}, "collapsed": {container id: bool}}``
+        with only the containers whose status or collapse state changed.
+        Unknown node and dataset ids are ignored.
+        """
+        self._touched = {}
+        try:
+            for dataset_id, status in (datasets or {}).items():
+                for node_id in self.datasets.get(js_string(dataset_id), []):
+                    self._update(node_id, status)
+            for node_id, status in (nodes or {}).items():
+                node_id = js_string(node_id)
+                if node_id in self.status:
+                    self._update(node_id, status)
+            touched = self._touched
+        finally:
+            self._touched = None
+
+        delta = {"statuses": {}, "collapsed": {}}
+        for (table, node_id), before in touched.items():
+            after = getattr(self, table)[node_id]
+            if after == before or (table == "status" and node_id not in self.containers):
+                continue
+            delta["statuses" if table == "status" else "collapsed"][node_id] = after
+        return delta
+
+    def snapshot(self):
+        """Current status and collapse state of every container"""
+        return {
+            "statuses": {node_id: self.status[node_id] for node_id in self.order if node_id in self.containers},
+            "collapsed": {node_id: self.collapsed[node_id] for node_id in self.order if node_id in self.containers},
+        }
+
+
+def read_updates(stream):
+    """Valid updates from a JSON-lines stream; other lines are reported and skipped"""
+    for line_no, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            update = json.loads(line)
+        except ValueError:
+            print(f"⚠️  line {line_no}: not JSON, skipped", file=sys.stderr)
+            continue
+        if (not isinstance(update, dict) or update.get("status") not in NODE_STATUSES
+                or (update.get("nodeId") is None) == (update.get("datasetId") is None)):
+            print(f"⚠️  line {line_no}: expected a known status and exactly one of nodeId/datasetId, skipped",
+                  file=sys.stderr)
+            continue
+        yield update
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental FlowDash status rollup over a stream of updates")
+    parser.add_argument("data_file", help="dashboard data file (name in dashboard/data or a path)")
+    parser.add_argument("--updates", default="-", help="JSON-lines file with updates (default: stdin)")
+    parser.add_argument("--alert", nargs="+", metavar="STATUS", choices=NODE_STATUSES,
+                        help="only report containers that change to one of these statuses")
+    parser.add_argument("--snapshot", action="store_true", help="print the initial container state first")
+    args = parser.parse_args()
+
+    rollup = StatusRollup(load_dashboard(args.data_file))
+    print(f"📂 {args.data_file}: {len(rollup.status)} nodes, {len(rollup.counts)} containers", file=sys.stderr)
+    if args.snapshot:
+        print(json.dumps({"snapshot": rollup.snapshot()}))
+
+    stream = sys.stdin if args.updates == "-" else open(args.updates, "r", encoding="utf-8")
+    try:
+        for update in read_updates(stream):
+            if update.get("nodeId") is not None:
+                delta = rollup.apply(nodes={update["nodeId"]: update["status"]})
+            else:
+                delta = rollup.apply(datasets={update["datasetId"]: update["status"]})
+            if args.alert:
+                for node_id, status in delta["statuses"].items():
+                    if status in args.alert:
+                        print(json.dumps({"alert": status, "nodeId": node_id, "cause": update}))
+            elif delta["statuses"] or delta["collapsed"]:
+                print(json.dumps(delta), flush=True)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
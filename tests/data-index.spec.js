@@ -0,0 +1,97 @@
+import { test, expect } from '@playwright/test';
+import { execFileSync } from 'node:child_process';
+import { readdirSync, readFileSync } from 'node:fs';
+import { fileURLToPath } from 'node:url';
+import { dataFingerprint, resolveDataIndex } from '../dashboard/js/dataIndex.js';
+
+// The compiled index section (dashboard/tools/compile_data.py -> js/dataIndex.js) is
+// only used while its fingerprint matches the node tree, so both sides have to hash
+// every data file to the same value; otherwise the dashboard silently ignores the index.
+// The top-level data files are committed with their compiled index, which has to be current.
+
+const TOOLS_DIR = fileURLToPath(new URL('../dashboard/tools/', import.meta.url));
+const DATA_DIR = fileURLToPath(new URL('../dashboard/data/', import.meta.url));
+const PYTHON = process.env.PYTHON || 'python';
+
+// Fingerprint and compiled index of each data file, or of the inline dashboards
+const COMPILE_SCRIPT = `
+import json, sys
+from compile_data import compile_dashboard, data_fingerprint
+from dashboard_data import load_dashboard
+
+request = json.load(sys.stdin)
+results = {}
+for name, dashboard in request["dashboards"].items():
+    dashboard = dashboard if dashboard is not None else load_dashboard(name)
+    index, errors = compile_dashboard(dashboard)
+    results[name] = {"fingerprint": data_fingerprint(dashboard["nodes"]), "index": index, "errors": len(errors)}
+print(json.dumps(results, ensure_ascii=False))
+`;
+
+function compile(dashboards) {
+  const output = execFileSync(PYTHON, ['-c', COMPILE_SCRIPT], {
+    cwd: TOOLS_DIR,
+    input: JSON.stringify({ dashboards }),
+    maxBuffer: 256 * 1024 * 1024,
+  });
+  return JSON.parse(output.toString('utf-8'));
+}
+
+const DATA_FILES = readdirSync(DATA_DIR, { recursive: true })
+  .filter((file) => file.endsWith('.json'))
+  .map((file) => file.split('\\').join('/'))
+  .sort();
+const loadData = (file) => JSON.parse(readFileSync(`${DATA_DIR}${file}`, 'utf-8'));
+
+// Ids and datasetIds whose string form differs between naive Python and JavaScript
+const EDGE_CASES = {
+  'numbers-and-unicode': {
+    nodes: [
+      { id: 1, datasetId: 2.5, children: [{ id: 1e-7 }, { id: 1e21, datasetId: 0 }, { id: -0.5 }] },
+      { id: 'é ü ß', datasetId: '漢字', children: [{ id: '😀 astral', datasetId: null, children: [] }] },
+      { id: 'tab\tnew\nline' },
+    ],
+  },
+};
+
+test.describe('Data index fingerprint parity', () => {
+  let compiled;
+  test.beforeAll(() => {
+    compiled = compile({ ...Object.fromEntries(DATA_FILES.map((file) => [file, null])), ...EDGE_CASES });
+  });
+
+  test('the data directory has data files', () => {
+    expect(DATA_FILES.length).toBeGreaterThan(0);
+  });
+
+  for (const file of DATA_FILES) {
+    test(`${file}: dataFingerprint matches data_fingerprint`, () => {
+      const data = loadData(file);
+      expect(dataFingerprint(data.nodes)).toBe(compiled[file].fingerprint);
+    });
+
+    test(`${file}: resolveDataIndex accepts the compiled index`, () => {
+      const { index, errors } = compiled[file];
+      if (errors) return; // files with errors get no index
+      const data = loadData(file);
+      expect(resolveDataIndex({ ...data, index })).toEqual(index);
+      expect(resolveDataIndex({ ...data, index: { ...index, fingerprint: '00000000' } })).toBe(null);
+    });
+
+    if (!file.includes('/')) {
+      test(`${file}: the committed index is current`, () => {
+        expect(compiled[file].errors).toBe(0);
+        const data = loadData(file);
+        expect(data.index).toEqual(compiled[file].index);
+        expect(resolveDataIndex(data)).toEqual(compiled[file].index);
+      });
+    }
+  }
+
+  for (const [name, dashboard] of Object.entries(EDGE_CASES)) {
+    test(`${name}: dataFingerprint matches data_fingerprint`, () => {
+      expect(dataFingerprint(dashboard.nodes)).toBe(compiled[name].fingerprint);
+      expect(resolveDataIndex({ ...dashboard, index: compiled[name].index })).toEqual(compiled[name].index);
+    });
+  }
+});
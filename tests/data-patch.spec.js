@@ -0,0 +1,183 @@
+import { test, expect } from '@playwright/test';
+import { execFileSync } from 'node:child_process';
+import { readFileSync } from 'node:fs';
+import { fileURLToPath } from 'node:url';
+import { applyDataPatch, dataVersion } from '../dashboard/js/dataPatch.js';
+import { canonical } from '../dashboard/js/precomputedLayout.js';
+
+// Structural patches (dashboard/tools/data_patch.py -> js/dataPatch.js) on the shipped
+// data files: seeded random mutation sets go through the Python diff -> apply round
+// trip, and a share of the patches is applied again with applyDataPatch, which has to
+// end at the same data version and canonical text as Python. Patches do not keep the
+// order of edges, so edges are compared as multisets.
+
+const TOOLS_DIR = fileURLToPath(new URL('../dashboard/tools/', import.meta.url));
+const DATA_DIR = fileURLToPath(new URL('../dashboard/data/', import.meta.url));
+const PYTHON = process.env.PYTHON || 'python';
+
+// Mutates a copy of the data (removes, adds, moves, reorders, field and edge changes),
+// checks the Python round trip and returns the mismatches and the cases for JS
+const FUZZ_SCRIPT = `
+import copy, json, random, sys
+from dashboard_data import NODE_STATUSES, load_dashboard
+from data_patch import apply_patch, canonical, data_version, diff_dashboards
+
+request = json.load(sys.stdin)
+old = load_dashboard(request["file"])
+rng = random.Random(request["seed"])
+fresh_ids = iter(range(1, 10 ** 9))
+VALUES = [0, 1, -3, 0.5, 1.25, 1e-7, True, False, None, "", "é ü ß", "漢字", "tab\\tquote\\"", [1, "a"], {"b": 1, "a": [2.5]}]
+
+
+def nodes_of(data):
+    found = []
+
+    def visit(items, parent):
+        for node in items:
+            found.append((node, parent))
+            visit(node.get("children") or [], node)
+
+    visit(data["nodes"], None)
+    return found
+
+
+def siblings(data, parent):
+    return data["nodes"] if parent is None else parent.setdefault("children", [])
+
+
+def subtree_ids(node):
+    ids = {str(node["id"])}
+    for child in node.get("children") or []:
+        ids |= subtree_ids(child)
+    return ids
+
+
+def new_node(depth=0):
+    node = {"id": f"fuzz-{next(fresh_ids)}", "label": rng.choice(["New", "Nieuw", "Ñeu"]), "type": "node"}
+    if depth < 2 and rng.random() < 0.3:
+        node["type"] = "group"
+        node["children"] = [new_node(depth + 1) for _ in range(rng.randint(1, 3))]
+    return node
+
+
+def mutate(data):
+    for _ in range(rng.randint(1, 6)):
+        nodes = nodes_of(data)
+        node, parent = rng.choice(nodes)
+        op = rng.choice(["remove", "add", "move", "reorder", "set", "unset", "state", "children", "edge-", "edge+", "edge~"])
+        if op == "remove" and len(nodes) > 2 and parent is not None:
+            siblings(data, parent).remove(node)
+        elif op == "add":
+            items = siblings(data, rng.choice([node, parent]) if node.get("children") is not None else parent)
+            items.insert(rng.randint(0, len(items)), new_node())
+        elif op == "move" and parent is not None:
+            banned = subtree_ids(node)
+            targets = [n for n, _ in nodes if n.get("children") is not None and str(n["id"]) not in banned]
+            if targets:
+                siblings(data, parent).remove(node)
+                items = rng.choice(targets)["children"]
+                items.insert(rng.randint(0, len(items)), node)
+        elif op == "reorder":
+            rng.shuffle(siblings(data, parent))
+        elif op == "set":
+            node[rng.choice(["label", "code", "layout", "fuzz"])] = copy.deepcopy(rng.choice(VALUES))
+        elif op == "unset":
+            keys = [k for k in node if k not in ("id", "children")]
+            if keys:
+                del node[rng.choice(keys)]
+        elif op == "state":
+            node["state"] = rng.choice(NODE_STATUSES)
+        elif op == "children" and not node.get("children"):
+            if "children" in node:
+                del node["children"]
+            else:
+                node["children"] = []
+        elif op == "edge-" and data.get("edges"):
+            data["edges"].pop(rng.randrange(len(data["edges"])))
+        elif op == "edge+":
+            (source, _), (target, _) = rng.choice(nodes), rng.choice(nodes)
+            end = rng.choice([lambda n: n["id"], lambda n: {"id": n["id"]}])
+            data.setdefault("edges", []).append({"source": end(source), "target": end(target)})
+        elif op == "edge~" and data.get("edges"):
+            rng.choice(data["edges"])["fuzz"] = copy.deepcopy(rng.choice(VALUES))
+
+
+def canonical_parts(data):
+    return {"nodes": canonical(data.get("nodes") or []), "edges": sorted(canonical(e) for e in data.get("edges") or [])}
+
+
+mismatches, cases = [], []
+for i in range(request["sets"]):
+    new = copy.deepcopy(old)
+    mutate(new)
+    patch = diff_dashboards(old, new)
+    applied = apply_patch(old, patch)
+    expected = canonical_parts(new)
+    if canonical_parts(applied) != expected:
+        mismatches.append(f"set {i}: apply(diff(old, new)) != new")
+    elif data_version(applied) != patch["to"] or patch["from"] != data_version(old):
+        mismatches.append(f"set {i}: versions do not match")
+    if i < request["js_sets"] and "settings" not in patch:
+        cases.append({"patch": patch, "expected": expected})
+print(json.dumps({"version": data_version(old), "canonical": canonical_parts(old),
+                  "mismatches": mismatches, "cases": cases}, ensure_ascii=False))
+`;
+
+function runFuzz(file, seed, sets, jsSets) {
+  const output = execFileSync(PYTHON, ['-c', FUZZ_SCRIPT], {
+    cwd: TOOLS_DIR,
+    input: JSON.stringify({ file, seed, sets, js_sets: jsSets }),
+    maxBuffer: 512 * 1024 * 1024,
+  });
+  return JSON.parse(output.toString('utf-8'));
+}
+
+const loadData = (file) => JSON.parse(readFileSync(`${DATA_DIR}${file}`, 'utf-8'));
+
+/** Canonical text of the nodes, and of the edges in a fixed order */
+const canonicalParts = (data) => ({
+  nodes: canonical(data.nodes || []),
+  edges: (data.edges || []).map(canonical).sort(),
+});
+const sortedEdges = (expected) => ({ ...expected, edges: [...expected.edges].sort() });
+
+const FILES = [
+  // file, seed, Python round trips, of which applied in JS
+  ['adapter-1.json', 1, 40, 15],
+  ['dwh-2.json', 2, 60, 20],
+  ['dwh-5.json', 3, 60, 20],
+  ['lane-small.json', 4, 60, 20],
+  ['lane-big.json', 5, 50, 15],
+  ['theme_1.json', 7, 40, 15],
+  ['theme_2.json', 6, 30, 10],
+];
+
+for (const [file, seed, sets, jsSets] of FILES) {
+  test.describe(`Data patch round trip: ${file}`, () => {
+    let result;
+    test.beforeAll(() => {
+      result = runFuzz(file, seed, sets, jsSets);
+    });
+
+    test('Python diff -> apply reproduces every mutated version', () => {
+      expect(result.mismatches).toEqual([]);
+    });
+
+    test('dataVersion and canonical match data_version in Python', () => {
+      const data = loadData(file);
+      expect(canonicalParts(data)).toEqual(sortedEdges(result.canonical));
+      expect(dataVersion(data)).toBe(result.version);
+    });
+
+    test('applyDataPatch ends at the version the patch was made for', () => {
+      expect(result.cases.length).toBeGreaterThan(0);
+      result.cases.forEach(({ patch, expected }, i) => {
+        const data = loadData(file);
+        expect(dataVersion(data), `case ${i}: from`).toBe(patch.from);
+        applyDataPatch(data, patch);
+        expect(canonicalParts(data), `case ${i}: data`).toEqual(sortedEdges(expected));
+        expect(dataVersion(data), `case ${i}: to`).toBe(patch.to);
+      });
+    });
+  });
+}
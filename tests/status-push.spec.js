@@ -0,0 +1,91 @@
+import { test, expect } from '@playwright/test';
+import { execFileSync } from 'node:child_process';
+import { fileURLToPath } from 'node:url';
+
+// The push server (dashboard/tools/status_push.py) coalesces node and dataset updates
+// per window, and a slow connection merges several windows. The batches it sends are
+// applied like Dashboard.applyStatusBatch (datasets, then nodes); these tests check that
+// this ends in the same state as applying every update one by one in arrival order.
+
+const TOOLS_DIR = fileURLToPath(new URL('../dashboard/tools/', import.meta.url));
+const PYTHON = process.env.PYTHON || 'python';
+
+// Submits seeded updates over leaves and datasets in windows, with one subscriber that
+// drains every window and one that drains only now and then, and returns what both
+// received, the snapshot a late subscriber gets and the state after each update
+const PUSH_SCRIPT = `
+import json, random, sys
+from dashboard_data import NODE_STATUSES, load_dashboard
+from status_push import StatusBatcher, Subscriber
+from status_rollup import StatusRollup
+
+request = json.load(sys.stdin)
+rollup = StatusRollup(load_dashboard(request["file"]), {})
+rng = random.Random(request["seed"])
+leaves = [node_id for node_id in rollup.order if rollup.is_leaf(node_id)]
+datasets = {d: [i for i in ids if rollup.is_leaf(i)] for d, ids in rollup.datasets.items()}
+datasets = {d: ids for d, ids in datasets.items() if ids}
+# Few statuses and a small set of targets, so updates overlap and often return to a known state
+statuses = list(NODE_STATUSES[:3])
+targets = rng.sample(leaves, min(8, len(leaves)))
+dataset_ids = sorted(datasets, key=lambda d: -len(set(datasets[d]) & set(targets)))[:3]
+targets += [i for d in dataset_ids for i in datasets[d]]
+
+batcher = StatusBatcher()
+fast, slow = Subscriber(), Subscriber()
+batcher.subscribers.update((fast, slow))
+state = {}
+received = {"fast": [], "slow": []}
+for _ in range(request["windows"]):
+    for _ in range(rng.randint(1, 12)):
+        if dataset_ids and rng.random() < 0.4:
+            dataset_id, status = rng.choice(dataset_ids), rng.choice(statuses)
+            batcher.submit(status, dataset_id=dataset_id)
+            state.update((i, status) for i in datasets[dataset_id])
+        else:
+            node_id, status = rng.choice(targets), rng.choice(statuses)
+            batcher.submit(status, node_id=node_id)
+            state[node_id] = status
+    batcher.apply_pending()
+    received["fast"] += fast.take()
+    if rng.random() < 0.3:
+        received["slow"] += slow.take()
+received["slow"] += slow.take()
+print(json.dumps({"datasets": {d: datasets[d] for d in dataset_ids}, "received": received,
+                  "snapshot": batcher.snapshot(), "state": state, "stats": batcher.stats}))
+`;
+
+function runPush(file, seed, windows) {
+  const output = execFileSync(PYTHON, ['-c', PUSH_SCRIPT], {
+    cwd: TOOLS_DIR,
+    input: JSON.stringify({ file, seed, windows }),
+    maxBuffer: 256 * 1024 * 1024,
+  });
+  return JSON.parse(output.toString('utf-8'));
+}
+
+/** Apply batches the way Dashboard.applyStatusBatch does: datasets first, then nodes */
+function applyBatches(batches, datasets, state = {}) {
+  for (const batch of batches) {
+    for (const [datasetId, status] of Object.entries(batch.d || {})) {
+      for (const id of datasets[datasetId]) state[id] = status;
+    }
+    for (const [id, status] of Object.entries(batch.n || {})) state[id] = status;
+  }
+  return state;
+}
+
+for (const [file, seed] of [['lane-small.json', 1], ['theme_1.json', 2], ['theme_2.json', 3]]) {
+  test.describe(`Status push ordering: ${file}`, () => {
+    test('batches end in the state of applying the updates in arrival order', () => {
+      const result = runPush(file, seed, 200);
+      expect(Object.keys(result.datasets).length).toBeGreaterThan(0);
+      expect(result.stats.superseded).toBeGreaterThan(0);
+      expect(result.stats.sent_updates).toBeLessThan(result.stats.received);
+
+      expect(applyBatches(result.received.fast, result.datasets)).toEqual(result.state);
+      expect(applyBatches(result.received.slow, result.datasets)).toEqual(result.state);
+      expect(applyBatches(result.snapshot, result.datasets)).toEqual(result.state);
+    });
+  });
+}
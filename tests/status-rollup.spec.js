@@ -0,0 +1,88 @@
+import { test, expect } from '@playwright/test';
+import { execFileSync } from 'node:child_process';
+import { fileURLToPath } from 'node:url';
+import { StatusManager } from '../dashboard/js/statusManager.js';
+
+// The server-side rollup (dashboard/tools/status_rollup.py) keeps incremental leaf
+// status counts per container. These tests replay the same random updates in the
+// rollup and in a plain node tree, and check every container against a full
+// StatusManager.calculateContainerStatus / shouldCollapseOnStatus recomputation.
+
+const TOOLS_DIR = fileURLToPath(new URL('../dashboard/tools/', import.meta.url));
+const PYTHON = process.env.PYTHON || 'python';
+const SETTINGS = { cascadeOnStatusChange: true, toggleCollapseOnStatusChange: true };
+
+// Generates seeded batches over leaves and leaf-only datasets, applies them to the
+// rollup and returns the tree and the rollup snapshot after every batch
+const ROLLUP_SCRIPT = `
+import json, random, sys
+from dashboard_data import NODE_STATUSES, load_dashboard
+from status_rollup import StatusRollup
+
+request = json.load(sys.stdin)
+rollup = StatusRollup(load_dashboard(request["file"]), request["settings"])
+rng = random.Random(request["seed"])
+leaves = [node_id for node_id in rollup.order if rollup.is_leaf(node_id)]
+datasets = sorted(d for d, ids in rollup.datasets.items() if all(rollup.is_leaf(i) for i in ids))
+batches = [{"nodes": {leaf: rng.choice(NODE_STATUSES) for leaf in leaves}}]
+for _ in range(request["batches"]):
+    batch = {"nodes": {}, "datasets": {}}
+    for _ in range(rng.randint(1, 20)):
+        if datasets and rng.random() < 0.3:
+            batch["datasets"][rng.choice(datasets)] = rng.choice(NODE_STATUSES)
+        else:
+            batch["nodes"][rng.choice(leaves)] = rng.choice(NODE_STATUSES)
+    batches.append(batch)
+snapshots = []
+for batch in batches:
+    rollup.apply(batch.get("nodes"), batch.get("datasets"))
+    snapshots.append(rollup.snapshot())
+print(json.dumps({"order": rollup.order, "children": rollup.children, "containers": sorted(rollup.containers),
+                  "datasets": rollup.datasets, "batches": batches, "snapshots": snapshots}))
+`;
+
+function runRollup(file, seed, batches) {
+  const output = execFileSync(PYTHON, ['-c', ROLLUP_SCRIPT], {
+    cwd: TOOLS_DIR,
+    input: JSON.stringify({ file, seed, batches, settings: SETTINGS }),
+    maxBuffer: 256 * 1024 * 1024,
+  });
+  return JSON.parse(output.toString('utf-8'));
+}
+
+/** Minimal nodes with the fields StatusManager reads: isContainer, childNodes, status */
+function buildTree({ order, children, containers }) {
+  const containerIds = new Set(containers);
+  const nodes = new Map(order.map((id) => [id, { id, isContainer: containerIds.has(id), childNodes: [], status: 'Unknown' }]));
+  for (const [parentId, childIds] of Object.entries(children)) {
+    nodes.get(parentId).childNodes = childIds.map((id) => nodes.get(id));
+  }
+  return nodes;
+}
+
+for (const [file, seed] of [['dwh-3.json', 1], ['lane-small.json', 2], ['theme_1.json', 3], ['theme_2.json', 4]]) {
+  test.describe(`Status rollup parity: ${file}`, () => {
+    test('container statuses and collapse decisions match StatusManager', () => {
+      const result = runRollup(file, seed, 50);
+      const nodes = buildTree(result);
+      const rolledUp = [...nodes.values()].filter((node) => node.childNodes.length > 0);
+      expect(rolledUp.length).toBeGreaterThan(0);
+
+      result.batches.forEach((batch, i) => {
+        for (const [datasetId, status] of Object.entries(batch.datasets || {})) {
+          for (const id of result.datasets[datasetId]) nodes.get(id).status = status;
+        }
+        for (const [id, status] of Object.entries(batch.nodes || {})) nodes.get(id).status = status;
+
+        const snapshot = result.snapshots[i];
+        for (const node of rolledUp) {
+          if (!node.isContainer) continue;
+          const status = StatusManager.calculateContainerStatus(node.childNodes, SETTINGS);
+          expect(snapshot.statuses[node.id], `batch ${i}: status of ${node.id}`).toBe(status);
+          expect(snapshot.collapsed[node.id], `batch ${i}: collapsed of ${node.id}`)
+            .toBe(StatusManager.shouldCollapseOnStatus(status, SETTINGS));
+        }
+      });
+    });
+  });
+}